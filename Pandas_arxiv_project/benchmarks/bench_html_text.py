@@ -0,0 +1,120 @@
+"""HTML -> text throughput: legacy regex passes vs. the streaming html.parser extractor.
+
+Run from the project root:  python -m benchmarks.bench_html_text [--pages DIR]
+
+Pages are synthetic arXiv abstract pages (or every *.html under --pages). The
+whole-page output of the new extractor must equal the regex version on every page,
+and every `EDGE_CASES` input must give its expected text. A bare `<` in text is the
+one intended difference: the regex drops everything up to the next `>`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from html import unescape
+from pathlib import Path
+
+from usecases.arxiv_harvester import CHUNK_SIZE
+from usecases.html_text import ABSTRACT, HtmlTextSink, html_to_text
+
+# (html, expected text); the regex version agrees on all but the bare `<`.
+EDGE_CASES = [
+    ("a<!-- c -->b", "a b"),
+    ("3 < 4 and 5 > 2", "3 < 4 and 5 > 2"),
+    ("<p>x<br/>y</p><SCRIPT>var t = '<b>';</SCRIPT>z &amp; w", "x y z & w"),
+]
+
+
+def _legacy_html_to_text(html: str) -> str:
+    t = re.sub(r"<script.*?>.*?</script>|<style.*?>.*?</style>", " ", html, flags=re.S | re.I)
+    t = re.sub(r"<[^>]+>", " ", t)
+    return re.sub(r"\s+", " ", unescape(t)).strip()
+
+
+def _page(rng: random.Random, words: list[str], i: int, script_kb: int) -> str:
+    def para(n: int) -> str:
+        return " ".join(rng.choices(words, k=n))
+
+    script = (
+        "var cfg = {" + ", ".join(f'"k{j}": "<b>{j}</b>"' for j in range(script_kb * 50)) + "};"
+    )
+    nav = "".join(f'<li><a href="/list/cs.{j}">cs.{j} &amp; more</a></li>' for j in range(120))
+    refs = "".join(f"<tr><td>[{j}]</td><td><i>{para(12)}</i></td></tr>" for j in range(200))
+    return (
+        f"<!DOCTYPE html><html lang='en'><head><title>[{1706 + i % 50}.{i:05d}] {para(6)}</title>"
+        "<style>body { font: 1em serif } .abstract > .descriptor { font-weight: bold }</style>"
+        f"<script type='text/javascript'>{script}</script></head><body>"
+        f"<header><ul>{nav}</ul></header><div id='abs'>"
+        f"<h1 class='title mathjax'><span class='descriptor'>Title:</span>{para(8)}</h1>"
+        f"<div class='authors'><a href='/a/x'>{para(2)}</a>, <a href='/a/y'>{para(2)}</a></div>"
+        "<blockquote class='abstract mathjax'>\n"
+        f"  <span class='descriptor'>Abstract:</span>{para(120)} &lt;x&gt; &#956;m<br/>{para(60)}"
+        f"<!-- v{i} -->{para(20)}\n"
+        "</blockquote>"
+        f"<table class='refs'>{refs}</table></div>"
+        f"<SCRIPT>window.MathJax = {{ tex: {{ inlineMath: [['$','$']] }} }};</SCRIPT></body></html>"
+    )
+
+
+def _pages(n: int, script_kb: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = [f"w{rng.getrandbits(24):x}" for _ in range(5000)]
+    return [_page(rng, words, i, script_kb) for i in range(n)]
+
+
+def _streamed(data: bytes, target: tuple[str, str] | None) -> str:
+    sink = HtmlTextSink(target)
+    for start in range(0, len(data), CHUNK_SIZE):
+        if not sink.feed(data[start : start + CHUNK_SIZE]):
+            break
+    return sink.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=Path, help="directory of saved abstract pages (*.html)")
+    parser.add_argument("-n", type=int, default=300, help="synthetic pages")
+    parser.add_argument("--script-kb", type=int, default=40, help="inline <script> size per page")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [
+            p.read_text(encoding="utf-8", errors="ignore")
+            for p in sorted(args.pages.glob("*.html"))
+        ]
+    else:
+        pages = _pages(args.n, args.script_kb)
+    encoded = [p.encode("utf-8") for p in pages]
+    mb = sum(map(len, encoded)) / 1e6
+
+    mismatches = sum(
+        _legacy_html_to_text(p) != html_to_text(p) or html_to_text(p) != _streamed(b, None)
+        for p, b in zip(pages, encoded, strict=True)
+    )
+    print(f"{len(pages)} pages, {mb:.1f} MB; whole-page text differs from regex on {mismatches}")
+    for html, expected in EDGE_CASES:
+        got = html_to_text(html)
+        mismatches += got != expected
+        print(f"  {html!r}: {got!r} (regex: {_legacy_html_to_text(html)!r})")
+
+    runs = [
+        ("regex (4 passes)", lambda: [_legacy_html_to_text(p) for p in pages]),
+        ("stripper, whole page", lambda: [html_to_text(p) for p in pages]),
+        ("streamed bytes, whole page", lambda: [_streamed(b, None) for b in encoded]),
+        ("parser, abstract only", lambda: [html_to_text(p, ABSTRACT) for p in pages]),
+        ("streamed bytes, abstract", lambda: [_streamed(b, ABSTRACT) for b in encoded]),
+    ]
+    for name, run in runs:
+        t0 = time.perf_counter()
+        run()
+        secs = time.perf_counter() - t0
+        print(f"{name:26s} {len(pages) / secs:9,.0f} pages/s  {mb / secs:7.1f} MB/s")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Import-time budget for the search entry point (usecases.search_cli).
+
+Each module is imported under `python -X importtime` in a fresh interpreter,
+--repeat times, and the fastest cumulative time is kept. The run fails (exit 1)
+when `usecases.search_cli` takes longer than --budget-ms, or when it imports
+pandas, mongoengine, pymongo or any other harvest-only package at import time.
+`main` is measured alongside for comparison.
+
+Run from the project root:  python -m benchmarks.bench_import_time --budget-ms 400
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+TARGET = "usecases.search_cli"
+# Top-level packages the search path must not import before its first query.
+FORBIDDEN = ("mongoengine", "pymongo", "sqlalchemy", "pymysql", "pandas", "pyarrow")
+
+
+def _importtime(module: str) -> dict[str, tuple[int, int]]:
+    """{module: (self us, cumulative us)} from one `-X importtime` run."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times: dict[str, tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def _fastest(module: str, repeat: int) -> dict[str, tuple[int, int]]:
+    runs = [_importtime(module) for _ in range(repeat)]
+    return min(runs, key=lambda times: times[module][1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest modules to list")
+    args = parser.parse_args()
+
+    print(f"{'module':<22} {'import ms':>10} {'modules':>8}")
+    results = {m: _fastest(m, args.repeat) for m in (TARGET, "main")}
+    for module, times in results.items():
+        print(f"{module:<22} {times[module][1] / 1000:10.1f} {len(times):8d}")
+
+    times = results[TARGET]
+    print(f"\nslowest imports under {TARGET} (self ms):")
+    for name, (self_us, _) in sorted(times.items(), key=lambda kv: -kv[1][0])[: args.top]:
+        print(f"  {self_us / 1000:8.1f}  {name}")
+
+    problems = [f"{TARGET} imports {p}" for p in FORBIDDEN if p in times]
+    total_ms = times[TARGET][1] / 1000
+    if total_ms > args.budget_ms:
+        problems.append(f"{TARGET} takes {total_ms:.1f} ms, budget {args.budget_ms:.0f} ms")
+    for p in problems:
+        print(f"REGRESSION {p}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
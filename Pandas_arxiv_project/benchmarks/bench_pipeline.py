@@ -0,0 +1,176 @@
+"""Peak RSS and throughput of run_arxiv_pipeline, whole-frame vs. chunked.
+
+The arXiv API and abstract pages are served by a local stub server, MariaDB is
+a SQLite file and MongoDB is mongomock (unless --real-mongo). Each mode runs in
+its own process so peak RSS is not shared between them. mongomock upserts
+scan the collection, so use --real-mongo for runs much past 10k articles.
+The stub shares the process (and the GIL) with the pipeline, so pages are
+fetched 4 at a time; more threads only add lock contention here.
+
+Run from the project root:  python -m benchmarks.bench_pipeline -n 5000 --chunk-size 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+_WORDS = [
+    "transformer", "attention", "residual", "network", "graph", "language", "model", "sparse",
+    "dense", "diffusion", "policy", "gradient", "benchmark", "dataset", "token", "retrieval",
+]  # fmt: skip
+
+
+def _text(i: int, n: int) -> str:
+    return " ".join(_WORDS[(i * 7 + j * 3) % len(_WORDS)] for j in range(n))
+
+
+def _feed(start: int, size: int, total: int, authors: int) -> bytes:
+    entries = "".join(
+        f"<entry><id>http://arxiv.org/abs/bench.{i:07d}v1</id>"
+        f"<title>{escape(_text(i, 8))}</title><summary>{escape(_text(i, 60))}</summary>"
+        f"<author><name>Author {i % authors}</name></author></entry>"
+        for i in range(start, min(start + size, total))
+    )
+    return f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode()
+
+
+def _abs_page(i: int) -> bytes:
+    nav = "".join(f"<li><a href='/list/{w}'>{w}</a></li>" for w in _WORDS * 10)
+    return (
+        f"<html><head><title>bench.{i:07d}</title>"
+        f"<script>var x = '{'y' * 4000}';</script></head><body><ul>{nav}</ul>"
+        f"<blockquote class='abstract mathjax'><span class='descriptor'>Abstract:</span>"
+        f"{_text(i, 200)}</blockquote><p>{_text(i + 1, 400)}</p></body></html>"
+    ).encode()
+
+
+def _serve(total: int, authors: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            url = urllib.parse.urlsplit(self.path)
+            if url.path == "/api":
+                q = urllib.parse.parse_qs(url.query)
+                body = _feed(int(q["start"][0]), int(q["max_results"][0]), total, authors)
+            else:
+                body = _abs_page(int(url.path.rsplit(".", 1)[-1].split("v")[0]))
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _run_one(args: argparse.Namespace) -> None:
+    db = Path(tempfile.mkdtemp(prefix="arxiv-bench-")) / "bench.sqlite"
+    os.environ["MARIADB_DSN"] = f"sqlite:///{db}"
+    if not args.real_mongo:
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("mongomock is not installed: pip install -e '.[bench]' or pass --real-mongo")
+        from storage.mongodb import init_mongo
+
+        init_mongo(mongo_client_class=mongomock.MongoClient)
+
+    from usecases.arxiv_harvester import HarvestConfig
+    from usecases.metrics import PipelineMetrics, peak_rss_bytes
+    from usecases.pandas_pipeline import run_arxiv_pipeline
+
+    server = _serve(args.n, args.authors)
+    base = f"http://127.0.0.1:{server.server_port}"
+    config = HarvestConfig(
+        api_url=f"{base}/api",
+        abs_url=f"{base}/abs/",
+        page_size=1000,
+        concurrency=4,
+        rate_per_sec=1e9,
+        api_rate_per_sec=1e9,
+        retries=0,
+    )
+    t0 = time.perf_counter()
+    with PipelineMetrics("arxiv_pipeline") as metrics:
+        result = run_arxiv_pipeline(
+            "bench", args.n, config, metrics=metrics, chunk_size=args.chunk_size or None
+        )
+    print(
+        json.dumps(
+            {
+                "chunk_size": args.chunk_size,
+                "rows": len(result.df),
+                "mongo": result.inserted_mongo,
+                "seconds": time.perf_counter() - t0,
+                "peak_rss_mb": (peak_rss_bytes() or 0) / 2**20,
+                "result_kb": result.df.memory_usage(deep=True).sum() / 1024,
+            }
+        )
+    )
+    server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=5000, help="articles served by the stub")
+    parser.add_argument("--authors", type=int, default=500, help="distinct author names")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="0: whole frame")
+    parser.add_argument(
+        "--real-mongo", action="store_true", help="use MONGODB_* instead of mongomock"
+    )
+    parser.add_argument("--one", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.one:
+        _run_one(args)
+        return
+
+    print(
+        f"{'mode':>12} {'rows':>8} {'seconds':>8} {'rows/s':>8} "
+        f"{'peak RSS MB':>12} {'result KB':>10}"
+    )
+    for chunk in dict.fromkeys((0, args.chunk_size)):
+        cmd = [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_pipeline",
+            "--one",
+            "-n",
+            str(args.n),
+            "--authors",
+            str(args.authors),
+            "--chunk-size",
+            str(chunk),
+        ]
+        out = subprocess.run(
+            cmd + (["--real-mongo"] if args.real_mongo else []),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        mode = f"chunk {chunk}" if chunk else "whole frame"
+        print(
+            f"{mode:>12} {r['rows']:8d} {r['seconds']:8.1f} {r['rows'] / r['seconds']:8,.0f} "
+            f"{r['peak_rss_mb']:12.1f} {r['result_kb']:10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
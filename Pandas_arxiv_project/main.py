@@ -1,10 +1,21 @@
 from __future__ import annotations
+
 from usecases.pandas_pipeline import run_arxiv_pipeline
-from usecases.search_mongodb import search_text
+from usecases.search_mongodb import hybrid_search, search_text
+from usecases.vector_search import open_index, search_similar
+
 
 def main() -> None:
     print("=== API-driven pipeline (pandas + ArXiv) ===")
-    result = run_arxiv_pipeline("transformer OR residual OR BERT", max_results=10)
+    index = open_index()
+    result = run_arxiv_pipeline(
+        "transformer OR residual OR BERT", max_results=10, vector_index=index
+    )
+    counts = result.mariadb_counts
+    print(
+        f"MariaDB: {counts['inserted']} inserted, {counts['updated']} updated, "
+        f"{counts['skipped']} unchanged"
+    )
     print(f"Inserted into MongoDB: {result.inserted_mongo}")
     print("DataFrame ID columns:", [c for c in result.df.columns if c.endswith("_id")])
 
@@ -12,5 +23,14 @@ def main() -> None:
     for title, score in search_text("Transformer OR Residual OR BERT"):
         print(f"- {title} (score={score:.3f})")
 
+    print("\n=== Similar articles (local vector index) ===")
+    for title, score in search_similar("attention is all you need", k=3, index=index):
+        print(f"- {title} (score={score:.3f})")
+
+    print("\n=== Hybrid text + vector search ===")
+    for title, score in hybrid_search("transformer attention", limit=3, index=index):
+        print(f"- {title} (score={score:.4f})")
+
+
 if __name__ == "__main__":
     main()
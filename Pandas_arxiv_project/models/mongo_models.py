@@ -1,13 +1,48 @@
 from __future__ import annotations
-from mongoengine import (
-    Document, EmbeddedDocument, EmbeddedDocumentField, StringField,
-    ListField, FloatField, IntField
-)
+
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from mongoengine import Document, EmbeddedDocument, EmbeddedDocumentField, IntField, StringField
+from mongoengine.base import BaseField
+
+from models.embedding_codec import decode_embedding, encode_embedding
+
+
+class EmbeddingField(BaseField):
+    """List of doubles or packed BSON binary (`models/embedding_codec.py`).
+
+    Reads decode either form; writes use `EMBEDDING_FORMAT`.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs.setdefault("default", list)
+        super().__init__(**kwargs)
+
+    def to_python(self, value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray)):
+            decoded = decode_embedding(value)
+            return [] if decoded is None else decoded.tolist()
+        return value
+
+    def to_mongo(self, value: Any) -> Any:
+        return encode_embedding(value) if value is not None and len(value) else value
+
+    def validate(self, value: Any) -> None:
+        if isinstance(value, (bytes, bytearray)):
+            return
+        try:
+            np.asarray(value, dtype=np.float64)
+        except (TypeError, ValueError):
+            self.error("embedding must be a sequence of numbers or packed binary")
+
 
 class AuthorEmbedded(EmbeddedDocument):
     full_name: StringField = StringField(required=True, max_length=255)
     title: StringField = StringField(required=False, max_length=255)
 
+
 class ScientificArticleDoc(Document):
     title: StringField = StringField(required=True, max_length=512)
     summary: StringField = StringField(required=True, max_length=2048)
@@ -15,8 +50,16 @@ class ScientificArticleDoc(Document):
     arxiv_id: StringField = StringField(required=True, max_length=64)
     author: EmbeddedDocumentField = EmbeddedDocumentField(AuthorEmbedded, required=True)
     text: StringField = StringField(required=True)
-    embedding: ListField = ListField(FloatField(), default=list)
+    embedding: EmbeddingField = EmbeddingField()
     author_id: IntField = IntField()
     article_id: IntField = IntField()
 
-    meta = { "collection": "scientific_articles", "indexes": [{"fields": ["$text"]}] }
+    # raw-dict writers (BulkMongoWriter.add_raw) encode and readers decode with these
+    encode_embedding = staticmethod(encode_embedding)
+    decode_embedding = staticmethod(decode_embedding)
+
+    @property
+    def vector(self) -> npt.NDArray[np.float32] | None:
+        return decode_embedding(self.embedding)
+
+    meta = {"collection": "scientific_articles", "indexes": [{"fields": ["$text"]}, "arxiv_id"]}
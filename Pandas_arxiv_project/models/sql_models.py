@@ -1,17 +1,20 @@
 from __future__ import annotations
-from typing import List, Optional
+
 from sqlalchemy import ForeignKey, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+
 class Base(DeclarativeBase):
     pass
 
+
 class Author(Base):
     __tablename__ = "authors"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     full_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
-    title: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
-    articles: Mapped[List["ScientificArticle"]] = relationship(back_populates="author")
+    title: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    articles: Mapped[list[ScientificArticle]] = relationship(back_populates="author")
+
 
 class ScientificArticle(Base):
     __tablename__ = "scientific_articles"
@@ -19,6 +22,8 @@ class ScientificArticle(Base):
     title: Mapped[str] = mapped_column(String(512), nullable=False)
     summary: Mapped[str] = mapped_column(String(2048), nullable=False)
     file_path: Mapped[str] = mapped_column(String(512), nullable=False, default="")
-    arxiv_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    arxiv_id: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    # Re-loads skip unchanged rows.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     author_id: Mapped[int] = mapped_column(ForeignKey("authors.id"), nullable=False)
     author: Mapped[Author] = relationship(back_populates="articles")
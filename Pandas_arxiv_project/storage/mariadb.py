@@ -1,10 +1,24 @@
 from __future__ import annotations
+
 import os
-from typing import Generator
+import threading
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+from functools import cache
+from typing import Any
+
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import Insert
+
 from models.sql_models import Base
 
+_init_lock = threading.Lock()
+_db_initialized = False
+
+
 def mariadb_url_from_env() -> str:
     dsn = os.getenv("MARIADB_DSN")
     if dsn:
@@ -16,14 +30,75 @@ def mariadb_url_from_env() -> str:
     db = os.getenv("MARIADB_DATABASE", "articles_db")
     return f"mysql+pymysql://{user}:{pwd}@{host}:{port}/{db}?charset=utf8mb4"
 
-def get_engine(echo: bool = False):
-    return create_engine(mariadb_url_from_env(), echo=echo, pool_pre_ping=True)
+
+def pool_options_from_env(url: str) -> dict[str, Any]:
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("MARIADB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("MARIADB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(os.getenv("MARIADB_POOL_RECYCLE", "3600")),
+    }
+
+
+@cache
+def get_engine(echo: bool = False) -> Engine:
+    url = mariadb_url_from_env()
+    return create_engine(url, echo=echo, pool_pre_ping=True, **pool_options_from_env(url))
+
+
+@cache
+def _session_factory() -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False)
+
 
 def init_db() -> None:
-    engine = get_engine()
-    Base.metadata.create_all(engine)
+    global _db_initialized
+    with _init_lock:
+        if not _db_initialized:
+            Base.metadata.create_all(get_engine())
+            _db_initialized = True
+
 
+@contextmanager
 def get_session() -> Generator[Session, None, None]:
-    SessionLocal = sessionmaker(bind=get_engine(), autoflush=False, autocommit=False)
-    with SessionLocal() as session:
+    with _session_factory()() as session:
         yield session
+
+
+def upsert_statement(
+    session: Session, model: Any, key: str, update_columns: Iterable[str], **extra_set: Any
+) -> Insert:
+    """Bulk upsert on the unique column `key`; run it with a list of dicts.
+
+    ON DUPLICATE KEY UPDATE on MariaDB/MySQL, ON CONFLICT DO UPDATE on SQLite; other
+    dialects are not supported and raise `ValueError`. `update_columns` take the incoming
+    values.
+    """
+    dialect = session.get_bind().dialect.name
+    columns = list(update_columns)
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(model)
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in columns} | extra_set)
+    if dialect == "sqlite":
+        stmt = sqlite.insert(model)
+        return stmt.on_conflict_do_update(
+            index_elements=[key], set_={c: stmt.excluded[c] for c in columns} | extra_set
+        )
+    raise ValueError(f"no bulk upsert for the {dialect!r} dialect; use mysql/mariadb or sqlite")
+
+
+def dispose_engine(close: bool = True) -> None:
+    """Drop pooled connections; forked workers call dispose_engine(close=False) first."""
+    global _db_initialized
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=close)
+    if close:
+        get_engine.cache_clear()
+        _session_factory.cache_clear()
+        with _init_lock:
+            _db_initialized = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: dispose_engine(close=False))
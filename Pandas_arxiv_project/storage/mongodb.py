@@ -1,6 +1,19 @@
 from __future__ import annotations
+
 import os
-from mongoengine import connect
+import threading
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pymongo import MongoClient
+    from pymongo.collection import Collection
+
+# ScientificArticleDoc.meta["collection"], without importing the models.
+ARTICLES_COLLECTION = "scientific_articles"
+_connect_lock = threading.Lock()
+_connected = False
+_client: MongoClient[dict[str, Any]] | None = None
+
 
 def mongo_url_from_env() -> str:
     dsn = os.getenv("MONGODB_DSN")
@@ -15,5 +28,60 @@ def mongo_url_from_env() -> str:
         return f"mongodb://{user}:{pwd}@{host}:{port}/{db}"
     return f"mongodb://{host}:{port}/{db}"
 
-def init_mongo() -> None:
-    connect(host=mongo_url_from_env(), uuidRepresentation="standard")
+
+def _client_options() -> dict[str, Any]:
+    return {
+        "uuidRepresentation": "standard",
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_MS", "300000")),
+    }
+
+
+def init_mongo(**connect_options: Any) -> None:
+    """Connect once per process; later calls return immediately.
+
+    `connect_options` override the env-derived client options, e.g.
+    `mongo_client_class=mongomock.MongoClient` for benchmarks and tests.
+    """
+    global _connected
+    if _connected:
+        return
+    with _connect_lock:
+        if not _connected:
+            from mongoengine import connect
+
+            connect(host=mongo_url_from_env(), **(_client_options() | connect_options))
+            _connected = True
+
+
+def mongo_collection(name: str) -> Collection[dict[str, Any]]:
+    """Raw pymongo collection for readers.
+
+    The mongoengine connection's after init_mongo(), else a plain pymongo client
+    opened on first use (search never imports mongoengine or the models).
+    """
+    global _client
+    if _connected:
+        from mongoengine.connection import get_db
+
+        return get_db()[name]  # type: ignore[no-any-return]
+    with _connect_lock:
+        if _client is None:
+            from pymongo import MongoClient
+
+            _client = MongoClient(mongo_url_from_env(), **_client_options())
+    return _client.get_default_database("test")[name]  # "test": mongoengine's default too
+
+
+def dispose_mongo() -> None:
+    """Close the client so the next init_mongo() reconnects (e.g. in forked workers)."""
+    global _connected, _client
+    with _connect_lock:
+        if _connected:
+            from mongoengine import disconnect
+
+            disconnect()
+            _connected = False
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def mariadb(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """A fresh SQLite database behind `storage.mariadb` for one test."""
+    from storage.mariadb import dispose_engine
+
+    monkeypatch.setenv("MARIADB_DSN", f"sqlite:///{tmp_path / 'articles.db'}")
+    dispose_engine()
+    yield
+    dispose_engine()
+
+
+@pytest.fixture
+def mongo() -> Iterator[None]:
+    """mongomock behind `storage.mongodb`, emptied after each test."""
+    mongomock = pytest.importorskip("mongomock")
+    from mongoengine.connection import get_db
+
+    from storage.mongodb import init_mongo
+
+    init_mongo(mongo_client_class=mongomock.MongoClient)
+    yield
+    db = get_db()
+    for name in db.list_collection_names():
+        db[name].delete_many({})
+
+
+@pytest.fixture
+def articles() -> Callable[..., pd.DataFrame]:
+    """A harvested-style frame; fields a row omits are derived from its `arxiv_id`."""
+
+    def frame(rows: list[dict[str, str]]) -> pd.DataFrame:
+        return pd.DataFrame(
+            [
+                {
+                    "title": f"Title {row['arxiv_id']}",
+                    "summary": f"Summary of {row['arxiv_id']}",
+                    "file_path": f"https://arxiv.org/pdf/{row['arxiv_id']}",
+                    "author_full_name": "Ada Lovelace",
+                    "author_title": "",
+                }
+                | row
+                for row in rows
+            ]
+        )
+
+    return frame
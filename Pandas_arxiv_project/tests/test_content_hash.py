@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pandas as pd
+import pytest
+from sqlalchemy import select
+
+import usecases.pandas_pipeline as pipeline
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import ScientificArticle
+from storage.mariadb import get_session
+from usecases.pandas_pipeline import (
+    load_counts,
+    load_df_to_mariadb,
+    send_changed_to_mongodb,
+    stored_unchanged,
+)
+
+pytestmark = pytest.mark.usefixtures("mariadb")
+
+ROWS = [{"arxiv_id": f"2401.{i:05d}"} for i in range(20)]
+
+
+def _hashes() -> dict[str, str | None]:
+    with get_session() as s:
+        stmt = select(ScientificArticle.arxiv_id, ScientificArticle.content_hash)
+        return {arxiv_id: h for arxiv_id, h in s.execute(stmt)}
+
+
+def test_reload_skips_unchanged_rows(articles: Callable[..., pd.DataFrame]) -> None:
+    assert load_counts(load_df_to_mariadb(articles(ROWS))) == {
+        "inserted": 20,
+        "updated": 0,
+        "skipped": 0,
+    }
+    before = _hashes()
+
+    again = load_df_to_mariadb(articles(ROWS))
+
+    assert load_counts(again) == {"inserted": 0, "updated": 0, "skipped": 20}
+    assert again["article_id"].notna().all()
+    assert _hashes() == before
+
+
+def test_only_changed_rows_are_updated(articles: Callable[..., pd.DataFrame]) -> None:
+    load_df_to_mariadb(articles(ROWS))
+    changed = [dict(r) for r in ROWS]
+    changed[2]["summary"] = "A corrected summary"
+    changed[5]["author_full_name"] = "Grace Hopper"
+    df = articles(changed)
+
+    assert stored_unchanged(df).tolist() == [i not in (2, 5) for i in range(20)]
+    loaded = load_df_to_mariadb(df)
+
+    assert load_counts(loaded) == {"inserted": 0, "updated": 2, "skipped": 18}
+    assert loaded["arxiv_id"][loaded["load_status"] == "updated"].tolist() == [
+        "2401.00002",
+        "2401.00005",
+    ]
+
+
+@pytest.mark.usefixtures("mongo")
+def test_rows_lost_between_the_stores_are_resent(
+    articles: Callable[..., pd.DataFrame], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def unavailable(*args: object, **kwargs: object) -> int:
+        raise RuntimeError("MongoDB unavailable")
+
+    loaded = load_df_to_mariadb(articles(ROWS), record_hashes=False)
+    monkeypatch.setattr(pipeline, "load_df_to_mongodb", unavailable)
+    with pytest.raises(RuntimeError):
+        send_changed_to_mongodb(loaded)
+    monkeypatch.undo()
+    assert set(_hashes().values()) == {None}
+
+    rerun = load_df_to_mariadb(articles(ROWS), record_hashes=False)
+
+    assert load_counts(rerun) == {"inserted": 0, "updated": 20, "skipped": 0}
+    assert send_changed_to_mongodb(rerun) == 20
+    assert ScientificArticleDoc.objects.count() == 20
+    assert None not in _hashes().values()
+
+    third = load_df_to_mariadb(articles(ROWS), record_hashes=False)
+
+    assert load_counts(third) == {"inserted": 0, "updated": 0, "skipped": 20}
+    assert send_changed_to_mongodb(third) == 0
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+
+from models.sql_models import Author, ScientificArticle
+from storage.mariadb import get_session
+from usecases.pandas_pipeline import load_counts, load_df_to_mariadb
+
+pytestmark = pytest.mark.usefixtures("mariadb")
+
+
+def _stored() -> dict[str, tuple[int, int, str]]:
+    """arxiv_id -> (article id, author id, title)."""
+    stmt = select(
+        ScientificArticle.arxiv_id,
+        ScientificArticle.id,
+        ScientificArticle.author_id,
+        ScientificArticle.title,
+    )
+    with get_session() as s:
+        return {a: (i, au, t) for a, i, au, t in s.execute(stmt)}
+
+
+def _authors() -> int:
+    with get_session() as s:
+        return int(s.scalar(select(func.count()).select_from(Author)) or 0)
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 5000])
+def test_attaches_the_stored_ids_to_every_row(
+    articles: Callable[..., pd.DataFrame], batch_size: int
+) -> None:
+    rows = [{"arxiv_id": f"2401.{i:05d}", "author_full_name": f"Author {i % 3}"} for i in range(8)]
+
+    df = load_df_to_mariadb(articles(rows), batch_size=batch_size)
+
+    stored = _stored()
+    assert len(stored) == 8
+    assert _authors() == 3
+    assert df["article_id"].tolist() == [stored[a][0] for a in df["arxiv_id"]]
+    assert df["author_id"].tolist() == [stored[a][1] for a in df["arxiv_id"]]
+    assert df["author_id"].nunique() == 3
+
+
+def test_reuses_stored_authors_and_folds_case(articles: Callable[..., pd.DataFrame]) -> None:
+    load_df_to_mariadb(articles([{"arxiv_id": "2401.00001", "author_full_name": "Ada Lovelace"}]))
+
+    df = load_df_to_mariadb(
+        articles(
+            [
+                # Stored names match exactly on SQLite (case-insensitively on MariaDB);
+                # within a frame, case variants fold onto the first spelling.
+                {"arxiv_id": "2401.00002", "author_full_name": "Ada Lovelace"},
+                {"arxiv_id": "2401.00003", "author_full_name": "ADA LOVELACE"},
+                {"arxiv_id": "2401.00004", "author_full_name": "Grace Hopper"},
+            ]
+        )
+    )
+
+    assert _authors() == 2
+    assert df["author_id"].tolist()[:2] == [_stored()["2401.00001"][1]] * 2
+
+
+def test_the_last_duplicate_wins_and_earlier_ones_get_its_ids(
+    articles: Callable[..., pd.DataFrame],
+) -> None:
+    df = articles(
+        [
+            {"arxiv_id": "2401.00001", "title": "Draft"},
+            {"arxiv_id": "2401.00002"},
+            {"arxiv_id": "2401.00001", "title": "Final"},
+        ]
+    )
+
+    loaded = load_df_to_mariadb(df)
+
+    assert loaded["load_status"].tolist() == ["skipped", "inserted", "inserted"]
+    assert _stored()["2401.00001"][2] == "Final"
+    assert loaded["article_id"].iloc[0] == loaded["article_id"].iloc[2]
+
+
+def test_a_repeated_index_is_loaded_positionally(articles: Callable[..., pd.DataFrame]) -> None:
+    df = articles([{"arxiv_id": f"2401.{i:05d}"} for i in range(4)])
+    df.index = [0, 0, 1, 1]
+
+    loaded = load_df_to_mariadb(df)
+
+    assert load_counts(loaded) == {"inserted": 4, "updated": 0, "skipped": 0}
+    assert loaded["article_id"].is_unique
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import http.client
+import random
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Protocol, TypeVar
+
+from usecases.html_text import ABSTRACT, HtmlTextSink
+
+T = TypeVar("T")
+R = TypeVar("R")
+S = TypeVar("S", bound="ByteSink")
+
+ATOM_NS = {"a": "http://www.w3.org/2005/Atom"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CHUNK_SIZE = 16 * 1024
+DRAIN_LIMIT = 4 * CHUNK_SIZE  # unread body read out to keep the connection; larger ones drop it
+
+
+class ByteSink(Protocol):
+    def feed(self, chunk: bytes) -> bool:
+        """Consume a body chunk; return False to stop reading."""
+
+
+@dataclass
+class HarvestConfig:
+    api_url: str = "http://export.arxiv.org/api/query"
+    abs_url: str = "https://arxiv.org/abs/"
+    page_size: int = 100
+    concurrency: int = 8
+    rate_per_sec: float = 4.0  # abstract pages, shared across all threads
+    api_rate_per_sec: float = 1 / 3  # api_url requests; arXiv asks for one call every 3 seconds
+    retries: int = 3
+    backoff: float = 1.0
+    timeout: float = 20.0
+    user_agent: str = "pandas-arxiv-pipeline/0.1"
+
+
+class RateLimiter:
+    """Space requests at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate_per_sec: float) -> None:
+        self._interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HttpError(Exception):
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"GET {url} -> HTTP {status}")
+        self.status = status
+
+
+class _RetryAfter(Exception):
+    def __init__(self, url: str, status: int, seconds: float) -> None:
+        super().__init__(url, status, seconds)
+        self.url = url
+        self.status = status
+        self.seconds = seconds
+
+
+def _retry_after_seconds(value: str | None) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _drained(resp: http.client.HTTPResponse) -> bool:
+    """Read out the rest of `resp` if it is at most `DRAIN_LIMIT` bytes; True once it is done."""
+    if resp.length is not None and resp.length > DRAIN_LIMIT:  # None: chunked, size unknown
+        return False
+    budget = DRAIN_LIMIT
+    while budget > 0 and not resp.isclosed():
+        chunk = resp.read(min(budget, CHUNK_SIZE))
+        if not chunk:
+            break
+        budget -= len(chunk)
+    return resp.isclosed()
+
+
+class HttpClient:
+    """Keep-alive GET client: one persistent connection per host per thread.
+
+    Requests go through a shared `RateLimiter`: `api_url` requests through one
+    at `api_rate_per_sec`, everything else through one at `rate_per_sec`.
+    Connection errors and 429/5xx responses are retried with exponential
+    backoff (honouring Retry-After).
+    `map()` runs on a long-lived pool of `config.concurrency` threads so their
+    connections are reused from one batch to the next.
+    """
+
+    def __init__(self, config: HarvestConfig | None = None) -> None:
+        self.config = config or HarvestConfig()
+        self._limiter = RateLimiter(self.config.rate_per_sec)
+        self._api_limiter = RateLimiter(self.config.api_rate_per_sec)
+        self._local = threading.local()
+        self._all: list[http.client.HTTPConnection] = []
+        self._all_lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> HttpClient:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        with self._all_lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.config.concurrency)
+        return list(self._pool.map(fn, items))
+
+    def _conn(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        conns = self._thread_conns()
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(netloc, timeout=self.config.timeout)
+            conns[(scheme, netloc)] = conn
+            with self._all_lock:
+                self._all.append(conn)
+        return conn
+
+    def _thread_conns(self) -> dict[tuple[str, str], http.client.HTTPConnection]:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        return conns  # type: ignore[no-any-return]
+
+    def _drop(self, scheme: str, netloc: str) -> None:
+        conn = self._thread_conns().pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+            with self._all_lock:
+                self._all.remove(conn)
+
+    def get(self, url: str, max_redirects: int = 5) -> bytes:
+        return self._with_retries(lambda: self._get_once(url, max_redirects))
+
+    def get_streamed(self, url: str, new_sink: Callable[[], S], max_redirects: int = 5) -> S:
+        """GET `url` and feed the 200 body to a sink in `CHUNK_SIZE` pieces as it arrives.
+
+        Each attempt gets a fresh sink from `new_sink`, so a retry never sees a
+        partial body. If the sink stops early, up to `DRAIN_LIMIT` bytes of the
+        rest are read out so the connection can be reused; it is dropped only
+        when more is left.
+        """
+        def attempt() -> S:
+            sink = new_sink()
+            self._get_once(url, max_redirects, sink)
+            return sink
+
+        return self._with_retries(attempt)
+
+    def _with_retries(self, fn: Callable[[], R]) -> R:
+        last_error: Exception | None = None
+        for attempt in range(self.config.retries + 1):
+            if attempt:
+                delay = self.config.backoff * 2 ** (attempt - 1)
+                if isinstance(last_error, _RetryAfter):
+                    delay = max(delay, last_error.seconds)
+                time.sleep(delay * (1 + random.random() * 0.1))
+            try:
+                return fn()
+            except (OSError, http.client.HTTPException, _RetryAfter) as exc:
+                last_error = exc
+        if isinstance(last_error, _RetryAfter):
+            raise HttpError(last_error.url, last_error.status) from None
+        assert last_error is not None
+        raise last_error
+
+    def _get_once(self, url: str, max_redirects: int, sink: ByteSink | None = None) -> bytes:
+        status = 0
+        limiter = self._api_limiter if url.startswith(self.config.api_url) else self._limiter
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            limiter.wait()
+            conn = self._conn(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers={"User-Agent": self.config.user_agent})
+                resp = conn.getresponse()
+                if sink is not None and resp.status == 200:
+                    while chunk := resp.read(CHUNK_SIZE):
+                        if not sink.feed(chunk):
+                            if not _drained(resp) or resp.will_close:
+                                self._drop(parts.scheme, parts.netloc)
+                            return b""
+                    body = b""
+                else:
+                    body = resp.read()
+            except (OSError, http.client.HTTPException):
+                self._drop(parts.scheme, parts.netloc)
+                raise
+            if resp.will_close:
+                self._drop(parts.scheme, parts.netloc)
+            status = resp.status
+            if status == 200:
+                return body
+            if status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                url = urllib.parse.urljoin(url, resp.getheader("Location", ""))
+                continue
+            if status in RETRY_STATUSES:
+                raise _RetryAfter(url, status, _retry_after_seconds(resp.getheader("Retry-After")))
+            raise HttpError(url, status)
+        raise HttpError(url, status)  # too many redirects
+
+
+# ---------- arXiv API paging ----------
+def parse_feed(xml: bytes) -> list[dict[str, str]]:
+    root = ET.fromstring(xml)
+    rows: list[dict[str, str]] = []
+    for e in root.findall("a:entry", ATOM_NS):
+        author = e.find("a:author", ATOM_NS)
+        rows.append({
+            "title": (e.findtext("a:title", default="", namespaces=ATOM_NS) or "").strip(),
+            "summary": (e.findtext("a:summary", default="", namespaces=ATOM_NS) or "").strip(),
+            "file_path": "",
+            "arxiv_id": (e.findtext("a:id", default="", namespaces=ATOM_NS) or "")
+                .rsplit("/", 1)[-1].strip(),
+            "author_full_name": (author.findtext("a:name", default="", namespaces=ATOM_NS) or "")
+                .strip() if author is not None else "",
+            "author_title": "",
+        })
+    return rows
+
+
+def harvest_pages(
+    client: HttpClient, query: str, max_results: int
+) -> Iterator[list[dict[str, str]]]:
+    """Page through the arXiv API (`start`/`max_results`) until `max_results` or the end."""
+    cfg = client.config
+    start = 0
+    while start < max_results:
+        size = min(cfg.page_size, max_results - start)
+        url = cfg.api_url + "?" + urllib.parse.urlencode(
+            {"search_query": f"all:{query}", "start": start, "max_results": size,
+             "sortBy": "relevance"}
+        )
+        page = parse_feed(client.get(url))
+        if page:
+            yield page
+        if len(page) < size:
+            return
+        start += size
+
+
+# ---------- abstract pages ----------
+def fetch_abstract_texts(
+    client: HttpClient, arxiv_ids: Iterable[str], target: tuple[str, str] | None = ABSTRACT
+) -> list[str]:
+    """Text of each abstract page, extracted while it streams in (in input order).
+
+    Only text is kept, never the page. With the default `target` just the
+    abstract block is extracted and the download stops once it closes;
+    `target=None` keeps the whole page's text. Failures become "".
+    """
+    def _fetch(arxiv_id: str) -> str:
+        try:
+            url = client.config.abs_url + arxiv_id
+            return client.get_streamed(url, lambda: HtmlTextSink(target)).close()
+        except Exception:
+            return ""
+
+    return client.map(_fetch, arxiv_ids)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import codecs
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+# arXiv abstract pages:
+#   <blockquote class="abstract mathjax"><span class="descriptor">Abstract:</span> ...
+ABSTRACT = ("blockquote", "abstract")
+_SKIP = {"script", "style"}
+_LABEL_CLASS = "descriptor"  # the "Abstract:" label inside the target block
+_SEEK_TAIL = 1024  # chars kept between chunks while scanning for the target's start tag
+
+# Whole-page mode: comments, script/style elements and tags, in the legacy regex's terms. Only `<`
+# followed by a letter, `/`, `!` or `?` opens a tag, so a bare `<` in text is kept as text (as
+# html.parser does).
+_MARKUP = r"<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>|<(?!!--|(?:script|style)\b)[a-z/!?][^>]*>"
+_STRIP = re.compile(_MARKUP, re.I | re.S)
+_STRIP_FINAL = re.compile(_MARKUP + r"|<!--.*|<(?:script|style)\b.*", re.I | re.S)  # + unclosed
+_BLOCK_START = re.compile(r"<(?:!--|(script|style)\b)", re.I)
+_BLOCK_END = {
+    None: re.compile("-->"),
+    "script": re.compile(r"</script\s*>", re.I),
+    "style": re.compile(r"</style\s*>", re.I),
+}
+_TAG_TAIL = re.compile(r"<(?:[a-z/!?][^>]*)?\Z", re.I)  # a tag (or a `<`) cut off at the end
+
+
+class _TargetClosed(Exception):
+    """Raised from a handler to abandon the rest of the input once the target has closed."""
+
+
+class HtmlTextExtractor(HTMLParser):
+    """Incremental HTML -> text: feed decoded chunks, keep only text.
+
+    Whitespace is collapsed to single spaces, entities are decoded, and
+    `<script>`/`<style>` bodies are dropped. With `target=(tag, css_class)` only
+    the text inside the first such element is kept (minus its `descriptor`
+    label). Input before that element's start tag is skipped with a plain
+    regex scan instead of being parsed. `done` turns true once the element
+    closes, so the caller can stop reading. The raw page is never buffered
+    beyond the parser's look-ahead. Whole pages are faster through
+    `_TagStripper`, which `HtmlTextSink` and `html_to_text` use without a target.
+    """
+
+    def __init__(self, target: tuple[str, str] | None = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self._target = target
+        self._parts: list[str] = []
+        self._skip_tag: str | None = None  # open script/style element (or the target's label)
+        self._skip_depth = 0
+        self._depth = 0 if target else 1  # >0 while inside the target element
+        self.done = False
+        self._seek: str | None = None
+        if target:
+            tag, css_class = map(re.escape, target)
+            self._seek = ""
+            self._start = re.compile(
+                rf"<{tag}\b[^>]*\bclass\s*=\s*[\"']?[^\"'>]*\b{css_class}\b", re.I
+            )
+
+    def feed(self, data: str) -> None:
+        if self._seek is not None:
+            data = self._seek + data
+            match = self._start.search(data)
+            if match is None:
+                self._seek = data[-_SEEK_TAIL:]
+                return
+            self._seek = None
+            data = data[match.start() :]
+        if self.done:
+            return
+        try:
+            super().feed(data)
+        except _TargetClosed:
+            self.rawdata = ""  # drop the unparsed remainder
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.done:
+            return
+        self._gap()
+        if self._skip_tag:
+            self._skip_depth += tag == self._skip_tag
+            return
+        classes = (dict(attrs).get("class") or "").split()
+        if self._target and tag == self._target[0]:
+            if not self._depth and self._target[1] in classes:
+                self._depth = 1
+                return
+            self._depth += bool(self._depth)
+        if tag in _SKIP or (self._target and self._depth and _LABEL_CLASS in classes):
+            self._skip_tag, self._skip_depth = tag, 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.done:
+            return
+        self._gap()
+        if self._skip_tag:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if not self._skip_depth:
+                    self._skip_tag = None
+            return
+        if self._target and self._depth and tag == self._target[0]:
+            self._depth -= 1
+            if not self._depth:
+                self.done = True
+                raise _TargetClosed
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if not self.done:
+            self._gap()
+
+    def handle_comment(self, data: str) -> None:
+        if not self.done:
+            self._gap()
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+    def _gap(self) -> None:
+        # A tag separates words, as the old regex's " " replacement did; one per run is enough.
+        if self._depth and not self._skip_tag and self._parts and self._parts[-1] != " ":
+            self._parts.append(" ")
+
+    def handle_data(self, data: str) -> None:
+        if self._depth and not self._skip_tag and not self.done:
+            self._parts.append(data)
+
+    def text(self) -> str:
+        """Everything kept so far, whitespace-collapsed."""
+        return " ".join("".join(self._parts).split())
+
+
+class _TagStripper:
+    """Whole-page HTML -> text with one regex pass per chunk instead of a parser callback per tag.
+
+    Same output as `HtmlTextExtractor(None)` on well-formed pages: markup becomes a space,
+    `<script>`/`<style>` bodies and comments are dropped, entities are decoded and whitespace
+    is collapsed. A tag, comment or script/style element cut by a chunk boundary is held back
+    until its end arrives; one that never ends is dropped.
+    """
+
+    done = False  # the whole page is always read
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._pending = ""
+
+    def feed(self, data: str) -> None:
+        data = self._pending + data
+        end = self._complete(data)
+        self._parts.append(_STRIP.sub(" ", data[:end]))
+        self._pending = data[end:]
+
+    @staticmethod
+    def _complete(data: str) -> int:
+        # Length of the prefix of `data` that holds no unfinished comment, script/style or tag.
+        pos = 0
+        while start := _BLOCK_START.search(data, pos):
+            tag = start[1] and start[1].lower()
+            block_end = _BLOCK_END[tag].search(data, start.end())
+            if block_end is None:
+                return start.start()
+            pos = block_end.end()
+        last = data.rfind("<", pos)
+        return last if last >= 0 and _TAG_TAIL.match(data, last) else len(data)
+
+    def close(self, data: str = "") -> None:
+        """Strip the held-back tail (plus `data`) as the end of the page."""
+        rest, self._pending = self._pending + data, ""
+        self._parts.append(_STRIP_FINAL.sub(" ", rest))
+
+    def text(self) -> str:
+        return " ".join(unescape("".join(self._parts)).split())
+
+
+def _extractor(target: tuple[str, str] | None) -> HtmlTextExtractor | _TagStripper:
+    return HtmlTextExtractor(target) if target else _TagStripper()
+
+
+class HtmlTextSink:
+    """Byte-level front end for `HtmlTextExtractor` (used by `HttpClient.get_streamed`)."""
+
+    def __init__(self, target: tuple[str, str] | None = None, encoding: str = "utf-8") -> None:
+        self._decoder = codecs.getincrementaldecoder(encoding)("ignore")
+        self._parser = _extractor(target)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume one chunk; returns False once the target has been read completely."""
+        self._parser.feed(self._decoder.decode(chunk))
+        return not self._parser.done
+
+    def close(self) -> str:
+        self._parser.feed(self._decoder.decode(b"", final=True))
+        self._parser.close()
+        return self._parser.text()
+
+
+def html_to_text(html: str, target: tuple[str, str] | None = None) -> str:
+    """Text of an HTML string (or only of the `target` element)."""
+    if target is None:
+        stripper = _TagStripper()
+        stripper.close(html)  # one pass over the whole string
+        return stripper.text()
+    parser = HtmlTextExtractor(target)
+    parser.feed(html)
+    parser.close()
+    return parser.text()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Any
+
+from pymongo import UpdateOne
+
+from models.embedding_codec import (
+    FORMATS,
+    EmbeddingFormat,
+    decode_embedding,
+    embedding_format,
+    encode_embedding,
+)
+from models.mongo_models import ScientificArticleDoc
+from storage.mongodb import init_mongo
+from storage.query_cache import invalidate_all
+
+
+@dataclass
+class MigrationStats:
+    scanned: int = 0
+    converted: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+
+def _bson_size(value: Any) -> int:
+    """Approximate encoded size of an embedding value (array elements carry key + tag)."""
+    if isinstance(value, (bytes, bytearray)):
+        return 4 + 1 + len(value)
+    return 4 + 1 + sum(2 + len(str(i)) + 8 for i in range(len(value)))
+
+
+def migrate_embeddings(
+    fmt: EmbeddingFormat, batch_size: int = 1000, dry_run: bool = False
+) -> MigrationStats:
+    """Rewrite stored embeddings in `fmt` with unordered bulk updates.
+
+    Docs already in `fmt` are skipped, so an interrupted run can be restarted.
+    `int8` is lossy and converting back does not restore precision.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    init_mongo()
+    collection = ScientificArticleDoc._get_collection()
+    cursor = collection.find(
+        {"embedding": {"$exists": True, "$ne": []}}, {"_id": 1, "embedding": 1}
+    ).batch_size(batch_size)
+    stats = MigrationStats()
+    ops: list[UpdateOne] = []
+
+    def flush() -> None:
+        if ops and not dry_run:
+            collection.bulk_write(ops, ordered=False)
+        ops.clear()
+
+    for doc in cursor:
+        stats.scanned += 1
+        current = doc["embedding"]
+        if embedding_format(current) in (None, fmt):
+            continue
+        encoded = encode_embedding(decode_embedding(current), fmt)
+        stats.converted += 1
+        stats.bytes_before += _bson_size(current)
+        stats.bytes_after += _bson_size(encoded)
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"embedding": encoded}}))
+        if len(ops) >= batch_size:
+            flush()
+    flush()
+    if stats.converted and not dry_run:
+        invalidate_all()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert stored article embeddings")
+    parser.add_argument("format", choices=FORMATS, help="target storage format")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="report without writing")
+    args = parser.parse_args()
+    stats = migrate_embeddings(args.format, batch_size=args.batch_size, dry_run=args.dry_run)
+    verb = "Would convert" if args.dry_run else "Converted"
+    print(
+        f"{verb} {stats.converted} of {stats.scanned} embeddings to {args.format}: "
+        f"{stats.bytes_before:,} -> {stats.bytes_after:,} bytes."
+    )
+
+
+if __name__ == "__main__":
+    main()
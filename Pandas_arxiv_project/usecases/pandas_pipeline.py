@@ -1,136 +1,444 @@
 from __future__ import annotations
 
-import hashlib, math, re, urllib.parse, urllib.request, xml.etree.ElementTree as ET
+import hashlib
+import importlib.util
+import warnings
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from html import unescape
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import select
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.orm import Session
 
+from models.mongo_models import ScientificArticleDoc
 from models.sql_models import Author, ScientificArticle
-from models.mongo_models import AuthorEmbedded, ScientificArticleDoc
-from storage.mariadb import get_session, init_db
+from storage.mariadb import get_session, init_db, upsert_statement
+from storage.mongo_writer import BulkMongoWriter
 from storage.mongodb import init_mongo
-
+from storage.vector_index import VectorIndex
+from usecases.arxiv_harvester import HarvestConfig, HttpClient, fetch_abstract_texts, harvest_pages
+from usecases.embedding import embed_batch
+from usecases.html_text import ABSTRACT, html_to_text
+from usecases.metrics import PipelineMetrics, run_metrics
 
 # ---------- helpers ----------
+# Arrow-backed strings when pyarrow is installed (pip install -e '.[parquet]'), else pandas' own.
+STRING = pd.StringDtype("pyarrow") if importlib.util.find_spec("pyarrow") else pd.StringDtype()
+_CATEGORICAL = ("author_full_name", "author_title")  # repeated on every paper of an author
+
+
 def _ensure_string_df(df: pd.DataFrame) -> pd.DataFrame:
-    return df.astype({c: "string" for c in df.columns})
+    # String (python- or pyarrow-backed) and categorical columns are left as-is;
+    # no copy if nothing is cast.
+    casts = {
+        c: STRING
+        for c, t in df.dtypes.items()
+        if not isinstance(t, (pd.StringDtype, pd.CategoricalDtype))
+    }
+    return df.astype(casts) if casts else df
+
+
+def _compact_df(df: pd.DataFrame) -> pd.DataFrame:
+    """`STRING` columns; author columns are categoricals (one copy of each distinct name)."""
+    df = _ensure_string_df(df)
+    casts = {
+        c: "category"
+        for c in _CATEGORICAL
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)
+    }
+    return df.astype(casts) if casts else df
+
+
+def _as_string(s: pd.Series) -> pd.Series:
+    return s.astype(STRING) if isinstance(s.dtype, pd.CategoricalDtype) else s
+
+
+# ---------- arXiv API -> DataFrame (paged; concurrent abstract fetch) ----------
+_COLUMNS = ["title", "summary", "file_path", "arxiv_id", "author_full_name", "author_title"]
+
 
-def _html_to_text(html: str) -> str:
-    t = re.sub(r"<script.*?>.*?</script>|<style.*?>.*?</style>", " ", html, flags=re.S | re.I)
-    t = re.sub(r"<[^>]+>", " ", t)
-    return re.sub(r"\s+", " ", unescape(t)).strip()
+def _frame(rows: list[dict[str, str]]) -> pd.DataFrame:
+    return _compact_df(pd.DataFrame.from_records(rows, columns=_COLUMNS))
 
-def _embed(text: str, dim: int = 128) -> list[float]:
-    vec = [0.0] * dim
-    for tok in re.findall(r"\w+", text.lower()):
-        vec[int.from_bytes(hashlib.sha256(tok.encode()).digest()[:4], "big") % dim] += 1.0
-    n = math.sqrt(sum(v * v for v in vec))
-    return [v / n for v in vec] if n else vec
 
+def fetch_arxiv(
+    query: str, max_results: int = 10, config: HarvestConfig | None = None
+) -> pd.DataFrame:
+    with HttpClient(config) as client:
+        rows = [r for page in harvest_pages(client, query, max_results) for r in page]
+    return _frame(rows)
 
-# ---------- arXiv API -> DataFrame ----------
-def fetch_arxiv(query: str, max_results: int = 10) -> pd.DataFrame:
-    url = "http://export.arxiv.org/api/query?" + urllib.parse.urlencode(
-        {"search_query": f"all:{query}", "start": 0, "max_results": max_results, "sortBy": "relevance"}
+
+def _with_page_text(
+    client: HttpClient, df: pd.DataFrame, abstract_only: bool = True, skip: np.ndarray | None = None
+) -> pd.DataFrame:
+    # Rows flagged in `skip` are not fetched; their page_text is NA.
+    ids = df["arxiv_id"].astype(str).to_numpy(dtype=object)
+    fetch = np.flatnonzero(~skip) if skip is not None else np.arange(len(df))
+    texts = np.full(len(df), pd.NA, dtype=object)
+    texts[fetch] = fetch_abstract_texts(
+        client, ids[fetch].tolist(), ABSTRACT if abstract_only else None
     )
-    with urllib.request.urlopen(url) as r:
-        root = ET.fromstring(r.read())
-    ns = {"a": "http://www.w3.org/2005/Atom"}
-    rows: list[dict[str, str]] = []
-    for e in root.findall("a:entry", ns):
-        rows.append({
-            "title":   (e.findtext("a:title", default="", namespaces=ns) or "").strip(),
-            "summary": (e.findtext("a:summary", default="", namespaces=ns) or "").strip(),
-            "file_path": "",
-            "arxiv_id": (e.findtext("a:id", default="", namespaces=ns) or "").rsplit("/", 1)[-1].strip(),
-            "author_full_name": (e.find("a:author", ns).findtext("a:name", default="", namespaces=ns) or "").strip()
-                if e.find("a:author", ns) is not None else "",
-            "author_title": "",
-        })
-    df = pd.DataFrame.from_records(
-        rows,
-        columns=["title", "summary", "file_path", "arxiv_id", "author_full_name", "author_title"],
+    out = df.copy(deep=False)  # new column only; the caller's columns are shared, not copied
+    out["page_text"] = pd.Series(texts, index=out.index, dtype=STRING)
+    return out
+
+
+def add_page_text(
+    df: pd.DataFrame, config: HarvestConfig | None = None, abstract_only: bool = True
+) -> pd.DataFrame:
+    """Add a `page_text` column: each abstract page's text, extracted while it streams in.
+
+    The HTML is never kept. `abstract_only` keeps just the abstract block; otherwise the whole
+    page's text.
+    """
+    with HttpClient(config) as client:
+        return _with_page_text(client, df, abstract_only)
+
+
+def add_html_content(df: pd.DataFrame, config: HarvestConfig | None = None) -> pd.DataFrame:
+    """Deprecated: add each abstract page's raw HTML as `html_content` ("" on failure).
+
+    Use `add_page_text`, which keeps only the text. The pipeline still accepts this
+    column and converts it with `html_to_page_text`.
+    """
+    warnings.warn(
+        "add_html_content() is deprecated; use add_page_text()", DeprecationWarning, stacklevel=2
     )
-    return _ensure_string_df(df)
 
-def add_html_content(df: pd.DataFrame) -> pd.DataFrame:
     def _fetch_html(arxiv_id: str) -> str:
         try:
-            with urllib.request.urlopen(f"https://arxiv.org/abs/{arxiv_id}", timeout=20) as r:
-                return r.read().decode("utf-8", "ignore")
+            return client.get(client.config.abs_url + arxiv_id).decode("utf-8", "ignore")
         except Exception:
             return ""
-    out = df.copy()
-    out["html_content"] = out["arxiv_id"].apply(_fetch_html).astype("string")
+
+    with HttpClient(config) as client:
+        html = client.map(_fetch_html, df["arxiv_id"].astype(str).tolist())
+    out = df.copy(deep=False)
+    out["html_content"] = pd.Series(html, index=out.index, dtype=STRING)
+    return out
+
+
+def html_to_page_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace a raw `html_content` column (e.g. from a Parquet dump) by its text in `page_text`.
+
+    Rows that already have `page_text` keep it. The HTML is dropped, so it is not carried through
+    the later stages."""
+    if "html_content" not in df.columns:
+        return df
+    current = df["page_text"].tolist() if "page_text" in df.columns else [None] * len(df)
+    texts = [
+        _str_or_empty(t) or _html_text(h) or pd.NA
+        for t, h in zip(current, df["html_content"].tolist(), strict=True)
+    ]
+    out = df.drop(columns="html_content")
+    out["page_text"] = pd.Series(texts, index=out.index, dtype=STRING)
     return out
 
 
-# ---------- MariaDB: DataFrame -> rows (apply) ----------
-def _upsert_author(s: Session, name: str, title: str) -> int:
-    a = s.scalar(select(Author).where(Author.full_name == name.strip()))
-    if a:
-        return int(a.id)
-    a = Author(full_name=name.strip(), title=title or None)
-    s.add(a); s.flush()
-    return int(a.id)
-
-def _insert_article(s: Session, row: pd.Series, author_id: int) -> int:
-    art = ScientificArticle(
-        title=str(row["title"]),
-        summary=str(row["summary"]),
-        file_path=str(row.get("file_path", "") or ""),
-        arxiv_id=str(row["arxiv_id"]),
-        author_id=author_id,
+# ---------- MariaDB: DataFrame -> rows (set-based bulk load) ----------
+_IN_CHUNK = 1000
+
+
+def _existing_authors(s: Session, names: list[str]) -> pd.DataFrame:
+    rows: list[tuple[str, int]] = []
+    for i in range(0, len(names), _IN_CHUNK):
+        stmt = select(Author.full_name, Author.id).where(
+            Author.full_name.in_(names[i : i + _IN_CHUNK])
+        )
+        rows.extend(s.execute(stmt).tuples())
+    found = pd.DataFrame(rows, columns=["full_name", "author_id"])
+    # MariaDB compares names case-insensitively; key on casefold so IN (...) matches map back.
+    found["_key"] = found["full_name"].str.casefold()
+    return found.drop_duplicates("_key")[["_key", "author_id"]]
+
+
+def _insert_returning_ids(
+    s: Session, model: type[Author] | type[ScientificArticle], records: list[dict[str, object]]
+) -> list[int]:
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return [int(i) for i in s.scalars(stmt, records)] if records else []
+
+
+# The fields MariaDB stores, as in the API feed: a re-harvest can be checked before any page
+# is fetched.
+_HASHED = ["title", "summary", "file_path", "author_full_name"]
+LOAD_STATUSES = ["inserted", "updated", "skipped"]
+
+
+def _content_hashes(df: pd.DataFrame) -> list[str]:
+    """SHA-256 per row over the stored fields (`_HASHED`)."""
+    cols = [df[c].fillna("").astype(str).tolist() for c in _HASHED]
+    return [
+        hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+        for parts in zip(*cols, strict=True)
+    ]
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    df = _ensure_string_df(df).copy(
+        deep=False
+    )  # the columns replaced below are new arrays; the rest are shared
+    df["author_full_name"] = _as_string(df["author_full_name"]).fillna("").str.strip()
+    df["file_path"] = df["file_path"].fillna("")
+    return df
+
+
+def _existing_articles(s: Session, arxiv_ids: list[str]) -> pd.DataFrame:
+    cols = (
+        ScientificArticle.arxiv_id,
+        ScientificArticle.id,
+        ScientificArticle.author_id,
+        ScientificArticle.content_hash,
     )
-    s.add(art); s.flush()
-    return int(art.id)
+    rows: list[tuple[str, int, int, str | None]] = []
+    for i in range(0, len(arxiv_ids), _IN_CHUNK):
+        rows.extend(
+            s.execute(
+                select(*cols).where(ScientificArticle.arxiv_id.in_(arxiv_ids[i : i + _IN_CHUNK]))
+            ).tuples()
+        )
+    return pd.DataFrame(rows, columns=["arxiv_id", "article_id", "author_id", "_stored_hash"])
 
-def load_df_to_mariadb(df: pd.DataFrame) -> pd.DataFrame:
+
+def _resolve_authors(s: Session, df: pd.DataFrame, keys: pd.Series) -> np.ndarray:
+    """author_id per row of `df` (`keys`: casefolded names).
+
+    Missing authors are inserted (executemany + RETURNING).
+    """
+    first = ~keys.duplicated().to_numpy()
+    authors = pd.DataFrame(
+        {
+            "_key": keys.to_numpy()[first],
+            "author_full_name": df["author_full_name"].to_numpy()[first],
+            "author_title": _as_string(df["author_title"]).to_numpy()[first],
+        }
+    )
+    known = _existing_authors(s, authors["author_full_name"].tolist())
+    new = authors[~authors["_key"].isin(known["_key"])]
+    new_ids = _insert_returning_ids(
+        s,
+        Author,
+        [
+            {"full_name": name, "title": None if pd.isna(title) or not title else str(title)}
+            for name, title in zip(new["author_full_name"], new["author_title"], strict=True)
+        ],
+    )
+    ids = pd.concat([known, pd.DataFrame({"_key": new["_key"].to_numpy(), "author_id": new_ids})])
+    return (
+        pd.DataFrame({"_key": keys.to_numpy()})
+        .merge(ids, on="_key", how="left", validate="many_to_one")["author_id"]
+        .to_numpy()
+    )
+
+
+def stored_unchanged(df: pd.DataFrame) -> np.ndarray:
+    """True for rows MariaDB already holds with the same `content_hash`.
+
+    One IN (...) query per 1000 ids. `load_df_to_mariadb` would skip these rows, so the pipeline
+    does not fetch their pages.
+    """
     init_db()
-    df = _ensure_string_df(df).copy()
-    author_ids: list[int] = []
-    article_ids: list[int] = []
+    df = _normalized(df)
+    with get_session() as s:
+        known = _existing_articles(s, df["arxiv_id"].dropna().unique().tolist())
+    stored = df["arxiv_id"].map(known.set_index("arxiv_id")["_stored_hash"]).to_numpy(dtype=object)
+    return stored == np.array(_content_hashes(df), dtype=object)
+
+
+def load_df_to_mariadb(
+    df: pd.DataFrame, batch_size: int = 5000, record_hashes: bool = True
+) -> pd.DataFrame:
+    """Idempotent bulk load keyed on `arxiv_id`.
+
+    Attaches author_id/article_id and a `load_status` column. Each row is hashed and compared
+    with the stored `content_hash` (IN (...) queries). Unchanged rows are `skipped` without a
+    write; new and changed rows resolve their authors set-based and are written with bulk
+    INSERT ... ON DUPLICATE KEY UPDATE. Earlier duplicates of an `arxiv_id` in the frame count
+    as skipped.
+
+    With `record_hashes=False` written rows get a NULL `content_hash`, so they keep counting as
+    changed until `record_content_hashes` marks them sent (see `send_changed_to_mongodb`).
+    """
+    init_db()
+    df = _normalized(df)
+    keys = df["author_full_name"].str.casefold()
+    hashes = pd.Series(_content_hashes(df), index=df.index, dtype=object)
     with get_session() as s:
         assert isinstance(s, Session)
-        def proc(row: pd.Series) -> tuple[int, int]:
-            aid = _upsert_author(s, str(row["author_full_name"]), str(row.get("author_title", "") or ""))
-            rid = _insert_article(s, row, aid)
-            return aid, rid
-        for aid, rid in df.apply(proc, axis=1, result_type="reduce").tolist():
-            author_ids.append(int(aid)); article_ids.append(int(rid))
+        known = _existing_articles(s, df["arxiv_id"].dropna().unique().tolist())
+        merged = pd.DataFrame(
+            {"arxiv_id": df["arxiv_id"].to_numpy(), "content_hash": hashes.to_numpy()}
+        ).merge(known, on="arxiv_id", how="left", validate="many_to_one")
+        unchanged = (
+            merged["_stored_hash"].eq(merged["content_hash"]).fillna(False).to_numpy(dtype=bool)
+        )
+        status = np.where(
+            merged["article_id"].isna().to_numpy(),
+            "inserted",
+            np.where(unchanged, "skipped", "updated"),
+        )
+        status[df["arxiv_id"].duplicated(keep="last").to_numpy()] = "skipped"
+        author_ids = np.array(merged["author_id"], dtype=object)
+        article_ids = np.array(merged["article_id"], dtype=object)
+
+        todo_pos = np.flatnonzero(status != "skipped")  # positional: the caller's index may repeat
+        if len(todo_pos):
+            todo = df.iloc[todo_pos]
+            author_ids[todo_pos] = _resolve_authors(s, todo, keys.iloc[todo_pos])
+            articles = todo[["title", "summary", "file_path", "arxiv_id"]].assign(
+                content_hash=hashes.to_numpy()[todo_pos] if record_hashes else None,
+                author_id=author_ids[todo_pos],
+            )
+            stmt = upsert_statement(
+                s,
+                ScientificArticle,
+                "arxiv_id",
+                ["title", "summary", "file_path", "author_id", "content_hash"],
+            )
+            for i in range(0, len(articles), batch_size):
+                s.execute(stmt, articles.iloc[i : i + batch_size].to_dict("records"))
+            ids = _existing_articles(s, todo["arxiv_id"].unique().tolist()).set_index("arxiv_id")
+            by_arxiv = (
+                df["arxiv_id"].map(ids["article_id"]).to_numpy(dtype=object)
+            )  # earlier duplicates too
+            written = ~pd.isna(by_arxiv)
+            article_ids[written] = by_arxiv[written]
+            author_by_arxiv = df["arxiv_id"].map(ids["author_id"]).to_numpy(dtype=object)
+            author_ids[written] = author_by_arxiv[written]
         s.commit()
-    df["author_id"] = pd.Series(author_ids, dtype="Int64")
-    df["article_id"] = pd.Series(article_ids, dtype="Int64")
+    df["author_id"] = pd.array(author_ids, dtype="Int64")
+    df["article_id"] = pd.array(article_ids, dtype="Int64")
+    df["load_status"] = pd.Categorical(status, categories=LOAD_STATUSES)
     return df
 
 
-# ---------- MongoDB: DataFrame -> docs (apply; HTML->text; embedding) ----------
-def load_df_to_mongodb(df: pd.DataFrame) -> int:
+def record_content_hashes(df: pd.DataFrame, batch_size: int = 5000) -> int:
+    """Store the content hash of each row of a loaded frame (one with `article_id`).
+
+    Used after the rows reached MongoDB, so a crash in between leaves them NULL and
+    the next run sends them again.
+    """
+    df = _normalized(df)
+    rows = [
+        {"_id": int(a), "_hash": h}
+        for a, h in zip(df["article_id"].tolist(), _content_hashes(df), strict=True)
+        if not pd.isna(a)
+    ]
+    if not rows:
+        return 0
+    stmt = (
+        update(ScientificArticle)
+        .where(ScientificArticle.id == bindparam("_id"))
+        .values(content_hash=bindparam("_hash"))
+    )
+    with get_session() as s:
+        for i in range(0, len(rows), batch_size):
+            s.connection().execute(stmt, rows[i : i + batch_size])
+        s.commit()
+    return len(rows)
+
+
+def load_counts(df: pd.DataFrame) -> dict[str, int]:
+    """inserted/updated/skipped row counts of a frame returned by `load_df_to_mariadb`."""
+    return {
+        k: int(v)
+        for k, v in df["load_status"].value_counts().reindex(LOAD_STATUSES, fill_value=0).items()
+    }
+
+
+# ---------- MongoDB: DataFrame -> docs (HTML->text; batched embedding; bulk upsert) ----------
+def _str_or_empty(v: object) -> str:
+    return "" if pd.isna(v) else str(v)
+
+
+def _html_text(html: object) -> str:
+    # The abstract block if the page has one, else the whole page's text.
+    return (html_to_text(h, ABSTRACT) or html_to_text(h)) if (h := _str_or_empty(html)) else ""
+
+
+def _doc_text(r: dict[str, object]) -> str:
+    # Streamed `page_text` first, then raw `html_content` (e.g. from a Parquet dump),
+    # then the summary.
+    return (
+        _str_or_empty(r.get("page_text"))
+        or _html_text(r.get("html_content"))
+        or _str_or_empty(r.get("summary"))
+    )
+
+
+def load_df_to_mongodb(
+    df: pd.DataFrame,
+    batch_size: int = 500,
+    vector_index: VectorIndex | None = None,
+    metrics: PipelineMetrics | None = None,
+) -> int:
+    """Upsert docs on `arxiv_id`.
+
+    Acknowledged batches with an `article_id` also go to `vector_index`.
+    """
+    metrics = metrics or PipelineMetrics("load_df_to_mongodb")
     init_mongo()
-    df = _ensure_string_df(df)
-    def proc(row: pd.Series) -> int:
-        html = str(row.get("html_content", "") or "")
-        text = _html_to_text(html) if html else str(row.get("summary", "") or "")
-        doc = ScientificArticleDoc(
-            title=str(row["title"]),
-            summary=str(row["summary"]),
-            file_path=str(row.get("file_path", "") or ""),
-            arxiv_id=str(row["arxiv_id"]),
-            author=AuthorEmbedded(
-                full_name=str(row.get("author_full_name", "") or ""),
-                title=str(row.get("author_title", "") or ""),
-            ),
-            text=text,
-            embedding=_embed(text),
-        )
-        if "author_id" in row and pd.notna(row["author_id"]): doc.author_id = int(row["author_id"])
-        if "article_id" in row and pd.notna(row["article_id"]): doc.article_id = int(row["article_id"])
-        doc.save()
-        return 1
-    return int(df.apply(proc, axis=1).sum())
+    # Plain dicts of just the columns used; values are normalised by _str_or_empty,
+    # so no dtype cast.
+    cols = [
+        c
+        for c in (*_COLUMNS, "page_text", "html_content", "author_id", "article_id")
+        if c in df.columns
+    ]
+    records = df[cols].to_dict("records")
+    with metrics.stage("html_to_text") as st:
+        texts = [_doc_text(r) for r in records]
+        st.rows += len(texts)
+        st.bytes += sum(map(len, texts))
+    with metrics.stage("embedding") as st:
+        embeddings = embed_batch(texts, dtype=np.float64).tolist()
+        st.rows += len(texts)
+    on_flush = vector_index.add_documents if vector_index else None
+    with (
+        metrics.stage("mongo_write") as st,
+        BulkMongoWriter(ScientificArticleDoc, batch_size=batch_size, on_flush=on_flush) as writer,
+    ):
+        st.rows += len(records)
+        for r, text, embedding in zip(records, texts, embeddings, strict=True):
+            raw = {
+                "title": _str_or_empty(r["title"]),
+                "summary": _str_or_empty(r["summary"]),
+                "file_path": _str_or_empty(r.get("file_path")),
+                "arxiv_id": _str_or_empty(r["arxiv_id"]),
+                "author": {
+                    "full_name": _str_or_empty(r.get("author_full_name")),
+                    "title": _str_or_empty(r.get("author_title")),
+                },
+                "text": text,
+                "embedding": ScientificArticleDoc.encode_embedding(embedding),
+            }
+            for col in ("author_id", "article_id"):
+                if _str_or_empty(r.get(col)):
+                    raw[col] = int(r[col])
+            writer.add_raw(raw)
+    return writer.written
+
+
+def send_changed_to_mongodb(
+    df: pd.DataFrame,
+    vector_index: VectorIndex | None = None,
+    metrics: PipelineMetrics | None = None,
+) -> int:
+    """Upsert the non-skipped rows of a loaded frame, then record their content hashes.
+
+    Meant for frames loaded with `record_hashes=False`: until the MongoDB write is acknowledged
+    MariaDB holds those rows with a NULL hash, so rows lost to a crash between the two stores
+    are re-sent by the next run instead of being skipped forever.
+    """
+    metrics = metrics or PipelineMetrics("send_changed_to_mongodb")
+    todo = df["load_status"] != "skipped"
+    sent = df if todo.all() else df[todo]
+    written = load_df_to_mongodb(sent, vector_index=vector_index, metrics=metrics)
+    with metrics.stage("hash_record") as st:
+        st.rows += record_content_hashes(sent)
+    return written
 
 
 # ---------- Orchestrator ----------
@@ -139,8 +447,81 @@ class PipelineResult:
     df: pd.DataFrame
     inserted_mongo: int
 
-def run_arxiv_pipeline(query: str, max_results: int = 10) -> PipelineResult:
-    df = fetch_arxiv(query, max_results)
-    df = add_html_content(df)
-    df = load_df_to_mariadb(df)
-    return PipelineResult(df=df, inserted_mongo=load_df_to_mongodb(df))
+    @property
+    def mariadb_counts(self) -> dict[str, int]:
+        return load_counts(self.df)
+
+
+RESULT_COLUMNS = ["arxiv_id", "author_id", "article_id", "load_status"]
+
+
+def _rechunk(pages: Iterable[list[dict[str, str]]], size: int) -> Iterator[list[dict[str, str]]]:
+    buf: list[dict[str, str]] = []
+    for page in pages:
+        buf.extend(page)
+        while len(buf) >= size:
+            yield buf[:size]
+            buf = buf[size:]
+    if buf:
+        yield buf
+
+
+def run_arxiv_pipeline(
+    query: str,
+    max_results: int = 10,
+    config: HarvestConfig | None = None,
+    vector_index: VectorIndex | None = None,
+    metrics: PipelineMetrics | None = None,
+    chunk_size: int | None = None,
+) -> PipelineResult:
+    """Fetch -> HTML -> MariaDB -> MongoDB; per-stage timings go to `metrics`.
+
+    `metrics` defaults to one built from the env. Rows MariaDB already holds with the same
+    content hash (`stored_unchanged`) are neither fetched again (`html_fetch`) nor re-sent to
+    MongoDB, so a re-harvest costs one hash comparison per row. A row's hash is recorded only
+    after its MongoDB write (`send_changed_to_mongodb`).
+
+    With `chunk_size`, API pages are regrouped into chunks of that many rows and each chunk runs
+    through every stage before the next is fetched (one keep-alive client throughout). Only
+    `RESULT_COLUMNS` of each chunk are kept for the result, so memory is bounded by the chunk,
+    not by `max_results`. Without it the whole harvest is one chunk and the full frame is
+    returned.
+    """
+    frames: list[pd.DataFrame] = []
+    inserted = 0
+    with run_metrics(metrics, "arxiv_pipeline") as m, HttpClient(config) as client:
+        chunks = _rechunk(
+            harvest_pages(client, query, max_results), chunk_size or max(max_results, 1)
+        )
+        while True:
+            with m.stage("arxiv_fetch") as st:
+                if (rows := next(chunks, None)) is None:
+                    break
+                df = _frame(rows)
+                st.rows += len(df)
+                del rows
+            with m.stage("hash_check") as st:
+                unchanged = stored_unchanged(df)
+                st.rows += len(df)
+            with m.stage("html_fetch") as st:
+                df = _with_page_text(client, df, skip=unchanged)
+                st.rows += int((~unchanged).sum())
+                st.bytes += int(df["page_text"].str.len().sum())
+            with m.stage("mariadb_load") as st:
+                df = load_df_to_mariadb(df, record_hashes=False)
+                st.rows += len(df)
+            inserted += send_changed_to_mongodb(df, vector_index=vector_index, metrics=m)
+            frames.append(df[RESULT_COLUMNS] if chunk_size else df)
+    if not frames:  # nothing harvested
+        frames.append(
+            pd.DataFrame(
+                {
+                    "arxiv_id": pd.Series(dtype=STRING),
+                    "author_id": pd.Series(dtype="Int64"),
+                    "article_id": pd.Series(dtype="Int64"),
+                    "load_status": pd.Categorical([], categories=LOAD_STATUSES),
+                }
+            )
+        )
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return PipelineResult(df=df, inserted_mongo=inserted)
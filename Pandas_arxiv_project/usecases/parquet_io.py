@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import argparse
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from models.embedding_codec import decode_embedding
+from storage.vector_index import VectorIndex
+from usecases.embedding import DEFAULT_DIM
+from usecases.metrics import PipelineMetrics, run_metrics
+from usecases.pandas_pipeline import (
+    _COLUMNS,
+    _compact_df,
+    html_to_page_text,
+    load_counts,
+    load_df_to_mariadb,
+    send_changed_to_mongodb,
+)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+_YYMM = re.compile(r"(\d{4})\.\d{4,5}")
+
+
+def _pyarrow() -> Any:
+    """pyarrow is optional (pip install -e '.[parquet]'); imported on first Parquet use."""
+    try:
+        import pyarrow  # noqa: E401
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Parquet support needs pyarrow: pip install -e '.[parquet]'") from exc
+    return pyarrow
+
+
+# ---------- ingest: row groups -> pyarrow-backed DataFrames -> bulk loaders ----------
+def read_parquet_batches(path: Path, batch_size: int = 10_000) -> Iterator[pd.DataFrame]:
+    """Yield frames of up to `batch_size` rows with `string[pyarrow]` columns (no per-row dicts);
+    the author columns are categoricals."""
+    pa = _pyarrow()
+    pf = pa.parquet.ParquetFile(path)
+    cols = [c for c in [*_COLUMNS, "page_text", "html_content"] if c in pf.schema_arrow.names]
+    arrow_str = pd.StringDtype("pyarrow")
+    mapper = lambda t: arrow_str if pa.types.is_string(t) or pa.types.is_large_string(t) else None  # noqa: E731
+    for batch in pf.iter_batches(batch_size=batch_size, columns=cols):
+        df = batch.to_pandas(types_mapper=mapper)
+        for c in _COLUMNS:
+            if c not in df.columns:
+                df[c] = pd.Series(pd.NA, index=df.index, dtype=arrow_str)
+        yield _compact_df(df)
+
+
+@dataclass
+class ParquetLoadResult:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    written_mongo: int = 0
+
+
+def load_parquet(
+    path: Path,
+    batch_size: int = 10_000,
+    vector_index: VectorIndex | None = None,
+    metrics: PipelineMetrics | None = None,
+) -> ParquetLoadResult:
+    """Load a Parquet article dump into MariaDB in batches, then send new/changed rows to MongoDB.
+
+    An `html_content` column is converted to `page_text` first and dropped,
+    so no batch carries raw HTML past the read.
+    """
+    result = ParquetLoadResult()
+    with run_metrics(metrics, "load_parquet") as m:
+        for df in m.timed_iter("parquet_read", read_parquet_batches(path, batch_size)):
+            if "html_content" in df.columns:
+                with m.stage("html_to_text") as st:
+                    df = html_to_page_text(df)
+                    st.rows += len(df)
+            with m.stage("mariadb_load") as st:
+                df = load_df_to_mariadb(df, record_hashes=False)
+                st.rows += len(df)
+            counts = load_counts(df)
+            result.inserted += counts["inserted"]
+            result.updated += counts["updated"]
+            result.skipped += counts["skipped"]
+            result.written_mongo += send_changed_to_mongodb(
+                df, vector_index=vector_index, metrics=m
+            )
+        m.stages["parquet_read"].bytes = path.stat().st_size
+    return result
+
+
+# ---------- export: MongoDB corpus -> partitioned Parquet ----------
+def export_schema(dim: int = DEFAULT_DIM, with_text: bool = False) -> pa.Schema:
+    pa = _pyarrow()
+    fields = [("article_id", pa.int64()), ("author_id", pa.int64())]
+    fields += [
+        (c, pa.string())
+        for c in ("arxiv_id", "title", "summary", "file_path", "author_full_name", "author_title")
+    ]
+    if with_text:
+        fields.append(("text", pa.string()))
+    return pa.schema([*fields, ("embedding", pa.list_(pa.float32(), dim)), ("yymm", pa.string())])
+
+
+def _yymm(arxiv_id: str | None) -> str:
+    match = _YYMM.search(arxiv_id or "")
+    return match.group(1) if match else "unknown"
+
+
+def _record_batch(docs: list[dict[str, Any]], schema: pa.Schema, dim: int) -> pa.RecordBatch:
+    pa = _pyarrow()
+    vectors = np.zeros((len(docs), dim), dtype=np.float32)
+    absent = np.ones(len(docs), dtype=bool)
+    for i, doc in enumerate(docs):
+        if (e := decode_embedding(doc.get("embedding"))) is not None and len(e) == dim:
+            vectors[i] = e
+            absent[i] = False
+    authors = [doc.get("author") or {} for doc in docs]
+    columns: dict[str, Any] = {f: [doc.get(f) for doc in docs] for f in schema.names}
+    columns["author_full_name"] = [a.get("full_name") for a in authors]
+    columns["author_title"] = [a.get("title") for a in authors]
+    columns["embedding"] = pa.FixedSizeListArray.from_arrays(
+        pa.array(vectors.reshape(-1)), dim, mask=pa.array(absent)
+    )
+    columns["yymm"] = [_yymm(doc.get("arxiv_id")) for doc in docs]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[f.name], type=f.type) for f in schema], schema=schema
+    )
+
+
+def _mongo_batches(
+    docs: Iterable[dict[str, Any]], schema: pa.Schema, dim: int, batch_size: int
+) -> Iterator[pa.RecordBatch]:
+    batch: list[dict[str, Any]] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield _record_batch(batch, schema, dim)
+            batch = []
+    if batch:
+        yield _record_batch(batch, schema, dim)
+
+
+def export_articles_to_parquet(
+    out_dir: Path,
+    batch_size: int = 10_000,
+    with_text: bool = False,
+    dim: int = DEFAULT_DIM,
+    metrics: PipelineMetrics | None = None,
+) -> int:
+    """Dump MongoDB articles (with MariaDB ids) to Hive-partitioned Parquet by arXiv `yymm`.
+
+    Embeddings become a `fixed_size_list<float32>` column (null when missing); `text` only with
+    `with_text`. Existing files in the written partitions are replaced. Returns rows written.
+    """
+    from models.mongo_models import ScientificArticleDoc
+    from storage.mongodb import init_mongo
+
+    pa = _pyarrow()
+    schema = export_schema(dim, with_text)
+    fields = [
+        "article_id",
+        "author_id",
+        "arxiv_id",
+        "title",
+        "summary",
+        "file_path",
+        "author",
+        "embedding",
+    ]
+    projection = {"_id": 0, **{f: 1 for f in fields}, **({"text": 1} if with_text else {})}
+    init_mongo()
+    cursor = ScientificArticleDoc._get_collection().find({}, projection).batch_size(batch_size)
+    written = 0
+    with run_metrics(metrics, "export_parquet") as m:
+
+        def counted() -> Iterator[pa.RecordBatch]:
+            nonlocal written
+            for batch in m.timed_iter(
+                "mongo_read", _mongo_batches(cursor, schema, dim, batch_size)
+            ):
+                written += batch.num_rows
+                yield batch
+
+        with m.stage("parquet_write"):
+            pa.dataset.write_dataset(
+                counted(),
+                out_dir,
+                schema=schema,
+                format="parquet",
+                partitioning=pa.dataset.partitioning(
+                    pa.schema([("yymm", pa.string())]), flavor="hive"
+                ),
+                basename_template="part-{i}.parquet",
+                existing_data_behavior="delete_matching",
+            )
+        m.stages["mongo_read"].rows = written
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parquet ingest/export for the article corpus")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    load = sub.add_parser("load", help="bulk-load a Parquet article dump into MariaDB and MongoDB")
+    load.add_argument("path", type=Path)
+    load.add_argument("--batch-size", type=int, default=10_000)
+    export = sub.add_parser("export", help="dump MongoDB articles to partitioned Parquet")
+    export.add_argument("out_dir", type=Path)
+    export.add_argument("--with-text", action="store_true")
+    export.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    if args.cmd == "load":
+        r = load_parquet(args.path, batch_size=args.batch_size)
+        print(
+            f"Articles: {r.inserted} inserted, {r.updated} updated, {r.skipped} unchanged; "
+            f"{r.written_mongo} docs written to MongoDB."
+        )
+    else:
+        n = export_articles_to_parquet(
+            args.out_dir, batch_size=args.batch_size, with_text=args.with_text
+        )
+        print(f"Exported {n} articles to {args.out_dir}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Callable, Iterable
+from typing import Any, TextIO
+
+from storage.vector_index import VectorIndex
+from usecases.search_mongodb import hybrid_search, search_text
+from usecases.vector_search import open_index, search_similar
+
+# Search path only: no pandas, harvester, MariaDB, mongoengine or models; pymongo loads on the
+# first query (storage.mongodb.mongo_collection). benchmarks/bench_import_time.py guards this.
+MODES = ("text", "hybrid", "similar")
+Searcher = Callable[[str], list[dict[str, Any]]]
+
+
+def make_searcher(mode: str, limit: int = 5, index: VectorIndex | None = None) -> Searcher:
+    """query -> [{"title", "score"}] for one mode; `hybrid`/`similar` open the vector index once."""
+    if mode == "text":
+        return lambda q: [{"title": t, "score": s} for t, s in search_text(q, limit=limit)]
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}; expected one of {MODES}")
+    index = index or open_index()
+    if mode == "hybrid":
+        return lambda q: [
+            {"title": t, "score": s} for t, s in hybrid_search(q, limit=limit, index=index)
+        ]
+    return lambda q: [{"title": t, "score": s} for t, s in search_similar(q, k=limit, index=index)]
+
+
+def serve(search: Searcher, lines: Iterable[str], out: TextIO) -> int:
+    """One JSON line per non-blank input line, flushed as it is written; errors become an
+    `error` field instead of ending the loop. Returns the number of queries answered."""
+    served = 0
+    for line in lines:
+        if not (query := line.strip()):
+            continue
+        try:
+            reply: dict[str, Any] = {"query": query, "results": search(query)}
+        except Exception as exc:
+            reply = {"query": query, "error": f"{type(exc).__name__}: {exc}"}
+        out.write(json.dumps(reply, ensure_ascii=False) + "\n")
+        out.flush()
+        served += 1
+    return served
+
+
+def main() -> None:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--mode", choices=MODES, default="hybrid")
+    common.add_argument("-k", "--limit", type=int, default=5)
+    parser = argparse.ArgumentParser(description="Search MongoDB without loading the harvest code")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    one = sub.add_parser("search", parents=[common], help="answer one query and exit")
+    one.add_argument("query", nargs="+")
+    one.add_argument("--json", action="store_true", help="print the JSON line `serve` would")
+    sub.add_parser(
+        "serve", parents=[common], help="read queries from stdin, one per line; answer each as JSON"
+    )
+    args = parser.parse_args()
+    search = make_searcher(args.mode, args.limit)
+    if args.cmd == "serve":
+        serve(search, sys.stdin, sys.stdout)
+        return
+    query = " ".join(args.query)
+    if args.json:
+        serve(search, [query], sys.stdout)
+        return
+    for hit in search(query):
+        print(f"- {hit['title']} (score={hit['score']:.4f})")
+
+
+if __name__ == "__main__":
+    main()
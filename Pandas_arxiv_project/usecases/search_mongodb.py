@@ -1,13 +1,138 @@
 from __future__ import annotations
-from typing import List, Tuple
-from models.mongo_models import ScientificArticleDoc
-from storage.mongodb import init_mongo
-
-def search_text(query: str, limit: int = 5) -> List[Tuple[str, float]]:
-    init_mongo()
-    cursor = ScientificArticleDoc.objects.search_text(query).order_by("$text_score").limit(limit)
-    results: List[Tuple[str, float]] = []
-    for doc in cursor:
-        score = float(getattr(doc, "_text_score", 0.0))  # type: ignore[attr-defined]
-        results.append((doc.title, score))
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Literal
+
+import numpy as np
+
+from models.embedding_codec import decode_embedding
+from storage.mongodb import ARTICLES_COLLECTION, mongo_collection
+from storage.query_cache import QueryCache, current_generation
+from usecases.embedding import embed_batch
+
+if TYPE_CHECKING:
+    from pymongo.collection import Collection
+
+    from storage.vector_index import VectorIndex
+
+SEARCH_CACHE = QueryCache.from_env()  # cleared by every BulkMongoWriter flush
+
+
+def _collection() -> Collection[dict[str, Any]]:
+    return mongo_collection(ARTICLES_COLLECTION)
+
+
+def _text_hits(
+    collection: Collection[dict[str, Any]], query: str, limit: int, fields: Iterable[str] = ()
+) -> list[dict[str, Any]]:
+    """Top `$text` matches, projecting only `title`, the score and `fields`."""
+    projection: dict[str, Any] = {
+        "title": 1,
+        "score": {"$meta": "textScore"},
+        **{f: 1 for f in fields},
+    }
+    return list(
+        collection.find({"$text": {"$search": query}}, projection)
+        .sort([("score", {"$meta": "textScore"})])
+        .limit(limit)
+    )
+
+
+def search_text(query: str, limit: int = 5) -> list[tuple[str, float]]:
+    key = ("text", query, limit)
+    if (cached := SEARCH_CACHE.get(key)) is not None:
+        return list(cached)
+    generation = current_generation()  # before the query: a write meanwhile skips the put
+    results: list[tuple[str, float]] = [
+        (d["title"], float(d["score"])) for d in _text_hits(_collection(), query, limit)
+    ]
+    SEARCH_CACHE.put(key, results, generation)
+    return results
+
+
+def _cosine(embedding: Any, query: np.ndarray[Any, Any]) -> float:
+    if (vec := decode_embedding(embedding)) is None or len(vec) != len(query):
+        return 0.0
+    norm = float(np.linalg.norm(vec))
+    return float(vec @ query) / norm if norm else 0.0
+
+
+def _rrf(rankings: Iterable[Sequence[Any]], k: int) -> dict[Any, float]:
+    fused: dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+def _weighted(
+    text_scores: Mapping[Any, float], cosines: Mapping[Any, float], alpha: float
+) -> dict[Any, float]:
+    best = max(text_scores.values(), default=0.0) or 1.0
+    return {
+        i: alpha * text_scores.get(i, 0.0) / best + (1 - alpha) * max(cosines.get(i, 0.0), 0.0)
+        for i in {*text_scores, *cosines}
+    }
+
+
+def hybrid_search(
+    query: str,
+    limit: int = 5,
+    fusion: Literal["rrf", "weighted"] = "rrf",
+    alpha: float = 0.5,
+    candidates: int = 50,
+    rrf_k: int = 60,
+    index: VectorIndex | None = None,
+) -> list[tuple[str, float]]:
+    """Fuse `$text` relevance with embedding cosine similarity -> [(title, score)].
+
+    Only title/score/article_id/embedding of the top `candidates` text hits are
+    projected. A local `index` adds its nearest neighbours to the candidates;
+    otherwise the text hits are re-ranked by cosine. `fusion="rrf"` uses
+    reciprocal rank (`rrf_k`), `"weighted"` blends normalised text score and
+    cosine by `alpha`.
+    Results are cached in `SEARCH_CACHE` until the TTL or the next Mongo write.
+    """
+    if fusion not in ("rrf", "weighted"):
+        raise ValueError(f"unknown fusion {fusion!r}; expected 'rrf' or 'weighted'")
+    key = ("hybrid", query, limit, fusion, alpha, candidates, rrf_k, index.root if index else None)
+    if (cached := SEARCH_CACHE.get(key)) is not None:
+        return list(cached)
+    generation = current_generation()
+
+    collection = _collection()
+    qvec = embed_batch([query])[0]
+    text_docs = _text_hits(collection, query, candidates, ("article_id", "embedding"))
+    titles = {d["_id"]: d["title"] for d in text_docs}
+    text_scores = {d["_id"]: float(d["score"]) for d in text_docs}
+    cosines = {d["_id"]: _cosine(d.get("embedding"), qvec) for d in text_docs}
+    if index is not None and index.count:
+        hits = index.search(qvec, k=candidates)[0]
+        by_article = {
+            d["article_id"]: d["_id"] for d in text_docs if d.get("article_id") is not None
+        }
+        missing = [a for a, _ in hits if a not in by_article]
+        if missing:
+            for d in collection.find(
+                {"article_id": {"$in": missing}}, {"_id": 1, "title": 1, "article_id": 1}
+            ):
+                by_article[d["article_id"]] = d["_id"]
+                titles[d["_id"]] = d["title"]
+        vector_ranking = []
+        for a, score in hits:
+            if a in by_article:
+                vector_ranking.append(by_article[a])
+                cosines[by_article[a]] = score
+    else:
+        vector_ranking = sorted(cosines, key=cosines.__getitem__, reverse=True)
+
+    fused = (
+        _rrf([list(text_scores), vector_ranking], rrf_k)
+        if fusion == "rrf"
+        else _weighted(text_scores, {i: cosines[i] for i in vector_ranking}, alpha)
+    )
+    results = [
+        (titles[i], s) for i, s in sorted(fused.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+    ]
+    SEARCH_CACHE.put(key, results, generation)
     return results
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from storage.mongodb import ARTICLES_COLLECTION, mongo_collection
+from storage.vector_index import VectorIndex, index_dir_from_env
+from usecases.embedding import DEFAULT_DIM, embed_batch
+
+INDEX_DIR = index_dir_from_env(Path(__file__).parents[1] / ".cache" / "vector_index")
+_IVF_MIN_ROWS = 50_000  # below this, exact search is already cheap
+
+
+def open_index(root: Path = INDEX_DIR) -> VectorIndex:
+    return VectorIndex(root, dim=DEFAULT_DIM)
+
+
+def build_vector_index(
+    root: Path = INDEX_DIR, batch_size: int = 10_000, nlist: int | None = None
+) -> VectorIndex:
+    """(Re)load the embedding column from MongoDB into the on-disk index, then train IVF."""
+    index = open_index(root)
+    cursor = (
+        mongo_collection(ARTICLES_COLLECTION)
+        .find({"article_id": {"$ne": None}}, {"_id": 0, "article_id": 1, "embedding": 1})
+        .batch_size(batch_size)
+    )
+    batch: list[dict[str, object]] = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            index.add_documents(batch)
+            batch = []
+    index.add_documents(batch)
+    if index.count >= _IVF_MIN_ROWS or nlist:
+        index.train(nlist=nlist)
+    return index
+
+
+def search_similar(
+    text_or_vector: str | Sequence[float],
+    k: int = 5,
+    nprobe: int | None = 8,
+    index: VectorIndex | None = None,
+) -> list[tuple[str, float]]:
+    """Nearest articles by embedding cosine similarity; MongoDB only supplies the k titles."""
+    index = index or open_index()
+    query = (
+        embed_batch([text_or_vector], index.dim)
+        if isinstance(text_or_vector, str)
+        else np.asarray(text_or_vector, dtype=np.float32)
+    )
+    hits = index.search(query, k=k, nprobe=nprobe)[0]
+    if not hits:
+        return []
+    titles = {
+        d["article_id"]: d["title"]
+        for d in mongo_collection(ARTICLES_COLLECTION).find(
+            {"article_id": {"$in": [i for i, _ in hits]}}, {"_id": 0, "article_id": 1, "title": 1}
+        )
+    }
+    return [(titles[i], score) for i, score in hits if i in titles]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local vector index over article embeddings")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    build = sub.add_parser("build", help="load embeddings from MongoDB and train the index")
+    build.add_argument("--nlist", type=int, default=None)
+    query = sub.add_parser("query", help="find articles similar to a text")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    if args.cmd == "build":
+        index = build_vector_index(nlist=args.nlist)
+        print(f"Indexed {index.count} vectors (IVF: {index.trained}).")
+    else:
+        for title, score in search_similar(args.text, k=args.k):
+            print(f"- {title} (score={score:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Embedding throughput: legacy pure-Python loop vs. the batched engine.
+
+Run from the project root:  python -m benchmarks.bench_embedding
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import math
+import random
+import re
+import time
+
+from usecases.embedding import _token_hash, embed_batch
+
+
+def _legacy_embedding(text: str, dim: int) -> list[float]:
+    vec = [0.0] * dim
+    for tok in (t for t in re.split(r"\W+", text.lower()) if t):
+        vec[int.from_bytes(hashlib.sha256(tok.encode("utf-8")).digest()[:4], "big") % dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec))
+    return [v / norm for v in vec] if norm else vec
+
+
+def _corpus(n_docs: int, words_per_doc: int, vocab: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = [f"w{rng.getrandbits(40):x}" for _ in range(vocab)]
+    return [" ".join(rng.choices(words, k=words_per_doc)) for _ in range(n_docs)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--vocab", type=int, default=20000)
+    args = parser.parse_args()
+
+    docs = _corpus(args.docs, args.words, args.vocab)
+    for dim in (128, 1024):
+        t0 = time.perf_counter()
+        for d in docs:
+            _legacy_embedding(d, dim)
+        legacy = time.perf_counter() - t0
+
+        _token_hash.cache_clear()
+        t0 = time.perf_counter()
+        embed_batch(docs, dim)
+        cold = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        embed_batch(docs, dim)
+        warm = time.perf_counter() - t0
+        print(
+            f"dim={dim:5d}  legacy {len(docs) / legacy:10,.0f} docs/s"
+            f"  batch(cold) {len(docs) / cold:10,.0f} docs/s"
+            f"  batch(warm) {len(docs) / warm:10,.0f} docs/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
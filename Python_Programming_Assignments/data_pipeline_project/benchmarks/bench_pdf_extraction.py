@@ -0,0 +1,37 @@
+"""PDF extraction throughput by worker count.
+
+Run from the project root:  python -m benchmarks.bench_pdf_extraction [papers_dir]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from usecases.pdf_extraction import extract_markdown_parallel
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("papers", nargs="?", type=Path, default=Path("papers"))
+    parser.add_argument("--repeat", type=int, default=50, help="times each PDF is queued")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-pages", type=int, default=None, help="pages read per PDF")
+    args = parser.parse_args()
+
+    pdfs = sorted(args.papers.glob("*.pdf")) * args.repeat
+    workers = 1
+    while workers <= args.max_workers:
+        t0 = time.perf_counter()
+        extracted = extract_markdown_parallel(
+            enumerate(pdfs), workers=workers, max_pages=args.max_pages
+        )
+        n = sum(1 for _ in extracted)
+        elapsed = time.perf_counter() - t0
+        print(f"workers={workers:3d}  {n / elapsed:10,.1f} files/s")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""End-to-end pipeline benchmark on synthetic data with local stand-ins.
+
+MariaDB is replaced by a SQLite file and MongoDB by mongomock (unless
+--real-mongo), so runs are reproducible on any machine. Per-stage metrics are
+printed, appended as JSON lines to --out, and compared against --baseline.
+
+Run from the project root:  python -m benchmarks.bench_pipeline --scale 100k
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from benchmarks.synthetic import SCALES, generate
+
+
+def _use_mongomock() -> None:
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("mongomock is not installed: pip install -e '.[bench]' or pass --real-mongo")
+    from storage.mongodb import init_mongo
+
+    init_mongo(mongo_client_class=mongomock.MongoClient)
+
+
+def _print_table(records: list[dict[str, Any]]) -> None:
+    print(f"{'run':10} {'stage':16} {'calls':>9} {'wall s':>9} {'cpu s':>9} {'rows':>10} "
+          f"{'rows/s':>12} {'MB':>9} {'peak RSS MB':>12}")
+    for r in records:
+        rss = (r.get("peak_rss_bytes") or 0) / 2**20
+        print(
+            f"{r['run']:10} {r['stage']:16} {r.get('calls', ''):>9} {r['wall_s']:9.3f} "
+            f"{r['cpu_s']:9.3f} {r.get('rows', ''):>10} {r.get('rows_per_sec', ''):>12} "
+            f"{r.get('bytes', 0) / 2**20:9.1f} {rss:12.1f}"
+        )
+
+
+def _regressions(
+    records: list[dict[str, Any]], baseline: Path, scale: str, tolerance: float
+) -> list[str]:
+    """Stages whose rows/sec fell more than `tolerance` below the baseline at this scale."""
+    previous: dict[tuple[str, str], float] = {}
+    for line in baseline.read_text(encoding="utf-8").splitlines():
+        r = json.loads(line)
+        if r.get("scale") == scale and r.get("rows_per_sec"):
+            previous[(r["run"], r["stage"])] = r["rows_per_sec"]
+    problems = []
+    for r in records:
+        before = previous.get((r["run"], r["stage"]))
+        now = r.get("rows_per_sec")
+        if before and now is not None and now < before * (1 - tolerance):
+            problems.append(f"{r['run']}/{r['stage']}: {now:,.0f} rows/s (baseline {before:,.0f})")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--pdfs", type=int, default=200, help="distinct PDFs the rows cycle over")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--workdir", type=Path, default=None, help="keep inputs/outputs here")
+    parser.add_argument(
+        "--real-mongo", action="store_true", help="use MONGODB_* instead of mongomock"
+    )
+    parser.add_argument("--skip-transfer", action="store_true")
+    parser.add_argument("--out", type=Path, default=None, help="append JSON records here")
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="pipeline-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    db_path = workdir / "bench.sqlite"
+    db_path.unlink(missing_ok=True)
+    os.environ["MARIADB_DSN"] = f"sqlite:///{db_path}"
+    if not args.real_mongo:
+        _use_mongomock()
+
+    # Imported after MARIADB_DSN is set so the cached engine points at SQLite.
+    from storage.extraction_cache import ExtractionCache
+    from usecases.load_csv_to_mariadb import stream_csv_to_mariadb
+    from usecases.metrics import PipelineMetrics
+    from usecases.pdf_extraction import EXTRACTOR_VERSION
+    from usecases.transfer_mariadb_to_mongodb import transfer_mariadb_to_mongodb
+
+    rows = SCALES[args.scale]
+    csv_path = generate(workdir, rows, args.pdfs)
+    records: list[dict[str, Any]] = []
+    with PipelineMetrics("load_csv") as metrics:
+        stream_csv_to_mariadb(csv_path, metrics=metrics)
+    records += metrics.records()
+    if not args.skip_transfer:
+        with (
+            ExtractionCache(workdir / "extraction.sqlite", EXTRACTOR_VERSION) as cache,
+            PipelineMetrics("transfer") as metrics,
+        ):
+            transfer_mariadb_to_mongodb(
+                workdir / "papers", workers=args.workers, cache=cache, metrics=metrics
+            )
+        records += metrics.records()
+    for r in records:
+        r["scale"] = args.scale
+
+    _print_table(records)
+    if args.out:
+        with args.out.open("a", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+    if args.workdir is None:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if args.baseline:
+        problems = _regressions(records, args.baseline, args.scale, args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
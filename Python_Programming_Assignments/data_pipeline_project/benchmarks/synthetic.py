@@ -0,0 +1,128 @@
+"""Synthetic inputs for the pipeline benchmarks: articles CSV plus small PDFs.
+
+Run from the project root:  python -m benchmarks.synthetic OUT_DIR --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import random
+from pathlib import Path
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+CSV_FIELDS = ["title", "summary", "file_path", "arxiv_id", "author_full_name", "author_title"]
+
+_WORDS = [
+    "attention", "transformer", "residual", "network", "convolution", "language", "model",
+    "pretraining", "embedding", "retrieval", "graph", "diffusion", "token", "sequence", "layer",
+    "gradient", "optimizer", "benchmark", "dataset", "inference", "sparse", "dense", "vision",
+    "speech", "agent", "policy", "reward",
+]  # fmt: skip
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(_WORDS, k=words)).capitalize() + "."
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def minimal_pdf(pages: list[list[str]]) -> bytes:
+    """A valid PDF with one Helvetica text line per entry on each page.
+
+    Written by hand (objects plus a byte-exact xref table) so the benchmarks
+    need no PDF authoring library.
+    """
+    n = len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(n))
+    font_id = 3 + 2 * n
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode(),
+    ]
+    for i, lines in enumerate(pages):
+        content = (
+            "BT /F1 11 Tf 14 TL 72 740 Td "
+            + " ".join(f"({_escape(line)}) '" for line in lines)
+            + " ET"
+        ).encode("latin-1", "replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream"
+        )
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def write_pdfs(papers_dir: Path, count: int, pages: int = 2, seed: int = 0) -> list[Path]:
+    rng = random.Random(seed)
+    papers_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = papers_dir / f"paper_{i:06d}.pdf"
+        body = [[_sentence(rng, 12) for _ in range(40)] for _ in range(pages)]
+        path.write_bytes(minimal_pdf(body))
+        paths.append(path)
+    return paths
+
+
+def write_csv(csv_path: Path, rows: int, pdfs: list[Path], seed: int = 0) -> None:
+    """`rows` articles cycling over `pdfs`, with about sqrt(rows) distinct authors."""
+    rng = random.Random(seed)
+    authors = [f"Author {i:06d}" for i in range(max(1, math.isqrt(rows)))]
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for i in range(rows):
+            writer.writerow(
+                [
+                    _sentence(rng, 8),
+                    _sentence(rng, 30),
+                    f"papers/{pdfs[i % len(pdfs)].name}",
+                    f"arXiv:bench.{i:07d}",
+                    rng.choice(authors),
+                    "Research Scientist",
+                ]
+            )
+
+
+def generate(out_dir: Path, rows: int, pdf_count: int, pages: int = 2) -> Path:
+    """Write `out_dir/articles.csv` and `out_dir/papers/*.pdf`; returns the CSV path."""
+    pdfs = write_pdfs(out_dir / "papers", min(pdf_count, rows), pages=pages)
+    csv_path = out_dir / "articles.csv"
+    write_csv(csv_path, rows, pdfs)
+    return csv_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--rows", type=int, default=SCALES["1k"])
+    parser.add_argument("--pdfs", type=int, default=200, help="distinct PDFs the rows cycle over")
+    parser.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args()
+    print(generate(args.out, args.rows, args.pdfs, pages=args.pages))
+
+
+if __name__ == "__main__":
+    main()
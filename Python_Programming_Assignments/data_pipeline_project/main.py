@@ -1,28 +1,111 @@
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 
-from usecases.load_csv_to_mariadb import load_csv_to_mariadb
-from usecases.search_mongodb import search_text
+from storage.extraction_cache import ExtractionCache, cache_path_from_env
+from storage.vector_index import VectorIndex
+from usecases.load_csv_to_mariadb import stream_csv_to_mariadb
+from usecases.passages import PassageWriter
+from usecases.pdf_extraction import extractor_version, max_pages_from_env
+from usecases.search_mongodb import hybrid_search, search_passages, search_text
+from usecases.streaming_pipeline import run_streaming_pipeline
 from usecases.transfer_mariadb_to_mongodb import transfer_mariadb_to_mongodb
+from usecases.vector_search import open_index, search_similar
 
 ROOT = Path(__file__).parent
 CSV_PATH = ROOT / "data" / "articles.csv"
 PAPERS_DIR = ROOT / "papers"
+CACHE_PATH = cache_path_from_env(ROOT / ".cache" / "extraction.sqlite")
 
-def main() -> None:
+def _batch(
+    index: VectorIndex, workers: int | None, max_pages: int | None, passages: PassageWriter | None
+) -> None:
     print("1) Loading CSV into MariaDB...")
-    a_count, art_count = load_csv_to_mariadb(CSV_PATH)
-    print(f"   OK: {a_count} authors, {art_count} articles.")
+    stats = stream_csv_to_mariadb(CSV_PATH)
+    print(
+        f"   OK: {stats.authors_created} new authors; articles {stats.articles_created} inserted, "
+        f"{stats.articles_updated} updated, {stats.articles_skipped} unchanged "
+        f"({stats.rows_per_sec:,.0f} rows/s)."
+    )
 
     print("2) Transferring from MariaDB to MongoDB (with PDF->Markdown)...")
-    inserted = transfer_mariadb_to_mongodb(PAPERS_DIR)
-    print(f"   Inserted {inserted} docs into MongoDB.")
+    with ExtractionCache(CACHE_PATH, extractor_version(max_pages)) as cache:
+        inserted = transfer_mariadb_to_mongodb(
+            PAPERS_DIR,
+            workers=workers,
+            cache=cache,
+            vector_index=index,
+            max_pages=max_pages,
+            passages=passages,
+        )
+        print(f"   Inserted {inserted} docs into MongoDB.")
+        print(
+            f"   Extraction cache: {cache.stats.hits} hits, {cache.stats.misses} misses, "
+            f"{cache.stats.evictions} evictions."
+        )
+
+def _streaming(
+    index: VectorIndex, workers: int | None, max_pages: int | None, passages: PassageWriter | None
+) -> None:
+    print("1-2) Streaming CSV -> MariaDB -> PDF->Markdown -> MongoDB...")
+    with ExtractionCache(CACHE_PATH, extractor_version(max_pages)) as cache:
+        result = run_streaming_pipeline(
+            CSV_PATH,
+            PAPERS_DIR,
+            workers=workers,
+            cache=cache,
+            vector_index=index,
+            max_pages=max_pages,
+            passages=passages,
+        )
+    print(
+        f"   OK: {result.authors_created} new authors, {result.articles_loaded} articles "
+        f"loaded ({result.articles_skipped} unchanged), "
+        f"{result.documents_written} docs in {result.seconds:.1f}s "
+        f"(row->searchable p50 {result.latency_p50:.1f}s, max {result.latency_max:.1f}s)."
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CSV -> MariaDB -> MongoDB pipeline")
+    parser.add_argument(
+        "--streaming", action="store_true", help="run all stages concurrently over bounded queues"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="PDF extraction processes")
+    parser.add_argument(
+        "--max-pages", type=int, default=max_pages_from_env(), help="pages read per PDF"
+    )
+    parser.add_argument(
+        "--passages", action="store_true", help="also store passages with their own embeddings"
+    )
+    args = parser.parse_args()
+
+    index = open_index()
+    passages = PassageWriter() if args.passages else None
+    if args.streaming:
+        _streaming(index, args.workers, args.max_pages, passages)
+    else:
+        _batch(index, args.workers, args.max_pages, passages)
+    if passages is not None:
+        print(f"   Wrote {passages.passages} passages.")
 
     print("3) Sample search on MongoDB text index...")
     results = search_text("Transformer OR Residual")
     for title, score in results:
         print(f"   - {title} (score={score:.3f})")
 
+    print("4) Similar articles from the local vector index...")
+    for title, score in search_similar("deep residual networks", k=3, index=index):
+        print(f"   - {title} (score={score:.3f})")
+
+    print("5) Hybrid text + vector search...")
+    for title, score in hybrid_search("transformer attention", limit=3, index=index):
+        print(f"   - {title} (score={score:.4f})")
+
+    if passages is not None:
+        print("6) Best passages...")
+        for title, seq, text, score in search_passages("attention mechanism", limit=3):
+            print(f"   - {title} #{seq} (score={score:.4f}): {text[:80]}...")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,83 @@
+# Shared module: the authoritative copy is data_pipeline_project/models/embedding_codec.py.
+# Edit that one, then copy it to Pandas_arxiv_project/ unchanged.
+from __future__ import annotations
+
+import os
+from typing import Any, Literal
+
+import numpy as np
+import numpy.typing as npt
+
+EmbeddingFormat = Literal["list", "float32", "int8"]
+FORMATS: tuple[EmbeddingFormat, ...] = ("list", "float32", "int8")
+
+# BSON binary subtype 9 ("vector"): a dtype byte and a padding byte, then the
+# little-endian values. Same layout the MongoDB drivers use.
+VECTOR_SUBTYPE = 9
+_FLOAT32 = 0x27
+_INT8 = 0x03
+_HEADER = 2
+_INT8_SCALE = 127.0  # embeddings are L2-normalized, so components lie in [-1, 1]
+
+
+def embedding_format_from_env(default: EmbeddingFormat = "list") -> EmbeddingFormat:
+    fmt = os.getenv("EMBEDDING_FORMAT", default).strip().lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"EMBEDDING_FORMAT must be one of {FORMATS}, got {fmt!r}")
+    return fmt  # type: ignore[return-value]
+
+
+def encode_embedding(vector: Any, fmt: EmbeddingFormat | None = None) -> Any:
+    """BSON value for `vector` in `fmt` (default: `EMBEDDING_FORMAT`); None stays None.
+
+    `list` is the original array of doubles (about 18 bytes per dimension in
+    BSON). `float32` packs 4 bytes per dimension, and `int8` packs 1 byte per
+    dimension, quantized in steps of 1/127.
+    """
+    if vector is None:
+        return None
+    fmt = fmt or embedding_format_from_env()
+    if fmt == "list":
+        return np.asarray(vector, dtype=np.float64).reshape(-1).tolist()
+    arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+    from bson.binary import Binary  # pymongo's bson; only needed for packed formats
+
+    if fmt == "float32":
+        header, payload = _FLOAT32, arr.astype("<f4").tobytes()
+    else:
+        quantized = np.clip(np.rint(arr * _INT8_SCALE), -127, 127).astype(np.int8)
+        header, payload = _INT8, quantized.tobytes()
+    return Binary(bytes((header, 0)) + payload, VECTOR_SUBTYPE)
+
+
+def decode_embedding(value: Any) -> npt.NDArray[np.float32] | None:
+    """float32 vector from any stored format, or None when missing or empty.
+
+    Packed float32 is a read-only `np.frombuffer` view of the BSON bytes, so it
+    is not copied.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        raw = memoryview(value)
+        if len(raw) <= _HEADER:
+            return None
+        if raw[0] == _FLOAT32:
+            return np.frombuffer(raw, dtype="<f4", offset=_HEADER)
+        if raw[0] == _INT8:
+            quantized = np.frombuffer(raw, dtype=np.int8, offset=_HEADER)
+            return quantized.astype(np.float32) / np.float32(_INT8_SCALE)
+        raise ValueError(f"unsupported embedding dtype byte 0x{raw[0]:02x}")
+    if len(value) == 0:
+        return None
+    return np.asarray(value, dtype=np.float32)
+
+
+def embedding_format(value: Any) -> EmbeddingFormat | None:
+    """Which format a stored value uses (None when missing or empty)."""
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        header = bytes(value[:1])
+        return {bytes((_FLOAT32,)): "float32", bytes((_INT8,)): "int8"}.get(header)
+    return "list" if len(value) else None
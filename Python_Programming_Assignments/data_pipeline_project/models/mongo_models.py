@@ -1,15 +1,47 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any
 
+import numpy as np
+import numpy.typing as npt
 from mongoengine import (
     Document,
     EmbeddedDocument,
     EmbeddedDocumentField,
-    FloatField,
-    ListField,
+    IntField,
     StringField,
 )
+from mongoengine.base import BaseField
+
+from models.embedding_codec import decode_embedding, encode_embedding
+
+
+class EmbeddingField(BaseField):
+    """Embedding stored as a list of doubles or packed BSON binary (see `embedding_codec`).
+
+    Reads decode any stored format to a list of floats; writes use `EMBEDDING_FORMAT`.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs.setdefault("default", list)
+        super().__init__(**kwargs)
+
+    def to_python(self, value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray)):
+            decoded = decode_embedding(value)
+            return [] if decoded is None else decoded.tolist()
+        return value
+
+    def to_mongo(self, value: Any) -> Any:
+        return encode_embedding(value) if value is not None and len(value) else value
+
+    def validate(self, value: Any) -> None:
+        if isinstance(value, (bytes, bytearray)):
+            return
+        try:
+            np.asarray(value, dtype=np.float64)
+        except (TypeError, ValueError):
+            self.error("embedding must be a sequence of numbers or packed binary")
 
 class AuthorEmbedded(EmbeddedDocument):
     full_name: StringField = StringField(required=True, max_length=255)
@@ -22,10 +54,50 @@ class ScientificArticleDoc(Document):
     arxiv_id: StringField = StringField(required=True, max_length=64)
     author: EmbeddedDocumentField = EmbeddedDocumentField(AuthorEmbedded, required=True)
     text: StringField = StringField(required=True)
-    embedding: ListField = ListField(FloatField(), required=False, default=list)
+    embedding: EmbeddingField = EmbeddingField(required=False)
+    # Link back to the MariaDB rows; article_id is the upsert key for transfers.
+    author_id: IntField = IntField()
+    article_id: IntField = IntField()
+
+    # Raw-dict writers (BulkMongoWriter.add_raw) encode and readers decode with these.
+    encode_embedding = staticmethod(encode_embedding)
+    decode_embedding = staticmethod(decode_embedding)
+
+    @property
+    def vector(self) -> npt.NDArray[np.float32] | None:
+        return decode_embedding(self.embedding)
 
     meta = {
         "collection": "scientific_articles",
         # Text index on the 'text' field:
-        "indexes": [{"fields": ["$text"]}],  # MongoDB text index
+        "indexes": [
+            {"fields": ["$text"]},  # MongoDB text index
+            "arxiv_id",
+            "article_id",  # upsert key for transfers and incremental sync
+        ],
+    }
+
+class ScientificPassageDoc(Document):
+    """Fixed-size slice of an article's extracted text with its own embedding."""
+
+    # "<article_id>:<seq>", the upsert key for passage writers.
+    passage_id: StringField = StringField(required=True, max_length=64)
+    article_id: IntField = IntField(required=True)
+    seq: IntField = IntField(required=True)
+    arxiv_id: StringField = StringField(max_length=64)
+    title: StringField = StringField(max_length=512)
+    text: StringField = StringField(required=True)
+    embedding: EmbeddingField = EmbeddingField(required=False)
+
+    @property
+    def vector(self) -> npt.NDArray[np.float32] | None:
+        return decode_embedding(self.embedding)
+
+    meta = {
+        "collection": "scientific_passages",
+        "indexes": [
+            {"fields": ["$text"]},
+            {"fields": ["passage_id"], "unique": True},
+            ("article_id", "seq"),  # back-reference to ScientificArticleDoc.article_id
+        ],
     }
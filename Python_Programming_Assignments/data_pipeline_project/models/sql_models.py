@@ -1,10 +1,20 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from datetime import datetime
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+# Second precision like MariaDB's DATETIME; on SQLite this also matches the
+# CURRENT_TIMESTAMP text format so server-set and bound values compare equal.
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
 class Base(DeclarativeBase):
     pass
 
@@ -13,9 +23,9 @@ class Author(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     full_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
-    title: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    title: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
-    articles: Mapped[List["ScientificArticle"]] = relationship(back_populates="author")
+    articles: Mapped[list[ScientificArticle]] = relationship(back_populates="author")
 
     def __repr__(self) -> str:  # noqa: D401
         return f"Author(id={self.id!r}, full_name={self.full_name!r})"
@@ -27,10 +37,58 @@ class ScientificArticle(Base):
     title: Mapped[str] = mapped_column(String(512), nullable=False)
     summary: Mapped[str] = mapped_column(String(2048), nullable=False)
     file_path: Mapped[str] = mapped_column(String(512), nullable=False)
-    arxiv_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    arxiv_id: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    # SHA-256 of the loaded fields; re-loads skip rows whose hash is unchanged.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        Timestamp, nullable=False, server_default=func.now(), onupdate=func.now(), index=True
+    )
 
     author_id: Mapped[int] = mapped_column(ForeignKey("authors.id"), nullable=False)
     author: Mapped[Author] = relationship(back_populates="articles")
 
     def __repr__(self) -> str:
         return f"ScientificArticle(id={self.id!r}, title={self.title!r})"
+
+class SyncState(Base):
+    """High-water mark of an incremental MariaDB -> MongoDB sync."""
+
+    __tablename__ = "sync_state"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_updated_at: Mapped[datetime | None] = mapped_column(Timestamp, nullable=True)
+    last_id: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"SyncState(name={self.name!r}, last_updated_at={self.last_updated_at!r}, "
+            f"last_id={self.last_id!r})"
+        )
+
+class TransferShard(Base):
+    """One shard of a sharded MariaDB -> MongoDB transfer: its id slice, claim and checkpoint."""
+
+    __tablename__ = "transfer_shards"
+
+    run: Mapped[str] = mapped_column(String(64), primary_key=True)
+    shard: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    shard_count: Mapped[int] = mapped_column(nullable=False)
+    # "range": lo <= id < hi (NULL = unbounded); "hash": id % shard_count == shard.
+    mode: Mapped[str] = mapped_column(String(8), nullable=False)
+    lo: Mapped[int | None] = mapped_column(nullable=True)
+    hi: Mapped[int | None] = mapped_column(nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    last_id: Mapped[int] = mapped_column(nullable=False, default=0)
+    transferred: Mapped[int] = mapped_column(nullable=False, default=0)
+    # Bumped on every claim; a worker's checkpoints only land while its claim is current.
+    claim: Mapped[int] = mapped_column(nullable=False, default=0)
+    worker: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(Timestamp, nullable=True)
+    error: Mapped[str | None] = mapped_column(String(512), nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"TransferShard(run={self.run!r}, shard={self.shard!r}, status={self.status!r}, "
+            f"last_id={self.last_id!r})"
+        )
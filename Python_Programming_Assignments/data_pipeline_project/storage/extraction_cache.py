@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_digests (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    markdown BLOB NOT NULL,
+    embedding BLOB,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_extractions_last_used ON extractions (last_used);
+"""
+_KEY_DIGEST = re.compile(r":([0-9a-f]{64})(?::|$)")  # "{version}:{digest}[:{tag}]"
+
+
+def cache_path_from_env(default: Path) -> Path:
+    return Path(os.getenv("EXTRACTION_CACHE_PATH", str(default)))
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ExtractionCache:
+    """Content-addressed SQLite cache for PDF→Markdown results (and embeddings).
+
+    Entries are keyed by the PDF's SHA-256 plus `version`, so edits to a file or
+    a new extractor version miss naturally. A (path, size, mtime) table means an
+    unchanged file costs one stat instead of a re-hash. The store is trimmed
+    least-recently-used first once it exceeds `max_bytes`; file digests left
+    without any entry are dropped with the entries. One instance may be
+    shared between threads; database calls are serialized on an internal lock.
+    """
+
+    def __init__(self, path: Path, version: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.version = version
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        self._total = int(total[0])
+        self._keys: dict[str, tuple[int, int, str]] = {}
+
+    def __enter__(self) -> ExtractionCache:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def key_for(self, pdf_path: Path) -> str | None:
+        """Cache key for the file's current content, or None if it cannot be read.
+
+        Only the lookups hold the lock; a file that has to be re-hashed is read
+        outside it, so other threads keep using the cache meanwhile.
+        """
+        try:
+            st = pdf_path.stat()
+        except OSError:
+            return None
+        name = str(pdf_path)
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            memo = self._keys.get(name)
+            if memo and memo[:2] == stamp:
+                return memo[2]
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM file_digests WHERE path = ?", (name,)
+            ).fetchone()
+        if row and (row[0], row[1]) == stamp:
+            digest = row[2]
+        else:
+            try:
+                digest = _file_digest(pdf_path)
+            except OSError:
+                return None
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO file_digests (path, size, mtime_ns, digest) "
+                    "VALUES (?, ?, ?, ?)",
+                    (name, *stamp, digest),
+                )
+        key = f"{self.version}:{digest}"
+        with self._lock:
+            self._keys[name] = (*stamp, key)
+        return key
+
+    def get_markdown(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT markdown FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self._conn.execute(
+                "UPDATE extractions SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            return zlib.decompress(row[0]).decode("utf-8")
+
+    def put_markdown(self, key: str, markdown: str) -> None:
+        blob = zlib.compress(markdown.encode("utf-8"))
+        with self._lock:
+            self._replace(key, blob, None)
+
+    def get_embedding(self, key: str) -> list[float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT embedding FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] is None:
+                return None
+            return array("d", row[0]).tolist()
+
+    def put_embedding(self, key: str, embedding: list[float]) -> None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT markdown FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._replace(key, row[0], array("d", embedding).tobytes())
+
+    def _replace(self, key: str, markdown: bytes, embedding: bytes | None) -> None:
+        size = len(markdown) + len(embedding or b"")
+        old = self._conn.execute("SELECT size FROM extractions WHERE key = ?", (key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extractions (key, markdown, embedding, size, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, markdown, embedding, size, time.time()),
+        )
+        self._total += size - (old[0] if old else 0)
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM extractions ORDER BY last_used")
+        victims: list[tuple[str]] = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            victims.append((key,))
+            self._total -= size
+        rows.close()
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", victims)
+        self.stats.evictions += len(victims)
+        digests = {m[1] for (key,) in victims if (m := _KEY_DIGEST.search(key))}
+        self._conn.executemany(
+            "DELETE FROM file_digests WHERE digest = ? AND NOT EXISTS "
+            "(SELECT 1 FROM extractions WHERE instr(key, ?) > 0)",
+            [(d, d) for d in digests],
+        )
@@ -2,12 +2,19 @@ from __future__ import annotations
 
 import importlib
 import os
-from collections.abc import Generator
+import threading
+from collections.abc import Generator, Iterable
 from contextlib import contextmanager
+from functools import cache
+from typing import Any
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import Insert
+
+_init_lock = threading.Lock()
+_db_initialized = False
 
 
 def mariadb_url_from_env() -> str:
@@ -22,19 +29,85 @@ def mariadb_url_from_env() -> str:
     db = os.getenv("MARIADB_DATABASE", "articles_db")
     return f"mysql+pymysql://{user}:{pwd}@{host}:{port}/{db}?charset=utf8mb4"
 
+def pool_options_from_env(url: str) -> dict[str, Any]:
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("MARIADB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("MARIADB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(os.getenv("MARIADB_POOL_RECYCLE", "3600")),
+    }
+
+@cache
 def get_engine(echo: bool = False) -> Engine:
-    engine = create_engine(mariadb_url_from_env(), echo=echo, pool_pre_ping=True)
-    return engine
+    """Process-wide engine (and connection pool), created on first use."""
+    url = mariadb_url_from_env()
+    return create_engine(url, echo=echo, pool_pre_ping=True, **pool_options_from_env(url))
+
+@cache
+def _session_factory() -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False)
 
 def init_db() -> None:
-    models_module = importlib.import_module("models.sql_models")
-    Base = models_module.Base
-    engine = get_engine()
-    Base.metadata.create_all(engine)
+    """Create tables once per process."""
+    global _db_initialized
+    with _init_lock:
+        if _db_initialized:
+            return
+        models_module = importlib.import_module("models.sql_models")
+        Base = models_module.Base
+        Base.metadata.create_all(get_engine())
+        _db_initialized = True
 
 @contextmanager
 def get_session() -> Generator[Session, None, None]:
-    engine = get_engine()
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    with SessionLocal() as session:
+    with _session_factory()() as session:
         yield session
+
+def upsert_statement(
+    session: Session, model: Any, key: str, update_columns: Iterable[str], **extra_set: Any
+) -> Insert:
+    """Bulk upsert of `model` rows on its unique column `key`.
+
+    MariaDB/MySQL get `INSERT ... ON DUPLICATE KEY UPDATE`; SQLite (used by
+    the benchmarks) gets `INSERT ... ON CONFLICT (key) DO UPDATE`. Those are
+    the only supported dialects; any other raises `ValueError`. Each column in
+    `update_columns` takes the incoming value, and `extra_set` adds
+    server-side expressions such as `updated_at=func.now()`. Execute it with a
+    list of parameter dicts (executemany).
+    """
+    dialect = session.get_bind().dialect.name
+    columns = list(update_columns)
+    if dialect in ("mysql", "mariadb"):
+        mysql = importlib.import_module("sqlalchemy.dialects.mysql")
+        stmt = mysql.insert(model)
+        return stmt.on_duplicate_key_update(
+            {c: stmt.inserted[c] for c in columns} | extra_set
+        )  # type: ignore[no-any-return]
+    if dialect == "sqlite":
+        sqlite = importlib.import_module("sqlalchemy.dialects.sqlite")
+        stmt = sqlite.insert(model)
+        return stmt.on_conflict_do_update(  # type: ignore[no-any-return]
+            index_elements=[key], set_={c: stmt.excluded[c] for c in columns} | extra_set
+        )
+    raise ValueError(f"no bulk upsert for the {dialect!r} dialect; use mysql/mariadb or sqlite")
+
+def dispose_engine(close: bool = True) -> None:
+    """Drop pooled connections.
+
+    In a forked worker call `dispose_engine(close=False)` first thing: the child
+    gets fresh connections without closing the parent's sockets. With
+    `close=True` the cached engine is discarded as well (e.g. after changing
+    the MARIADB_* environment).
+    """
+    global _db_initialized
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=close)
+    if close:
+        get_engine.cache_clear()
+        _session_factory.cache_clear()
+        with _init_lock:
+            _db_initialized = False
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: dispose_engine(close=False))
@@ -0,0 +1,155 @@
+# Shared module: the authoritative copy is data_pipeline_project/storage/mongo_writer.py.
+# Edit that one, then copy it to Pandas_arxiv_project/ unchanged.
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any
+
+from mongoengine import Document
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from storage.query_cache import invalidate_all
+
+
+@dataclass
+class BatchResult:
+    attempted: int
+    inserted: int = 0
+    upserted: int = 0
+    modified: int = 0
+    matched: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def written(self) -> int:
+        return self.attempted - len(self.errors)
+
+
+class BulkMongoWriter:
+    """Buffer documents for a mongoengine collection and write them in bulk.
+
+    With `upsert=True` (the default) each batch is one unordered `bulk_write` of
+    `UpdateOne({key: ...}, {"$set": doc}, upsert=True)`, so re-running a load
+    updates documents in place; otherwise batches go through unordered
+    `insert_many`. A batch is flushed once it holds `batch_size` documents or
+    `flush_interval` seconds have passed since the last flush. The writer has no
+    timer: the interval is checked on each add and by `flush_if_due()`, which a
+    caller whose source can go quiet must call while it waits.
+
+    `add()` validates a mongoengine document; `add_raw()` is the fast path that
+    takes an already-shaped dict and skips document construction entirely. When
+    upserting, an `_id` in the dict is dropped: `$set` may not change it.
+    `on_flush` receives the documents of each batch that were written
+    successfully (e.g. to feed a local vector index). Every flush that writes
+    something also invalidates this process's cached search results.
+    """
+
+    def __init__(
+        self,
+        document: type[Document],
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        key: str = "arxiv_id",
+        upsert: bool = True,
+        on_flush: Callable[[list[dict[str, Any]]], None] | None = None,
+    ) -> None:
+        self.collection = document._get_collection()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.key = key
+        self.upsert = upsert
+        self.on_flush = on_flush
+        self.results: list[BatchResult] = []
+        self._buffer: dict[Any, dict[str, Any]] = {}
+        self._inserts: list[dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> BulkMongoWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.flush()
+
+    @property
+    def written(self) -> int:
+        return sum(r.written for r in self.results)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer) + len(self._inserts)
+
+    def add(self, doc: Document) -> None:
+        doc.validate()
+        raw = doc.to_mongo().to_dict()
+        if raw.get("_id") is None:
+            raw.pop("_id", None)
+        self.add_raw(raw)
+
+    def add_raw(self, raw: dict[str, Any]) -> None:
+        if self.upsert:
+            if self.key not in raw:
+                raise ValueError(f"document has no {self.key!r} to upsert on")
+            if "_id" in raw:
+                raw = {k: v for k, v in raw.items() if k != "_id"}
+            # Last write wins for duplicate keys within a batch.
+            self._buffer[raw[self.key]] = raw
+        else:
+            self._inserts.append(raw)
+        if self.pending >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self) -> BatchResult | None:
+        """Flush if `flush_interval` seconds have passed since the last flush."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            return self.flush()
+        return None
+
+    def flush(self) -> BatchResult | None:
+        self._last_flush = time.monotonic()
+        if not self.pending:
+            return None
+        docs = list(self._buffer.values()) if self.upsert else self._inserts
+        self._buffer, self._inserts = {}, []
+        result = self._write_upserts(docs) if self.upsert else self._write_inserts(docs)
+        self.results.append(result)
+        if result.written:
+            invalidate_all()
+        if self.on_flush is not None:
+            failed = {e.get("index") for e in result.errors}
+            self.on_flush([d for i, d in enumerate(docs) if i not in failed])
+        return result
+
+    def _write_upserts(self, docs: list[dict[str, Any]]) -> BatchResult:
+        ops = [UpdateOne({self.key: doc[self.key]}, {"$set": doc}, upsert=True) for doc in docs]
+        result = BatchResult(attempted=len(ops))
+        try:
+            res = self.collection.bulk_write(ops, ordered=False)
+            details = res.bulk_api_result
+        except BulkWriteError as exc:
+            details = exc.details
+            result.errors = list(details.get("writeErrors", []))
+        result.upserted = int(details.get("nUpserted", 0))
+        result.modified = int(details.get("nModified", 0))
+        result.matched = int(details.get("nMatched", 0))
+        return result
+
+    def _write_inserts(self, docs: list[dict[str, Any]]) -> BatchResult:
+        result = BatchResult(attempted=len(docs))
+        try:
+            res = self.collection.insert_many(docs, ordered=False)
+            result.inserted = len(res.inserted_ids)
+        except BulkWriteError as exc:
+            result.inserted = int(exc.details.get("nInserted", 0))
+            result.errors = list(exc.details.get("writeErrors", []))
+        return result
@@ -1,8 +1,21 @@
 from __future__ import annotations
 
 import os
+import threading
+from typing import TYPE_CHECKING, Any
 
-from mongoengine import connect
+if TYPE_CHECKING:
+    from pymongo import MongoClient
+    from pymongo.collection import Collection
+
+# Same names as the `meta["collection"]` of the documents in models.mongo_models,
+# so read-only callers need neither mongoengine nor the models.
+ARTICLES_COLLECTION = "scientific_articles"
+PASSAGES_COLLECTION = "scientific_passages"
+
+_connect_lock = threading.Lock()
+_connected = False
+_client: MongoClient[dict[str, Any]] | None = None
 
 
 def mongo_url_from_env() -> str:
@@ -19,6 +32,62 @@ def mongo_url_from_env() -> str:
         return f"mongodb://{user}:{pwd}@{host}:{port}/{db}"
     return f"mongodb://{host}:{port}/{db}"
 
-def init_mongo() -> None:
-    url = mongo_url_from_env()
-    connect(host=url, uuidRepresentation="standard")
+def _client_options() -> dict[str, Any]:
+    return {
+        "uuidRepresentation": "standard",
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_MS", "300000")),
+    }
+
+def init_mongo(**connect_options: Any) -> None:
+    """Connect the default mongoengine alias once per process; later calls are free.
+
+    `connect_options` override the env-derived client options, e.g.
+    `mongo_client_class=mongomock.MongoClient` for benchmarks and tests.
+    """
+    global _connected
+    if _connected:
+        return
+    with _connect_lock:
+        if _connected:
+            return
+        from mongoengine import connect
+
+        connect(host=mongo_url_from_env(), **(_client_options() | connect_options))
+        _connected = True
+
+def mongo_collection(name: str) -> Collection[dict[str, Any]]:
+    """Raw pymongo collection `name` in the configured database, for readers.
+
+    After `init_mongo()` this is the mongoengine connection's collection.
+    Otherwise a plain pymongo client is opened on first use, so a search-only
+    process never imports mongoengine or the document models.
+    """
+    global _client
+    if _connected:
+        from mongoengine.connection import get_db
+
+        return get_db()[name]  # type: ignore[no-any-return]
+    with _connect_lock:
+        if _client is None:
+            from pymongo import MongoClient
+
+            _client = MongoClient(mongo_url_from_env(), **_client_options())
+    return _client.get_default_database("test")[name]  # "test": mongoengine's default too
+
+def dispose_mongo() -> None:
+    """Close the client; the next `init_mongo()` reconnects.
+
+    Worker processes that are started by forking a connected parent should call
+    this before their first query so they do not share the parent's client.
+    """
+    global _connected, _client
+    with _connect_lock:
+        if _connected:
+            from mongoengine import disconnect
+
+            disconnect()
+            _connected = False
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,103 @@
+# Shared module: the authoritative copy is data_pipeline_project/storage/query_cache.py.
+# Edit that one, then copy it to Pandas_arxiv_project/ unchanged.
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+
+# Bumped by every MongoDB write batch; entries cached under an older
+# generation are treated as misses.
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def current_generation() -> int:
+    """Generation to pass to `QueryCache.put`; read it before running the query."""
+    return _generation
+
+
+def invalidate_all() -> None:
+    """Invalidate every `QueryCache` in this process (called after Mongo writes)."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+@dataclass
+class QueryCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class QueryCache:
+    """In-memory TTL + LRU cache for search results.
+
+    Entries expire `ttl` seconds after they were stored and the least recently
+    used entry is dropped once `maxsize` is reached. `invalidate_all()` (run by
+    `BulkMongoWriter` after each flush) empties every cache in the process;
+    writes made by other processes only become visible after the TTL. Pass
+    `put` the `current_generation()` read before the query, so a result
+    computed while a write landed is not cached as fresh.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = QueryCacheStats()
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> QueryCache:
+        return cls(
+            maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL", "60")),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires, generation, value = entry
+            if generation != _generation or expires < time.monotonic():
+                del self._entries[key]
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """Store `value`; skipped if `generation` (default: now) is no longer current."""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is None:
+                generation = _generation
+            elif generation != _generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,265 @@
+# Shared module: the authoritative copy is data_pipeline_project/storage/vector_index.py.
+# Edit that one, then copy it to Pandas_arxiv_project/ unchanged.
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from models.embedding_codec import decode_embedding
+
+FloatMatrix = npt.NDArray[np.float32]
+IdArray = npt.NDArray[np.int64]
+
+_BLOCK = 65536  # rows scored per matmul in exact search
+
+
+def index_dir_from_env(default: Path) -> Path:
+    return Path(os.getenv("VECTOR_INDEX_DIR", str(default)))
+
+
+def _normalize(x: npt.ArrayLike) -> FloatMatrix:
+    m = np.atleast_2d(np.asarray(x, dtype=np.float32))
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return np.divide(m, norms, out=np.zeros_like(m), where=norms > 0)
+
+
+def _top_k(scores: npt.NDArray[np.float32], k: int) -> npt.NDArray[np.intp]:
+    """Column indices of the k best scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+class VectorIndex:
+    """On-disk cosine-similarity index over article embeddings.
+
+    Vectors live in one contiguous float32 file that is memory-mapped, keyed by
+    an int64 id (the MariaDB `article_id`). Search is exact (blocked matrix
+    multiply) until `train()` builds an IVF layout: k-means centroids plus a
+    list assignment per row, after which `nprobe` lists are scanned instead of
+    the whole matrix. `add()` appends new ids and overwrites existing ones in
+    place, assigning them to lists when the index is trained.
+
+    Single-writer: one process should add at a time; readers reopen to see adds.
+    """
+
+    def __init__(self, root: Path, dim: int = 128) -> None:
+        self.root = root
+        meta_path = root / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            self.dim = int(meta["dim"])
+            self.count = int(meta["count"])
+        else:
+            root.mkdir(parents=True, exist_ok=True)
+            self.dim, self.count = dim, 0
+            self._write_meta()
+        self._load()
+
+    # ---------- files ----------
+    @property
+    def _vectors_path(self) -> Path:
+        return self.root / "vectors.f32"
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.root / "ids.i64"
+
+    @property
+    def _centroids_path(self) -> Path:
+        return self.root / "centroids.f32"
+
+    @property
+    def _lists_path(self) -> Path:
+        return self.root / "lists.i32"
+
+    def _write_meta(self) -> None:
+        tmp = self.root / "meta.json.tmp"
+        tmp.write_text(json.dumps({"dim": self.dim, "count": self.count}))
+        tmp.replace(self.root / "meta.json")
+
+    def _append(self, path: Path, data: np.ndarray[Any, Any]) -> None:
+        """Write `data` as rows `count...` of `path` and fsync it.
+
+        The file is cut to `count` rows first, so rows left past `count` by an
+        add that crashed before committing `meta.json` are overwritten instead
+        of shifting every later row out of line with the other files.
+        """
+        with path.open("r+b" if path.exists() else "wb") as f:
+            f.truncate(self.count * (data.nbytes // len(data)))  # bytes per row
+            f.seek(0, os.SEEK_END)
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _map(self, path: Path, dtype: Any, shape: tuple[int, ...]) -> np.ndarray[Any, Any]:
+        if not shape[0]:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    def _load(self) -> None:
+        shape = (self.count, self.dim)
+        self.vectors: FloatMatrix = self._map(self._vectors_path, np.float32, shape)
+        self.ids: IdArray = self._map(self._ids_path, np.int64, (self.count,))
+        self._id_order: npt.NDArray[np.intp] | None = None
+        self.centroids: FloatMatrix | None = None
+        self.lists: npt.NDArray[np.int32] | None = None
+        self._list_rows: list[npt.NDArray[np.intp]] | None = None
+        if self._centroids_path.exists():
+            centroids = np.fromfile(self._centroids_path, dtype=np.float32)
+            self.centroids = centroids.reshape(-1, self.dim)
+            self.lists = self._map(self._lists_path, np.int32, (self.count,))
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    # ---------- writes ----------
+    def _rows_for(self, ids: IdArray) -> npt.NDArray[np.intp]:
+        """Row of each id, or -1 if absent."""
+        if not self.count:
+            return np.full(len(ids), -1, dtype=np.intp)
+        if self._id_order is None:
+            self._id_order = np.argsort(self.ids, kind="stable")
+        sorted_ids = self.ids[self._id_order]
+        pos = np.searchsorted(sorted_ids, ids)
+        pos_clipped = np.minimum(pos, self.count - 1)
+        hit = sorted_ids[pos_clipped] == ids
+        return np.where(hit, self._id_order[pos_clipped], -1)
+
+    def add(self, ids: Iterable[int], vectors: npt.ArrayLike) -> None:
+        ids_arr = np.fromiter(ids, dtype=np.int64)
+        vecs = _normalize(vectors)
+        if len(ids_arr) == 0:
+            return
+        if vecs.shape != (len(ids_arr), self.dim):
+            raise ValueError(f"expected {len(ids_arr)} vectors of dim {self.dim}, got {vecs.shape}")
+        # Last occurrence wins for ids repeated within the batch.
+        _, last = np.unique(ids_arr[::-1], return_index=True)
+        keep = np.sort(len(ids_arr) - 1 - last)
+        ids_arr, vecs = ids_arr[keep], vecs[keep]
+
+        rows = self._rows_for(ids_arr)
+        existing = rows >= 0
+        assign = self._assign(vecs) if self.trained else None
+        if existing.any():
+            mm = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                           shape=(self.count, self.dim))
+            mm[rows[existing]] = vecs[existing]
+            mm.flush()
+            if assign is not None:
+                lm = np.memmap(self._lists_path, dtype=np.int32, mode="r+", shape=(self.count,))
+                lm[rows[existing]] = assign[existing]
+                lm.flush()
+        new = ~existing
+        if new.any():
+            # Data files first, meta.json (the commit point) last.
+            self._append(self._vectors_path, vecs[new])
+            self._append(self._ids_path, ids_arr[new])
+            if assign is not None:
+                self._append(self._lists_path, assign[new].astype(np.int32))
+            self.count += int(new.sum())
+            self._write_meta()
+        self._load()
+
+    def add_documents(self, docs: Iterable[Mapping[str, Any]]) -> None:
+        """Add raw Mongo documents that carry `article_id` and a full-size `embedding`.
+
+        Embeddings may be in any stored format (list or packed binary).
+        """
+        pairs = []
+        for d in docs:
+            vec = decode_embedding(d.get("embedding"))
+            if d.get("article_id") is not None and vec is not None and len(vec) == self.dim:
+                pairs.append((int(d["article_id"]), vec))
+        if pairs:
+            self.add((p[0] for p in pairs), np.stack([p[1] for p in pairs]))
+
+    # ---------- IVF ----------
+    def _assign(self, vecs: FloatMatrix) -> npt.NDArray[np.int32]:
+        assert self.centroids is not None
+        out = np.empty(len(vecs), dtype=np.int32)
+        for i in range(0, len(vecs), _BLOCK):
+            out[i:i + _BLOCK] = np.argmax(vecs[i:i + _BLOCK] @ self.centroids.T, axis=1)
+        return out
+
+    def train(self, nlist: int | None = None, iters: int = 10, sample: int = 100_000,
+              seed: int = 0) -> None:
+        """Spherical k-means on a sample, then assign every row to its nearest centroid."""
+        if not self.count:
+            return
+        nlist = nlist or max(1, int(np.sqrt(self.count)))
+        nlist = min(nlist, self.count)
+        rng = np.random.default_rng(seed)
+        pick = rng.choice(self.count, size=min(sample, self.count), replace=False)
+        data = np.asarray(self.vectors[np.sort(pick)])
+        centroids = data[rng.choice(len(data), size=nlist, replace=False)].copy()
+        for _ in range(iters):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.empty_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(data[np.argsort(labels, kind="stable")],
+                                           starts[filled], axis=0)
+            # Re-seed empty clusters from random sample points.
+            sums[~filled] = data[rng.choice(len(data), size=int((~filled).sum()))]
+            centroids = _normalize(sums)
+        self.centroids = centroids
+        self._centroids_path.write_bytes(centroids.tobytes())
+        self._lists_path.write_bytes(self._assign(self.vectors).tobytes())
+        self._load()
+
+    def _rows_in_lists(self, lists: npt.NDArray[np.intp]) -> npt.NDArray[np.intp]:
+        assert self.lists is not None and self.centroids is not None
+        if self._list_rows is None:
+            order = np.argsort(self.lists, kind="stable")
+            bounds = np.searchsorted(self.lists[order], np.arange(len(self.centroids) + 1))
+            self._list_rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+        return np.concatenate([self._list_rows[i] for i in lists])
+
+    # ---------- search ----------
+    def search(
+        self, queries: npt.ArrayLike, k: int = 10, nprobe: int | None = 8
+    ) -> list[list[tuple[int, float]]]:
+        """Top-k (id, cosine) per query. Exact unless trained and `nprobe` is set."""
+        q = _normalize(queries)
+        if not self.count:
+            return [[] for _ in range(len(q))]
+        if self.trained and nprobe:
+            assert self.centroids is not None
+            probes = _top_k(q @ self.centroids.T, nprobe)
+            results = []
+            for qi in range(len(q)):
+                rows = np.sort(self._rows_in_lists(probes[qi]))
+                scores = np.asarray(self.vectors[rows]) @ q[qi]
+                best = _top_k(scores[None, :], k)[0]
+                results.append([(int(self.ids[rows[b]]), float(scores[b])) for b in best])
+            return results
+
+        best_scores = np.full((len(q), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(q), 0), dtype=np.intp)
+        for start in range(0, self.count, _BLOCK):
+            block = np.asarray(self.vectors[start:start + _BLOCK])
+            scores = np.concatenate([best_scores, q @ block.T], axis=1)
+            block_rows = np.broadcast_to(np.arange(start, start + len(block)), (len(q), len(block)))
+            rows = np.concatenate([best_rows, block_rows], axis=1)
+            top = _top_k(scores, k)
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_rows = np.take_along_axis(rows, top, axis=1)
+        return [
+            [
+                (int(self.ids[r]), float(s))
+                for r, s in zip(best_rows[i], best_scores[i], strict=True)
+            ]
+            for i in range(len(q))
+        ]
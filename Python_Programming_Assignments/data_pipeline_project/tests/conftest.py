@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import CSV_FIELDS
+
+
+@pytest.fixture
+def mariadb(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """A fresh SQLite database behind `storage.mariadb` for one test."""
+    from storage.mariadb import dispose_engine
+
+    monkeypatch.setenv("MARIADB_DSN", f"sqlite:///{tmp_path / 'articles.db'}")
+    dispose_engine()
+    yield
+    dispose_engine()
+
+
+@pytest.fixture
+def mongo() -> Iterator[None]:
+    """mongomock behind `storage.mongodb`, emptied after each test."""
+    mongomock = pytest.importorskip("mongomock")
+    from mongoengine.connection import get_db
+
+    from storage.mongodb import init_mongo
+
+    init_mongo(mongo_client_class=mongomock.MongoClient)
+    yield
+    db = get_db()
+    for name in db.list_collection_names():
+        db[name].delete_many({})
+
+
+@pytest.fixture
+def articles_csv(tmp_path: Path) -> Callable[..., Path]:
+    """Write CSV rows to `tmp_path/name`; fields a row omits are derived from its `arxiv_id`."""
+
+    def write(rows: list[dict[str, str]], name: str = "articles.csv") -> Path:
+        csv_path = tmp_path / name
+        with csv_path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, CSV_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                arxiv_id = row["arxiv_id"]
+                writer.writerow(
+                    {
+                        "title": f"Title {arxiv_id}",
+                        "summary": f"Summary of {arxiv_id}",
+                        "file_path": "papers/missing.pdf",
+                        "author_full_name": "Ada Lovelace",
+                        "author_title": "Research Scientist",
+                    }
+                    | row
+                )
+        return csv_path
+
+    return write
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import ScientificArticle
+from storage.mariadb import get_session
+from storage.mongo_writer import BulkMongoWriter
+from usecases.load_csv_to_mariadb import content_hash, stream_csv_to_mariadb
+from usecases.streaming_pipeline import run_streaming_pipeline
+
+pytestmark = pytest.mark.usefixtures("mariadb")
+
+ROWS = [{"arxiv_id": f"arXiv:{i:03d}"} for i in range(30)]
+
+
+def _stored() -> dict[str, tuple[str | None, object]]:
+    """arxiv_id -> (content_hash, updated_at)."""
+    stmt = select(
+        ScientificArticle.arxiv_id, ScientificArticle.content_hash, ScientificArticle.updated_at
+    )
+    with get_session() as session:
+        return {a: (h, u) for a, h, u in session.execute(stmt)}
+
+
+def test_content_hash_covers_every_loaded_field() -> None:
+    article = {"title": "t", "summary": "s", "file_path": "p.pdf"}
+    base = content_hash(article, "Ada")
+
+    assert content_hash(dict(article), "Ada") == base
+    assert content_hash(article, "Grace") != base
+    for field in article:
+        assert content_hash(article | {field: "changed"}, "Ada") != base
+
+
+def test_reloading_the_same_csv_skips_every_row(articles_csv: Callable[..., Path]) -> None:
+    csv_path = articles_csv(ROWS)
+    stream_csv_to_mariadb(csv_path, chunk_size=7)
+    before = _stored()
+
+    stats = stream_csv_to_mariadb(csv_path, chunk_size=7)
+
+    assert (stats.articles_created, stats.articles_updated, stats.articles_skipped) == (0, 0, 30)
+    assert stats.authors_created == 0
+    assert _stored() == before
+
+
+def test_only_changed_rows_are_updated(articles_csv: Callable[..., Path]) -> None:
+    stream_csv_to_mariadb(articles_csv(ROWS))
+    before = _stored()
+    changed = [dict(r) for r in ROWS]
+    changed[3]["summary"] = "A corrected summary"
+    changed[4]["author_full_name"] = "Grace Hopper"
+
+    stats = stream_csv_to_mariadb(articles_csv(changed, "changed.csv"))
+
+    assert (stats.articles_created, stats.articles_updated, stats.articles_skipped) == (0, 2, 28)
+    after = _stored()
+    assert {a for a in after if after[a][0] != before[a][0]} == {"arXiv:003", "arXiv:004"}
+
+
+@pytest.mark.usefixtures("mongo")
+def test_streaming_rerun_resends_rows_whose_documents_were_never_written(
+    articles_csv: Callable[..., Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    csv_path = articles_csv(ROWS)
+    flush = BulkMongoWriter.flush
+    flushes = 0
+
+    def fail_after_first_batch(self: BulkMongoWriter) -> object:
+        nonlocal flushes
+        if self.pending:
+            flushes += 1
+            if flushes > 1:
+                raise RuntimeError("MongoDB unavailable")
+        return flush(self)
+
+    options = {"chunk_size": 10, "batch_size": 10, "flush_interval": 60.0, "workers": 1}
+    monkeypatch.setattr(BulkMongoWriter, "flush", fail_after_first_batch)
+    with pytest.raises(RuntimeError, match="MongoDB unavailable"):
+        run_streaming_pipeline(csv_path, tmp_path, **options)
+    monkeypatch.setattr(BulkMongoWriter, "flush", flush)
+    assert ScientificArticleDoc.objects.count() == 10
+    assert sum(h is None for h, _ in _stored().values()) == 20
+
+    rerun = run_streaming_pipeline(csv_path, tmp_path, **options)
+
+    assert (rerun.articles_loaded, rerun.articles_skipped) == (20, 10)
+    assert rerun.documents_written == 20
+    assert ScientificArticleDoc.objects.count() == 30
+    assert all(h is not None for h, _ in _stored().values())
+
+    third = run_streaming_pipeline(csv_path, tmp_path, **options)
+
+    assert (third.articles_loaded, third.articles_skipped, third.documents_written) == (0, 30, 0)
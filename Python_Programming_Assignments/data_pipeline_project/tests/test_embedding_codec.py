@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from bson import BSON
+from bson.binary import Binary
+
+from models.embedding_codec import (
+    VECTOR_SUBTYPE,
+    decode_embedding,
+    embedding_format,
+    embedding_format_from_env,
+    encode_embedding,
+)
+from usecases.embedding import compute_embedding
+
+VECTOR = compute_embedding("packed embeddings keep their direction")
+
+
+def _bson_round_trip(value: object) -> object:
+    return BSON.encode({"v": value}).decode()["v"]
+
+
+def test_list_round_trips_exactly() -> None:
+    stored = _bson_round_trip(encode_embedding(VECTOR, "list"))
+
+    assert stored == VECTOR
+    assert embedding_format(stored) == "list"
+    np.testing.assert_array_equal(decode_embedding(stored), np.asarray(VECTOR, np.float32))
+
+
+def test_float32_packs_four_bytes_per_dimension_and_decodes_without_copying() -> None:
+    encoded = encode_embedding(VECTOR, "float32")
+
+    assert isinstance(encoded, Binary) and encoded.subtype == VECTOR_SUBTYPE
+    assert len(encoded) == 2 + 4 * len(VECTOR)
+    stored = _bson_round_trip(encoded)
+    decoded = decode_embedding(stored)
+    assert decoded is not None and decoded.dtype == np.float32
+    assert not decoded.flags.writeable  # a view of the BSON bytes
+    np.testing.assert_array_equal(decoded, np.asarray(VECTOR, np.float32))
+    assert embedding_format(stored) == "float32"
+
+
+def test_int8_is_within_half_a_step_and_keeps_the_ranking() -> None:
+    encoded = encode_embedding(VECTOR, "int8")
+
+    assert len(encoded) == 2 + len(VECTOR)
+    decoded = decode_embedding(_bson_round_trip(encoded))
+    assert decoded is not None
+    assert np.abs(decoded - np.asarray(VECTOR)).max() <= 0.5 / 127 + 1e-7
+    other = np.asarray(compute_embedding("an unrelated sentence about cooking"))
+    near = np.asarray(compute_embedding("packed embeddings keep direction"))
+    assert decoded @ near > decoded @ other
+    assert embedding_format(encoded) == "int8"
+
+
+def test_out_of_range_components_are_clipped_to_int8() -> None:
+    decoded = decode_embedding(encode_embedding([2.0, -2.0, 0.5], "int8"))
+
+    assert decoded is not None
+    np.testing.assert_allclose(decoded, [1.0, -1.0, 64 / 127])
+
+
+@pytest.mark.parametrize("value", [None, [], b"", bytes((0x27, 0))])
+def test_missing_or_empty_values_decode_to_none(value: object) -> None:
+    assert decode_embedding(value) is None
+    assert encode_embedding(None) is None
+
+
+def test_unknown_packed_dtype_is_rejected() -> None:
+    with pytest.raises(ValueError, match="0x10"):
+        decode_embedding(bytes((0x10, 0, 1, 2)))
+
+
+def test_format_comes_from_the_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("EMBEDDING_FORMAT", " Float32 ")
+    assert embedding_format_from_env() == "float32"
+    assert embedding_format(encode_embedding(VECTOR)) == "float32"
+
+    monkeypatch.setenv("EMBEDDING_FORMAT", "float16")
+    with pytest.raises(ValueError, match="EMBEDDING_FORMAT"):
+        embedding_format_from_env()
+
+    monkeypatch.delenv("EMBEDDING_FORMAT")
+    assert embedding_format_from_env() == "list"
+
+
+@pytest.mark.usefixtures("mongo")
+@pytest.mark.parametrize("fmt", ["list", "float32", "int8"])
+def test_documents_read_back_every_format(monkeypatch: pytest.MonkeyPatch, fmt: str) -> None:
+    from models.mongo_models import AuthorEmbedded, ScientificArticleDoc
+
+    monkeypatch.setenv("EMBEDDING_FORMAT", fmt)
+    ScientificArticleDoc(
+        title="t",
+        summary="s",
+        file_path="p.pdf",
+        arxiv_id=f"codec-{fmt}",
+        author=AuthorEmbedded(full_name="Ada"),
+        text="x",
+        embedding=VECTOR,
+    ).save()
+
+    raw = ScientificArticleDoc._get_collection().find_one({"arxiv_id": f"codec-{fmt}"})
+    assert embedding_format(raw["embedding"]) == fmt
+    doc = ScientificArticleDoc.objects.get(arxiv_id=f"codec-{fmt}")
+    assert doc.vector is not None
+    np.testing.assert_allclose(doc.vector, VECTOR, atol=0.5 / 127 + 1e-7)
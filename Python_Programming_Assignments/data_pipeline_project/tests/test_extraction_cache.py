@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from storage.extraction_cache import ExtractionCache
+
+
+@pytest.fixture
+def pdfs(tmp_path: Path) -> list[Path]:
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"paper_{i}.pdf"
+        path.write_bytes(os.urandom(256))
+        paths.append(path)
+    return paths
+
+
+def _digest_paths(cache: ExtractionCache) -> set[str]:
+    return {row[0] for row in cache._conn.execute("SELECT path FROM file_digests")}
+
+
+def test_entries_round_trip_and_survive_reopening(tmp_path: Path, pdfs: list[Path]) -> None:
+    with ExtractionCache(tmp_path / "c.sqlite", "v1") as cache:
+        key = cache.key_for(pdfs[0])
+        assert key is not None
+        assert cache.get_markdown(key) is None
+        cache.put_markdown(key, "# text")
+        cache.put_embedding(key, [0.5, -0.25])
+
+    with ExtractionCache(tmp_path / "c.sqlite", "v1") as cache:
+        assert cache.key_for(pdfs[0]) == key
+        assert cache.get_markdown(key) == "# text"
+        assert cache.get_embedding(key) == [0.5, -0.25]
+        assert (cache.stats.hits, cache.stats.misses) == (1, 0)
+
+
+def test_a_changed_file_or_version_misses(tmp_path: Path, pdfs: list[Path]) -> None:
+    with ExtractionCache(tmp_path / "c.sqlite", "v1") as cache:
+        key = cache.key_for(pdfs[0])
+        pdfs[0].write_bytes(b"edited")
+        assert cache.key_for(pdfs[0]) != key
+        assert cache.key_for(tmp_path / "missing.pdf") is None
+    with ExtractionCache(tmp_path / "c.sqlite", "v2") as cache:
+        assert cache.key_for(pdfs[1]) != key
+
+
+def test_eviction_drops_least_recently_used_entries_and_their_digests(
+    tmp_path: Path, pdfs: list[Path]
+) -> None:
+    body = os.urandom(900).hex()  # about 1 KB compressed
+    with ExtractionCache(tmp_path / "c.sqlite", "v1", max_bytes=3500) as cache:
+        keys = [cache.key_for(p) for p in pdfs]
+        assert None not in keys
+        cache.put_markdown(f"{keys[0]}:passages", "head")  # a second entry for paper 0
+        for key in keys[:3]:
+            cache.put_markdown(key, body)
+        assert cache.get_markdown(keys[0]) is not None  # paper 0 is now the most recent
+        for key in keys[3:]:
+            cache.put_markdown(key, body)
+
+        assert cache.stats.evictions > 0
+        kept = {p.name for p, k in zip(pdfs, keys, strict=True) if cache.get_markdown(k)}
+        assert "paper_0.pdf" in kept and "paper_1.pdf" not in kept
+        # Digest rows remain only for files with a cached entry.
+        assert {Path(p).name for p in _digest_paths(cache)} == kept | {"paper_0.pdf"}
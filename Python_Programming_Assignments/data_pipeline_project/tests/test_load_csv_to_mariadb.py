@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from models.sql_models import Author, ScientificArticle
+from storage.mariadb import get_session
+from usecases.load_csv_to_mariadb import iter_chunks, stream_csv_to_mariadb
+
+pytestmark = pytest.mark.usefixtures("mariadb")
+
+
+def _articles() -> dict[str, tuple[str, str, str]]:
+    """arxiv_id -> (title, summary, author name) of every stored article."""
+    stmt = select(
+        ScientificArticle.arxiv_id,
+        ScientificArticle.title,
+        ScientificArticle.summary,
+        Author.full_name,
+    ).join(Author)
+    with get_session() as session:
+        return {a: (t, s, n) for a, t, s, n in session.execute(stmt)}
+
+
+def _count(model: type) -> int:
+    with get_session() as session:
+        return int(session.scalar(select(func.count()).select_from(model)) or 0)
+
+
+def test_iter_chunks_splits_lazily() -> None:
+    rows = ({"n": str(i)} for i in range(25))
+    assert [len(c) for c in iter_chunks(rows, 10)] == [10, 10, 5]
+    assert list(iter_chunks([], 10)) == []
+
+
+@pytest.mark.parametrize(("chunk_size", "commit_every"), [(1, 1), (7, 2), (1000, 1)])
+def test_loads_every_row_across_chunk_and_commit_boundaries(
+    articles_csv: Callable[..., Path], chunk_size: int, commit_every: int
+) -> None:
+    rows = [
+        {"arxiv_id": f"arXiv:{i:04d}", "author_full_name": f"Author {i % 4}"} for i in range(30)
+    ]
+    stats = stream_csv_to_mariadb(
+        articles_csv(rows), chunk_size=chunk_size, commit_every=commit_every
+    )
+
+    assert (stats.articles_created, stats.authors_created) == (30, 4)
+    assert (stats.articles_updated, stats.articles_skipped) == (0, 0)
+    stored = _articles()
+    assert len(stored) == 30
+    assert stored["arXiv:0005"] == ("Title arXiv:0005", "Summary of arXiv:0005", "Author 1")
+    assert _count(Author) == 4
+
+
+def test_strips_fields_and_keeps_the_last_duplicate_in_a_chunk(
+    articles_csv: Callable[..., Path],
+) -> None:
+    rows = [
+        {"arxiv_id": " arXiv:1 ", "title": "  First  ", "author_full_name": " Ada Lovelace "},
+        {"arxiv_id": "arXiv:1", "title": "Second"},
+    ]
+    stats = stream_csv_to_mariadb(articles_csv(rows))
+
+    assert (stats.articles_created, stats.articles_skipped) == (1, 1)
+    assert _articles() == {"arXiv:1": ("Second", "Summary of arXiv:1", "Ada Lovelace")}
+
+
+def test_author_names_differing_only_in_case_in_a_chunk_share_one_author(
+    articles_csv: Callable[..., Path],
+) -> None:
+    # Across chunks this relies on MariaDB's case-insensitive collation, not SQLite's.
+    rows = [
+        {"arxiv_id": "arXiv:1", "author_full_name": "Ada Lovelace"},
+        {"arxiv_id": "arXiv:2", "author_full_name": "ADA LOVELACE"},
+    ]
+    stats = stream_csv_to_mariadb(articles_csv(rows))
+
+    assert stats.authors_created == 1
+    assert len({name.casefold() for _, _, name in _articles().values()}) == 1
+
+
+def test_empty_csv_loads_nothing(articles_csv: Callable[..., Path]) -> None:
+    stats = stream_csv_to_mariadb(articles_csv([]))
+
+    assert (stats.authors_created, stats.articles_created) == (0, 0)
+    assert _count(ScientificArticle) == 0
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+import storage.mongo_writer as mongo_writer
+from models.mongo_models import ScientificArticleDoc
+from storage.mongo_writer import BulkMongoWriter
+
+pytestmark = pytest.mark.usefixtures("mongo")
+
+
+def _doc(arxiv_id: str, **fields: Any) -> dict[str, Any]:
+    return {"arxiv_id": arxiv_id, "title": f"Title {arxiv_id}"} | fields
+
+
+def _titles() -> dict[str, str]:
+    return {d["arxiv_id"]: d["title"] for d in ScientificArticleDoc._get_collection().find()}
+
+
+def test_flushes_every_batch_size_docs_keeping_the_last_duplicate() -> None:
+    flushed: list[list[str]] = []
+    with BulkMongoWriter(
+        ScientificArticleDoc,
+        batch_size=3,
+        flush_interval=60,
+        on_flush=lambda docs: flushed.append([d["arxiv_id"] for d in docs]),
+    ) as writer:
+        writer.add_raw(_doc("a"))
+        writer.add_raw(_doc("a", title="newer"))
+        writer.add_raw(_doc("b"))
+        writer.add_raw(_doc("c"))
+        assert writer.pending == 0
+        writer.add_raw(_doc("d"))
+
+    assert flushed == [["a", "b", "c"], ["d"]]
+    assert _titles()["a"] == "newer"
+    assert writer.written == 4
+
+
+def test_rerunning_updates_documents_in_place() -> None:
+    for title in ("first", "second"):
+        with BulkMongoWriter(ScientificArticleDoc) as writer:
+            writer.add_raw(_doc("a", title=title))
+
+    assert _titles() == {"a": "second"}
+    assert (writer.results[-1].upserted, writer.results[-1].modified) == (0, 1)
+
+
+def test_flush_if_due_pushes_out_a_quiet_partial_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [0.0]
+    monkeypatch.setattr(mongo_writer.time, "monotonic", lambda: now[0])
+    writer = BulkMongoWriter(ScientificArticleDoc, batch_size=100, flush_interval=5)
+    writer.add_raw(_doc("a"))
+
+    now[0] = 4.9
+    assert writer.flush_if_due() is None
+    assert writer.pending == 1
+    now[0] = 5.0
+    result = writer.flush_if_due()
+
+    assert result is not None and result.written == 1
+    assert writer.pending == 0
+
+
+def test_add_raw_requires_the_key_and_ignores_a_stale_id() -> None:
+    writer = BulkMongoWriter(ScientificArticleDoc)
+    with pytest.raises(ValueError, match="'arxiv_id'"):
+        writer.add_raw({"title": "no key"})
+
+    writer.add_raw(_doc("a"))
+    writer.flush()
+    raw = _doc("a", _id="not-the-stored-id", title="renamed")
+    writer.add_raw(raw)
+    result = writer.flush()
+
+    assert result is not None and not result.errors
+    assert _titles() == {"a": "renamed"}
+    assert raw["_id"] == "not-the-stored-id"  # the caller's dict is left alone
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from itertools import count, islice
+
+import pytest
+
+from models.mongo_models import ScientificPassageDoc
+from usecases.embedding import StreamingEmbedding, compute_embedding
+from usecases.passages import PassageWriter, iter_passages
+
+WORDS = [f"w{i:03d}" for i in range(200)]  # unique, so passages can be stitched back
+
+
+def _pages(words: list[str], per_page: int) -> list[str]:
+    return [" ".join(words[i : i + per_page]) for i in range(0, len(words), per_page)]
+
+
+@pytest.mark.parametrize("overlap", [0, 10, 30])
+def test_passages_cover_the_text_in_order_within_size(overlap: int) -> None:
+    passages = list(iter_passages(_pages(WORDS, 17), size=60, overlap=overlap))
+
+    assert all(len(p) <= 60 for p in passages)
+    stitched = list(dict.fromkeys(w for p in passages for w in p.split()))
+    assert stitched == WORDS
+
+
+@pytest.mark.parametrize("overlap", [0, 10, 30])
+def test_each_passage_repeats_trailing_words_up_to_overlap(overlap: int) -> None:
+    passages = list(iter_passages(WORDS, size=60, overlap=overlap))
+
+    for before, after in zip(passages, passages[1:], strict=False):
+        previous, words = before.split(), after.split()
+        repeated = [w for w in words if w in previous]
+        assert repeated == previous[len(previous) - len(repeated) :]
+        assert len(" ".join(repeated)) <= overlap
+        # As many trailing words as fit: one more would exceed the overlap.
+        if len(repeated) < len(previous):
+            assert len(" ".join(previous[-len(repeated) - 1 :])) > overlap
+
+
+def test_words_never_span_two_parts() -> None:
+    assert list(iter_passages(["alpha", "beta", " gamma "], size=100)) == ["alpha beta gamma"]
+
+
+def test_a_word_longer_than_size_is_a_passage_of_its_own() -> None:
+    long = "x" * 25
+    passages = list(iter_passages(["one two", long, "three four"], size=10, overlap=4))
+
+    assert passages == ["one two", long, "three four"]
+
+
+def test_a_long_word_is_not_repeated_as_overlap() -> None:
+    long = "y" * 12
+    passages = list(iter_passages([f"ab {long} cd ef"], size=10, overlap=5))
+
+    assert passages == ["ab", long, "cd ef"]
+
+
+def test_parts_are_read_lazily() -> None:
+    def endless() -> Iterator[str]:
+        for i in count():
+            yield f"word{i}"
+
+    assert list(islice(iter_passages(endless(), size=20), 2)) == [
+        "word0 word1 word2",
+        "word3 word4 word5",
+    ]
+
+
+def test_empty_text_and_bad_overlap() -> None:
+    assert list(iter_passages(["", "  \n"])) == []
+    with pytest.raises(ValueError, match="overlap"):
+        list(iter_passages(["text"], size=10, overlap=10))
+
+
+def test_streaming_embedding_matches_the_whole_text() -> None:
+    pages = _pages(WORDS, 23)
+    streamed = StreamingEmbedding()
+    for page in pages:
+        streamed.update(page)
+
+    assert streamed.embedding() == pytest.approx(compute_embedding("\n\n".join(pages)))
+
+
+@pytest.mark.usefixtures("mongo")
+def test_rewriting_a_shorter_article_drops_its_leftover_passages() -> None:
+    article = {"article_id": 7, "arxiv_id": "a007", "title": "T"}
+    with PassageWriter(size=60, overlap=0, batch_size=4, embed_batch_size=3) as writer:
+        assert not writer.has(7)
+        first = writer.add_pages(article, _pages(WORDS, 17))
+    assert ScientificPassageDoc.objects(article_id=7).count() == first > 5
+
+    with PassageWriter(size=60, overlap=0) as writer:
+        second = writer.add_pages(article, _pages(WORDS[:30], 17))
+        writer.flush()
+        assert writer.has(7)
+
+    stored = ScientificPassageDoc.objects(article_id=7).order_by("seq")
+    assert [p.seq for p in stored] == list(range(second))
+    assert [p.passage_id for p in stored][:2] == ["7:0", "7:1"]
+    assert stored[0].text.startswith("w000 w001")
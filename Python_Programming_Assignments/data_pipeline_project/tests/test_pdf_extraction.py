@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from storage.extraction_cache import ExtractionCache
+from usecases.pdf_extraction import (
+    NO_TEXT_BODY,
+    UNAVAILABLE_BODY,
+    extract_markdown_parallel,
+    extract_with_timeout,
+)
+
+pypdf = pytest.importorskip("pypdf")
+
+
+class _FailingPassages:
+    """Stands in for `PassageWriter`: reads every page, then fails to store them."""
+
+    head_chars = 100
+
+    def add_pages(self, article: Mapping[str, Any], pages: Iterable[str]) -> int:
+        list(pages)
+        raise ConnectionError("MongoDB unavailable")
+
+
+@pytest.fixture
+def blank_pdf(tmp_path: Path) -> Path:
+    writer = pypdf.PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    path = tmp_path / "blank.pdf"
+    with path.open("wb") as f:
+        writer.write(f)
+    return path
+
+
+@pytest.fixture
+def broken_pdf(tmp_path: Path) -> Path:
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"not a pdf at all")
+    return path
+
+
+def test_an_unreadable_file_becomes_a_placeholder(blank_pdf: Path, broken_pdf: Path) -> None:
+    assert NO_TEXT_BODY in extract_with_timeout(blank_pdf, timeout=5).markdown
+    assert UNAVAILABLE_BODY in extract_with_timeout(broken_pdf, timeout=5).markdown
+    assert UNAVAILABLE_BODY in extract_with_timeout(broken_pdf, timeout=None).markdown
+
+
+def test_errors_storing_passages_are_not_swallowed(blank_pdf: Path) -> None:
+    with pytest.raises(ConnectionError, match="MongoDB unavailable"):
+        extract_with_timeout(
+            blank_pdf,
+            5,
+            passages=_FailingPassages(),  # type: ignore[arg-type]
+            article={"article_id": 1},
+        )
+
+
+def test_placeholders_are_not_cached(tmp_path: Path, blank_pdf: Path, broken_pdf: Path) -> None:
+    items = [("blank", blank_pdf), ("broken", broken_pdf)]
+    with ExtractionCache(tmp_path / "c.sqlite", "v1") as cache:
+        first = dict(extract_markdown_parallel(items, workers=1, cache=cache))
+        again = dict(extract_markdown_parallel(items, workers=1, cache=cache))
+
+        assert first == again
+        assert UNAVAILABLE_BODY in again["broken"].markdown
+        assert (cache.stats.hits, cache.stats.misses) == (1, 3)
+
+
+def test_the_pool_yields_every_file(blank_pdf: Path, broken_pdf: Path) -> None:
+    items = [(i, blank_pdf if i % 2 else broken_pdf) for i in range(6)]
+
+    results = dict(extract_markdown_parallel(items, workers=2, timeout=30))
+
+    assert sorted(results) == list(range(6))
+    for i, result in results.items():
+        assert (NO_TEXT_BODY if i % 2 else UNAVAILABLE_BODY) in result.markdown
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+import storage.query_cache as query_cache
+import usecases.search_mongodb as search
+from storage.query_cache import QueryCache, current_generation, invalidate_all
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Settable `time.monotonic` for the cache: `clock[0] = t`."""
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_hits_until_the_ttl_runs_out(clock: list[float]) -> None:
+    cache = QueryCache(maxsize=4, ttl=10)
+    cache.put("q", [1])
+
+    clock[0] += 9.9
+    assert cache.get("q") == [1]
+    clock[0] += 0.2
+    assert cache.get("q") is None
+    assert len(cache) == 0
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_the_least_recently_used_entry_is_evicted() -> None:
+    cache = QueryCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.stats.evictions == 1
+
+
+def test_a_write_invalidates_every_cache() -> None:
+    first, second = QueryCache(), QueryCache()
+    first.put("q", 1)
+    second.put("q", 2)
+
+    invalidate_all()
+
+    assert first.get("q") is None and second.get("q") is None
+    first.put("q", 3)
+    assert first.get("q") == 3
+
+
+def test_a_result_computed_across_a_write_is_not_stored() -> None:
+    cache = QueryCache()
+    generation = current_generation()
+    invalidate_all()  # a write lands while the query runs
+
+    cache.put("q", "stale", generation)
+    assert cache.get("q") is None
+
+    cache.put("q", "fresh", current_generation())
+    assert cache.get("q") == "fresh"
+
+
+@pytest.mark.parametrize(("maxsize", "ttl"), [(0, 60.0), (8, 0.0)])
+def test_a_zero_size_or_ttl_disables_caching(maxsize: int, ttl: float) -> None:
+    cache = QueryCache(maxsize=maxsize, ttl=ttl)
+    cache.put("q", 1)
+
+    assert cache.get("q") is None
+
+
+def test_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SEARCH_CACHE_SIZE", "3")
+    monkeypatch.setenv("SEARCH_CACHE_TTL", "1.5")
+
+    cache = QueryCache.from_env()
+
+    assert (cache.maxsize, cache.ttl) == (3, 1.5)
+
+
+@pytest.mark.usefixtures("mongo")
+def test_search_text_is_cached_unless_a_write_lands_during_the_query(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(search, "SEARCH_CACHE", QueryCache())
+    calls: list[str] = []
+    write_during_query = True
+
+    def text_hits(collection: Any, query: str, limit: int, fields: Any = ()) -> list[Any]:
+        calls.append(query)
+        if write_during_query:
+            invalidate_all()
+        return [{"title": f"hit {len(calls)}", "score": 1.0}]
+
+    monkeypatch.setattr(search, "_text_hits", text_hits)
+
+    assert search.search_text("q") == [("hit 1", 1.0)]
+    assert search.search_text("q") == [("hit 2", 1.0)]  # the first result was not cached
+    write_during_query = False
+    assert search.search_text("q") == [("hit 3", 1.0)]
+    assert search.search_text("q") == [("hit 3", 1.0)]
+    assert len(calls) == 3
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.sql.dml import Update
+
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import ScientificArticle, TransferShard
+from storage.mariadb import get_session
+from usecases.load_csv_to_mariadb import stream_csv_to_mariadb
+from usecases.sharded_transfer import (
+    ShardLost,
+    _checkpoint,
+    _predicate,
+    claim_shard,
+    plan_shards,
+    run_shard_worker,
+    shard_status,
+)
+
+pytestmark = pytest.mark.usefixtures("mariadb", "mongo")
+
+
+@pytest.fixture
+def articles(articles_csv: Callable[..., Path]) -> list[int]:
+    stream_csv_to_mariadb(articles_csv([{"arxiv_id": f"a{i:03d}"} for i in range(20)]))
+    with get_session() as session:
+        return sorted(session.scalars(select(ScientificArticle.id)))
+
+
+def _members(shard: TransferShard) -> set[int]:
+    with get_session() as session:
+        return set(session.scalars(select(ScientificArticle.id).where(_predicate(shard))))
+
+
+def _make_stale(run: str, shard: int) -> None:
+    with get_session() as session:
+        session.execute(
+            update(TransferShard)
+            .where(TransferShard.run == run, TransferShard.shard == shard)
+            .values(heartbeat_at=datetime(2000, 1, 1))
+        )
+        session.commit()
+
+
+@pytest.mark.parametrize("mode", ["range", "hash"])
+def test_shards_partition_the_articles(articles: list[int], mode: Any) -> None:
+    shards = plan_shards("r", 3, mode)
+
+    members = [_members(s) for s in shards]
+    assert set().union(*members) == set(articles)
+    assert sum(map(len, members)) == len(articles)
+    assert all(members)
+    if mode == "range":
+        assert shards[0].lo is None and shards[-1].hi is None
+
+
+def test_planning_an_existing_run_keeps_its_shards(articles: list[int]) -> None:
+    plan_shards("r", 2)
+
+    again = plan_shards("r", 4, "hash")
+    assert [(s.shard_count, s.mode) for s in again] == [(2, "range")] * 2
+
+    reset = plan_shards("r", 4, "hash", reset=True)
+    assert [(s.shard_count, s.mode) for s in reset] == [(4, "hash")] * 4
+
+
+def test_plan_rejects_bad_arguments() -> None:
+    with pytest.raises(ValueError, match="shard mode"):
+        plan_shards("r", 2, "modulo")  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="at least 1"):
+        plan_shards("r", 0)
+
+
+def test_a_worker_losing_the_claim_race_takes_the_next_shard(
+    articles: list[int], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    plan_shards("r", 2)
+    with get_session() as mine, get_session() as theirs:
+        execute = mine.execute
+        raced = []
+
+        def claimed_meanwhile(stmt: Any, *args: Any, **kwargs: Any) -> Any:
+            # Another worker claims shard 0 between our candidate read and our CAS update.
+            if isinstance(stmt, Update) and not raced:
+                raced.append(claim_shard(theirs, "r", "them"))
+            return execute(stmt, *args, **kwargs)
+
+        monkeypatch.setattr(mine, "execute", claimed_meanwhile)
+        shard = claim_shard(mine, "r", "me")
+
+        assert raced[0] is not None and raced[0].shard == 0
+        assert shard is not None
+        assert (shard.shard, shard.worker, shard.claim) == (1, "me", 1)
+        assert claim_shard(theirs, "r", "them") is None
+
+
+def test_a_fresh_running_shard_is_not_claimed_again(articles: list[int]) -> None:
+    plan_shards("r", 1)
+    with get_session() as session:
+        assert claim_shard(session, "r", "me") is not None
+        assert claim_shard(session, "r", "them") is None
+
+
+def test_a_stale_claim_is_reclaimed_and_the_old_worker_loses_it(articles: list[int]) -> None:
+    plan_shards("r", 1)
+    with get_session() as first, get_session() as second:
+        mine = claim_shard(first, "r", "me", stale_after=60)
+        assert mine is not None
+        old_claim = mine.claim
+        _make_stale("r", 0)
+
+        theirs = claim_shard(second, "r", "them", stale_after=60)
+
+        assert theirs is not None
+        assert (theirs.worker, theirs.claim) == ("them", old_claim + 1)
+        with pytest.raises(ShardLost):
+            _checkpoint(first, mine, old_claim, last_id=999)
+    assert shard_status("r")[0].last_id == 0
+
+
+def test_workers_transfer_every_shard_and_resume_from_checkpoints(
+    articles: list[int], tmp_path: Path
+) -> None:
+    plan_shards("r", 3)
+
+    results = run_shard_worker("r", tmp_path, worker="w1", batch_size=4)
+
+    assert sorted(r.shard for r in results) == [0, 1, 2]
+    assert {r.status for r in results} == {"done"}
+    assert sum(r.transferred for r in results) == len(articles)
+    assert ScientificArticleDoc.objects.count() == len(articles)
+
+    # A crashed worker left shard 1 running with a checkpoint in the middle.
+    shard = shard_status("r")[1]
+    members = sorted(_members(shard))
+    with get_session() as session:
+        session.execute(
+            update(TransferShard)
+            .where(TransferShard.run == "r", TransferShard.shard == 1)
+            .values(status="running", last_id=members[2], transferred=3)
+        )
+        session.commit()
+    _make_stale("r", 1)
+
+    resumed = run_shard_worker("r", tmp_path, worker="w2", batch_size=4, stale_after=60)
+
+    assert [(r.shard, r.status, r.transferred) for r in resumed] == [(1, "done", len(members) - 3)]
+    assert shard_status("r")[1].transferred == len(members)
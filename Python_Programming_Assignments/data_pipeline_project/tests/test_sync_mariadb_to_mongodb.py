@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import select, update
+
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import ScientificArticle
+from storage.mariadb import get_session
+from storage.mongo_writer import BatchResult, BulkMongoWriter
+from usecases.load_csv_to_mariadb import stream_csv_to_mariadb
+from usecases.sync_mariadb_to_mongodb import SyncError, SyncResult, sync_mariadb_to_mongodb
+
+pytestmark = pytest.mark.usefixtures("mariadb", "mongo")
+
+BASE = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def load(articles_csv: Callable[..., Path]) -> Callable[..., list[int]]:
+    """Load `count` articles and stamp them `BASE + seconds[i]` (default: all at BASE)."""
+
+    def load(count: int, seconds: list[int] | None = None, prefix: str = "a") -> list[int]:
+        stream_csv_to_mariadb(
+            articles_csv([{"arxiv_id": f"{prefix}{i:03d}"} for i in range(count)], f"{prefix}.csv")
+        )
+        with get_session() as session:
+            stmt = select(ScientificArticle.id).where(ScientificArticle.arxiv_id.like(f"{prefix}%"))
+            ids = sorted(session.scalars(stmt))
+            for i, article_id in enumerate(ids):
+                stamp = BASE + timedelta(seconds=seconds[i] if seconds else 0)
+                session.execute(
+                    update(ScientificArticle)
+                    .where(ScientificArticle.id == article_id)
+                    .values(updated_at=stamp)
+                )
+            session.commit()
+        return ids
+
+    return load
+
+
+def _sync(tmp_path: Path, **options: Any) -> SyncResult:
+    return sync_mariadb_to_mongodb(tmp_path, workers=1, **options)
+
+
+def test_rows_sharing_a_timestamp_are_not_lost_at_batch_boundaries(
+    tmp_path: Path, load: Callable[..., list[int]]
+) -> None:
+    ids = load(12)
+
+    result = _sync(tmp_path, batch_size=5)
+
+    assert (result.transferred, result.batches) == (12, 3)
+    assert (result.last_updated_at, result.last_id) == (BASE, ids[-1])
+    assert ScientificArticleDoc.objects.count() == 12
+
+
+def test_rows_younger_than_the_lag_wait_for_the_next_run(
+    tmp_path: Path, load: Callable[..., list[int]]
+) -> None:
+    load(3)
+    load(2, prefix="fresh")
+    with get_session() as session:
+        session.execute(
+            update(ScientificArticle)
+            .where(ScientificArticle.arxiv_id.like("fresh%"))
+            .values(updated_at=datetime.now() + timedelta(hours=1))
+        )
+        session.commit()
+
+    result = _sync(tmp_path, lag_seconds=60)
+
+    assert result.transferred == 3
+    assert ScientificArticleDoc.objects(arxiv_id__startswith="fresh").count() == 0
+
+
+def test_late_commits_inside_the_overlap_window_are_picked_up(
+    tmp_path: Path, load: Callable[..., list[int]]
+) -> None:
+    ids = load(4, seconds=[0, 100, 200, 300])
+    first = _sync(tmp_path)
+    assert (first.last_updated_at, first.last_id) == (BASE + timedelta(seconds=300), ids[-1])
+
+    # Committed after the first sync, but stamped before its mark.
+    load(2, seconds=[300 - 30, 300 - 600], prefix="late")
+    second = _sync(tmp_path, overlap_seconds=120)
+
+    assert ScientificArticleDoc.objects(arxiv_id="late000").count() == 1
+    assert ScientificArticleDoc.objects(arxiv_id="late001").count() == 0
+    # The window (mark - 120 s) re-sent the rows at 200 s and 300 s; the mark did not move back.
+    assert second.transferred == 3
+    assert (second.last_updated_at, second.last_id) == (first.last_updated_at, first.last_id)
+
+
+def test_a_failed_batch_keeps_the_mark_and_the_next_run_resumes(
+    tmp_path: Path, load: Callable[..., list[int]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ids = load(6, seconds=list(range(0, 60, 10)))
+    write = BulkMongoWriter._write_upserts
+    calls = 0
+
+    def fail_second_batch(self: BulkMongoWriter, docs: list[dict[str, object]]) -> BatchResult:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            return BatchResult(attempted=len(docs), errors=[{"index": 0, "errmsg": "down"}])
+        return write(self, docs)
+
+    monkeypatch.setattr(BulkMongoWriter, "_write_upserts", fail_second_batch)
+    with pytest.raises(SyncError):
+        _sync(tmp_path, batch_size=2)
+    monkeypatch.undo()
+
+    resumed = _sync(tmp_path, batch_size=2, overlap_seconds=0)
+
+    # Resumes at the mark left by the first batch (its last row is re-sent by `>=`).
+    assert resumed.transferred == 5
+    assert (resumed.last_updated_at, resumed.last_id) == (BASE + timedelta(seconds=50), ids[-1])
+    assert ScientificArticleDoc.objects.count() == 6
+
+
+def test_a_run_without_changes_moves_nothing(
+    tmp_path: Path, load: Callable[..., list[int]]
+) -> None:
+    load(3, seconds=[0, 10, 20])
+    first = _sync(tmp_path)
+
+    again = _sync(tmp_path, overlap_seconds=0)
+
+    assert again.transferred == 1  # only the row at the mark itself
+    assert (again.last_updated_at, again.last_id) == (first.last_updated_at, first.last_id)
@@ -0,0 +1,82 @@
+# Shared module: the authoritative copy is data_pipeline_project/usecases/embedding.py.
+# Edit that one, then copy it to Pandas_arxiv_project/ unchanged
+# except for StreamingEmbedding, which only data_pipeline_project uses.
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from collections.abc import Iterable
+from functools import lru_cache
+
+import numpy as np
+import numpy.typing as npt
+
+DEFAULT_DIM = 128
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1 << 18)
+def _token_hash(tok: str) -> int:
+    """First 4 bytes of SHA-256 as a big-endian int; memoized per token."""
+    return int.from_bytes(hashlib.sha256(tok.encode("utf-8")).digest()[:4], "big")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def embed_batch(
+    texts: Iterable[str], dim: int = DEFAULT_DIM, dtype: npt.DTypeLike = np.float32
+) -> npt.NDArray[np.floating]:
+    """Hash bag-of-words embeddings for many documents as an (n_docs, dim) matrix.
+
+    Each distinct token is hashed once (and memoized across calls), counts are
+    accumulated with one weighted bincount over the whole batch, and rows are
+    L2-normalized in float64, so each row equals `compute_embedding` exactly
+    before the final cast to `dtype`.
+    """
+    buckets: list[npt.NDArray[np.int64]] = []
+    weights: list[npt.NDArray[np.float64]] = []
+    for row, text in enumerate(texts):
+        tf = Counter(tokenize(text))
+        hashes = np.fromiter(map(_token_hash, tf), dtype=np.int64, count=len(tf))
+        buckets.append(hashes % dim + row * dim)
+        weights.append(np.fromiter(tf.values(), dtype=np.float64, count=len(tf)))
+    n_docs = len(buckets)
+    if n_docs == 0:
+        return np.zeros((0, dim), dtype=dtype)
+    counts = np.bincount(
+        np.concatenate(buckets), weights=np.concatenate(weights), minlength=n_docs * dim
+    ).astype(np.float64, copy=False).reshape(n_docs, dim)
+    norms = np.sqrt(np.einsum("ij,ij->i", counts, counts))
+    np.divide(counts, norms[:, None], out=counts, where=norms[:, None] > 0)
+    return counts.astype(dtype, copy=False)
+
+
+def compute_embedding(text: str, dim: int = DEFAULT_DIM) -> list[float]:
+    """Deterministic hash-based bag-of-words embedding, L2-normalized."""
+    return embed_batch([text], dim, dtype=np.float64)[0].tolist()  # type: ignore[no-any-return]
+
+
+class StreamingEmbedding:
+    """`compute_embedding` of a text that arrives in parts, holding only token counts.
+
+    Parts must be whitespace-separated in the whole text (e.g. pages), so no
+    token spans two of them; the result then equals `compute_embedding` of
+    the whole text exactly.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM) -> None:
+        self.dim = dim
+        self.counts = np.zeros(dim, dtype=np.float64)
+
+    def update(self, text: str) -> None:
+        tf = Counter(tokenize(text))
+        hashes = np.fromiter(map(_token_hash, tf), dtype=np.int64, count=len(tf))
+        weights = np.fromiter(tf.values(), dtype=np.float64, count=len(tf))
+        self.counts += np.bincount(hashes % self.dim, weights=weights, minlength=self.dim)
+
+    def embedding(self) -> list[float]:
+        norm = np.sqrt(self.counts @ self.counts)
+        return (self.counts / norm if norm > 0 else self.counts).tolist()  # type: ignore[no-any-return]
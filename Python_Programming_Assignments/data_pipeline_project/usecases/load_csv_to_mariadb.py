@@ -1,61 +1,282 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import importlib
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, insert, select, update
 from sqlalchemy.orm import Session
 
+from usecases.metrics import PipelineMetrics, run_metrics
 
-def load_csv_to_mariadb(csv_path: Path) -> tuple[int, int]:
-    """Load rows from CSV into MariaDB.
-    Returns (authors_created, articles_created).
+
+@dataclass
+class LoadStats:
+    authors_created: int
+    articles_created: int
+    seconds: float
+    articles_updated: int = 0
+    articles_skipped: int = 0
+
+    @property
+    def rows_per_sec(self) -> float:
+        rows = self.articles_created + self.articles_updated + self.articles_skipped
+        return rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class ChunkResult:
+    authors_created: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    # With `returning`: ids of the inserted or updated articles, in row order,
+    # and their content hashes (for `record_content_hashes`).
+    article_ids: list[int] = field(default_factory=list)
+    content_hashes: list[str] = field(default_factory=list)
+
+    def __iadd__(self, other: ChunkResult) -> ChunkResult:
+        self.authors_created += other.authors_created
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        return self
+
+    @property
+    def rows(self) -> int:
+        return self.inserted + self.updated + self.skipped
+
+    def load_stats(self, seconds: float) -> LoadStats:
+        return LoadStats(
+            self.authors_created, self.inserted, seconds, self.updated, self.skipped
+        )
+
+
+def iter_chunks(rows: Iterable[dict[str, str]], size: int) -> Iterator[list[dict[str, str]]]:
+    """Lists of up to `size` rows, read lazily (e.g. from a `csv.DictReader`)."""
+    it = iter(rows)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _resolve_author_ids(session: Session, Author: Any, names: Iterable[str]) -> dict[str, int]:
+    """Map author names to ids with a single IN (...) query.
+
+    MariaDB's default collation compares case-insensitively, so a name that only
+    differs in case from a stored one resolves to the stored author.
+    """
+    wanted = list(names)
+    found: dict[str, int] = {}
+    folded: dict[str, int] = {}
+    stmt = select(Author.full_name, Author.id).where(Author.full_name.in_(wanted))
+    for name, author_id in session.execute(stmt):
+        found.setdefault(name, author_id)
+        folded.setdefault(name.casefold(), author_id)
+    resolved: dict[str, int] = {}
+    for name in wanted:
+        author_id = found.get(name, folded.get(name.casefold()))
+        if author_id is not None:
+            resolved[name] = author_id
+    return resolved
+
+
+def content_hash(article: dict[str, Any], author_full_name: str) -> str:
+    """SHA-256 over the stored article fields and the author's name."""
+    parts = (article["title"], article["summary"], article["file_path"], author_full_name)
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _existing_articles(
+    session: Session, ScientificArticle: Any, arxiv_ids: list[str]
+) -> dict[str, tuple[int, str | None]]:
+    """Map arxiv_id -> (id, content_hash) for the ids already stored."""
+    stmt = select(
+        ScientificArticle.arxiv_id, ScientificArticle.id, ScientificArticle.content_hash
+    ).where(ScientificArticle.arxiv_id.in_(arxiv_ids))
+    return {arxiv_id: (article_id, h) for arxiv_id, article_id, h in session.execute(stmt)}
+
+
+def load_chunk(
+    session: Session,
+    Author: Any,
+    ScientificArticle: Any,
+    rows: list[dict[str, str]],
+    metrics: PipelineMetrics,
+    returning: bool = False,
+    record_hashes: bool = True,
+) -> ChunkResult:
+    """Upsert one chunk of CSV rows on `arxiv_id`.
+
+    Every row is hashed and its hash compared with the stored one (one IN (...)
+    query per chunk). Unchanged rows are skipped before any author lookup. New
+    and changed rows are written with one bulk
+    `INSERT ... ON DUPLICATE KEY UPDATE`, which bumps `updated_at` so the
+    incremental sync picks the changes up. Within a chunk the last row for an
+    `arxiv_id` wins. With `returning`, the ids of the written articles are
+    looked up and returned in row order. With `record_hashes=False` they are
+    written with a NULL `content_hash`, so they count as changed until
+    `record_content_hashes` marks them as sent on. The caller commits.
     """
+    result = ChunkResult()
+    articles: dict[str, dict[str, Any]] = {}
+    authors: dict[str, str] = {}
+    for row in rows:
+        name = row["author_full_name"].strip()
+        article = {
+            "title": row["title"].strip(),
+            "summary": row["summary"].strip(),
+            "file_path": row["file_path"].strip(),
+            "arxiv_id": row["arxiv_id"].strip(),
+        }
+        article["content_hash"] = content_hash(article, name)
+        articles.pop(article["arxiv_id"], None)  # re-insert so the last occurrence keeps order
+        articles[article["arxiv_id"]] = article
+        authors[article["arxiv_id"]] = name
+    result.skipped += len(rows) - len(articles)
+
+    with metrics.stage("hash_lookup") as stage:
+        existing = _existing_articles(session, ScientificArticle, list(articles))
+        stage.rows += len(articles)
+    pending = []
+    for arxiv_id, article in articles.items():
+        stored = existing.get(arxiv_id)
+        if stored is None:
+            result.inserted += 1
+        elif stored[1] != article["content_hash"]:
+            result.updated += 1
+        else:
+            result.skipped += 1
+            continue
+        pending.append(article)
+    if not pending:
+        return result
+
+    titles: dict[str, str | None] = {}
+    for row in rows:
+        titles.setdefault(row["author_full_name"].strip(), row.get("author_title") or None)
+    titles = {name: titles[name] for name in {authors[a["arxiv_id"]] for a in pending}}
+
+    with metrics.stage("author_lookup") as stage:
+        author_ids = _resolve_author_ids(session, Author, titles)
+        stage.rows += len(titles)
+    missing: dict[str, dict[str, Any]] = {}
+    for name, title in titles.items():
+        if name not in author_ids:
+            missing.setdefault(name.casefold(), {"full_name": name, "title": title})
+    if missing:
+        with metrics.stage("author_insert") as stage:
+            session.execute(insert(Author), list(missing.values()))
+            author_ids.update(
+                _resolve_author_ids(session, Author, [n for n in titles if n not in author_ids])
+            )
+            stage.rows += len(missing)
+    result.authors_created = len(missing)
+
+    hashes = [article["content_hash"] for article in pending]
+    for article in pending:
+        article["author_id"] = author_ids[authors[article["arxiv_id"]]]
+        if not record_hashes:
+            article["content_hash"] = None
+    upsert_statement = importlib.import_module("storage.mariadb").upsert_statement
+    with metrics.stage("article_insert") as stage:
+        stmt = upsert_statement(
+            session,
+            ScientificArticle,
+            "arxiv_id",
+            ("title", "summary", "file_path", "author_id", "content_hash"),
+            updated_at=func.now(),
+        )
+        session.execute(stmt, pending)
+        stage.rows += len(pending)
+    if returning:
+        written = [a["arxiv_id"] for a in pending]
+        ids = _existing_articles(session, ScientificArticle, written)
+        result.article_ids = [ids[arxiv_id][0] for arxiv_id in written]
+        result.content_hashes = hashes
+    return result
+
+
+def record_content_hashes(
+    session: Session, ScientificArticle: Any, hashes: dict[int, str]
+) -> None:
+    """Set `content_hash` by article id, once rows loaded with `record_hashes=False` are sent."""
+    if not hashes:
+        return
+    stmt = (
+        update(ScientificArticle)
+        .where(ScientificArticle.id == bindparam("_id"))
+        .values(content_hash=bindparam("_hash"))
+    )
+    session.connection().execute(stmt, [{"_id": i, "_hash": h} for i, h in hashes.items()])
+
+
+def load_chunks(
+    chunks: Iterable[list[dict[str, str]]], commit_every: int, metrics: PipelineMetrics
+) -> ChunkResult:
+    """Load row chunks (CSV-shaped dicts), committing every `commit_every` chunks."""
     storage_module = importlib.import_module("storage.mariadb")
     init_db = storage_module.init_db
     get_session = storage_module.get_session
 
-    init_db()
-    authors_created = 0
-    articles_created = 0
-
     models_module = importlib.import_module("models.sql_models")
     Author = models_module.Author
     ScientificArticle = models_module.ScientificArticle
 
+    init_db()
+    total = ChunkResult()
     with get_session() as session:
         assert isinstance(session, Session)
-        existing_authors: dict[str, Any] = {}
-
-        with csv_path.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                full_name = row["author_full_name"].strip()
-                title = row.get("author_title") or None
-
-                author = existing_authors.get(full_name)
-                if author is None:
-                    # Try fetch from DB
-                    author = session.scalar(select(Author).where(Author.full_name == full_name))
-                    if author is None:
-                        author = Author(full_name=full_name, title=title)
-                        session.add(author)
-                        session.flush()
-                        authors_created += 1
-                    existing_authors[full_name] = author
-
-                article = ScientificArticle(
-                    title=row["title"].strip(),
-                    summary=row["summary"].strip(),
-                    file_path=row["file_path"].strip(),
-                    arxiv_id=row["arxiv_id"].strip(),
-                    author=author,
-                )
-                session.add(article)
-                articles_created += 1
-
-        session.commit()
-
-    return authors_created, articles_created
+        pending = 0
+        for chunk in chunks:
+            total += load_chunk(session, Author, ScientificArticle, chunk, metrics)
+            pending += 1
+            if pending >= commit_every:
+                with metrics.stage("commit"):
+                    session.commit()
+                pending = 0
+        with metrics.stage("commit"):
+            session.commit()
+    return total
+
+
+def stream_csv_to_mariadb(
+    csv_path: Path,
+    chunk_size: int = 1000,
+    commit_every: int = 1,
+    metrics: PipelineMetrics | None = None,
+) -> LoadStats:
+    """Stream the CSV into MariaDB in fixed-size chunks.
+
+    Rows are upserted on `arxiv_id` (see `load_chunk`): each chunk compares
+    content hashes with one IN (...) query, resolves the authors of new and
+    changed rows with another, and bulk-writes the missing authors and then
+    the articles (executemany). Re-loading the same file therefore skips every
+    row. The transaction is committed every `commit_every` chunks, so memory
+    stays flat for any file size. The returned stats count inserted
+    (`articles_created`), updated and skipped articles. Per-stage timings go
+    to `metrics` (default: configured from the environment).
+    """
+    started = time.perf_counter()
+    with run_metrics(metrics, "load_csv") as metrics, csv_path.open(
+        newline="", encoding="utf-8"
+    ) as f:
+        chunks = metrics.timed_iter("csv_parse", iter_chunks(csv.DictReader(f), chunk_size))
+        result = load_chunks(chunks, commit_every, metrics)
+        metrics.stages["csv_parse"].rows = result.rows
+        metrics.stages["csv_parse"].bytes = csv_path.stat().st_size
+
+    return result.load_stats(time.perf_counter() - started)
+
+
+def load_csv_to_mariadb(csv_path: Path, chunk_size: int = 1000) -> tuple[int, int]:
+    """Load rows from CSV into MariaDB.
+    Returns (authors_created, articles_created).
+    """
+    stats = stream_csv_to_mariadb(csv_path, chunk_size=chunk_size)
+    return stats.authors_created, stats.articles_created
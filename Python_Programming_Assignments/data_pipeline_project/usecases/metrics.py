@@ -0,0 +1,216 @@
+# Shared module: the authoritative copy is data_pipeline_project/usecases/metrics.py.
+# Edit that one, then copy it to Pandas_arxiv_project/ unchanged.
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+PROFILERS = ("cprofile", "tracemalloc")
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    peak_rss_bytes: int | None = None
+    peak_traced_bytes: int | None = None
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.wall_s if self.wall_s > 0 else 0.0
+
+
+class PipelineMetrics:
+    """Wall/CPU time, row and byte counters per pipeline stage.
+
+    Wrap work in `with metrics.stage("name") as s:` and bump `s.rows` /
+    `s.bytes`; entering the same name again adds to the same record, so a
+    stage can be timed per chunk or per item. `close()` writes one JSON object
+    per stage and a `"total"` line to `sink` (a text stream or a file appended
+    to), or nothing when there is no sink.
+
+    `profile="cprofile"` keeps one profiler per stage and dumps
+    `<run>.<stage>.prof` into `profile_dir`; `profile="tracemalloc"` records
+    each stage's peak traced Python allocation. Nested stages are timed but
+    only the outermost one per thread is profiled. Stages may run on several
+    threads at once as long as each name is entered by one thread at a time;
+    tracemalloc peaks are then process-wide rather than per stage.
+    """
+
+    def __init__(
+        self,
+        run: str,
+        sink: IO[str] | Path | None = None,
+        profile: str | None = None,
+        profile_dir: Path = Path("."),
+    ) -> None:
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f"unknown profiler {profile!r}; expected one of {PROFILERS}")
+        self.run = run
+        self.sink = sink
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.stages: dict[str, StageMetrics] = {}
+        self._profilers: dict[str, cProfile.Profile] = {}
+        self._local = threading.local()  # .profiling: inside an outermost stage
+        self._ended: tuple[float, float, float] | None = None
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._children_started = _children_cpu()
+        if profile == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_env(cls, run: str) -> PipelineMetrics:
+        """Configure from PIPELINE_METRICS ("-" for stderr, else a JSONL path),
+        PIPELINE_PROFILE ("cprofile"/"tracemalloc") and PIPELINE_PROFILE_DIR."""
+        target = os.getenv("PIPELINE_METRICS")
+        sink: IO[str] | Path | None = None
+        if target == "-":
+            sink = sys.stderr
+        elif target:
+            sink = Path(target)
+        return cls(
+            run,
+            sink=sink,
+            profile=os.getenv("PIPELINE_PROFILE") or None,
+            profile_dir=Path(os.getenv("PIPELINE_PROFILE_DIR", ".")),
+        )
+
+    def __enter__(self) -> PipelineMetrics:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = StageMetrics(name)
+        outermost = not getattr(self._local, "profiling", False)
+        profiler = None
+        if outermost and self.profile == "cprofile":
+            profiler = self._profilers.setdefault(name, cProfile.Profile())
+            try:
+                profiler.enable()
+            except ValueError:  # another thread's profiler is active (Python 3.12+)
+                profiler = None
+        elif outermost and self.profile == "tracemalloc":
+            tracemalloc.reset_peak()
+        self._local.profiling = True
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.calls += 1
+            record.wall_s += time.perf_counter() - wall
+            record.cpu_s += time.process_time() - cpu
+            if outermost:
+                self._local.profiling = False
+                if profiler is not None:
+                    profiler.disable()
+                elif self.profile == "tracemalloc":
+                    peak = tracemalloc.get_traced_memory()[1]
+                    record.peak_traced_bytes = max(record.peak_traced_bytes or 0, peak)
+            record.peak_rss_bytes = peak_rss_bytes()
+
+    def timed_iter(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from `items`, charging the time spent producing each one to `name`."""
+        it = iter(items)
+        while True:
+            with self.stage(name) as record:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                record.rows += 1
+            yield item
+
+    def records(self) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = [
+            {"run": self.run, **asdict(s), "rows_per_sec": round(s.rows_per_sec, 1)}
+            for s in self.stages.values()
+        ]
+        wall, cpu, children = self._ended or (
+            time.perf_counter(), time.process_time(), _children_cpu()
+        )
+        rows.append(
+            {
+                "run": self.run,
+                "stage": "total",
+                "wall_s": wall - self._started,
+                "cpu_s": cpu - self._cpu_started,
+                "children_cpu_s": children - self._children_started,
+                "peak_rss_bytes": peak_rss_bytes(),
+            }
+        )
+        return rows
+
+    def close(self) -> None:
+        if self._ended is not None:
+            return
+        self._ended = (time.perf_counter(), time.process_time(), _children_cpu())
+        if self.profile == "cprofile":
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            for name, profiler in self._profilers.items():
+                profiler.dump_stats(self.profile_dir / f"{self.run}.{name}.prof")
+        if self.sink is None:
+            return
+        lines = "".join(json.dumps(r) + "\n" for r in self.records())
+        if isinstance(self.sink, Path):
+            with self.sink.open("a", encoding="utf-8") as f:
+                f.write(lines)
+        else:
+            self.sink.write(lines)
+            self.sink.flush()
+
+
+def _children_cpu() -> float:
+    t = os.times()
+    return t.children_user + t.children_system
+
+
+@contextmanager
+def run_metrics(metrics: PipelineMetrics | None, run: str) -> Iterator[PipelineMetrics]:
+    """Use the caller's `metrics`, or an env-configured one that is closed on exit."""
+    if metrics is not None:
+        yield metrics
+        return
+    with PipelineMetrics.from_env(run) as owned:
+        yield owned
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Any
+
+from pymongo import DeleteOne, UpdateOne
+from sqlalchemy import select
+
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import ScientificArticle
+from storage.mariadb import get_session, init_db
+from storage.mongodb import init_mongo
+from storage.query_cache import invalidate_all
+
+
+@dataclass
+class ArticleIdStats:
+    scanned: int = 0
+    linked: int = 0
+    duplicates: int = 0
+    orphans: int = 0
+
+
+def migrate_article_ids(
+    batch_size: int = 1000, dry_run: bool = False, delete_orphans: bool = False
+) -> ArticleIdStats:
+    """Give documents written before `article_id` existed their MariaDB ids.
+
+    Transfers and the sync upsert on `article_id`, so a document saved
+    without one would otherwise stay next to the copy they write. Each such
+    document is matched to `scientific_articles` on `arxiv_id` and gets
+    `article_id` and `author_id`. If that article already has a document
+    (or an earlier legacy document claimed it), it is a duplicate and is
+    deleted. Documents whose `arxiv_id` is not in MariaDB are counted as
+    orphans and deleted only with `delete_orphans`. Documents are visited
+    in `_id` order, so an interrupted run can simply be restarted.
+    """
+    init_db()
+    init_mongo()
+    collection = ScientificArticleDoc._get_collection()
+    stats = ArticleIdStats()
+    claimed: set[int] = set()  # linked in earlier batches (not yet visible in a dry run)
+    last_id: Any = None
+    while True:
+        query: dict[str, Any] = {"article_id": None}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        docs = list(collection.find(query, {"_id": 1, "arxiv_id": 1}).sort("_id").limit(batch_size))
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+        stats.scanned += len(docs)
+        arxiv_ids = list({d.get("arxiv_id") for d in docs} - {None})
+        with get_session() as session:
+            rows = session.execute(
+                select(
+                    ScientificArticle.arxiv_id, ScientificArticle.id, ScientificArticle.author_id
+                ).where(ScientificArticle.arxiv_id.in_(arxiv_ids))
+            ).all()
+        ids = {arxiv_id: (article_id, author_id) for arxiv_id, article_id, author_id in rows}
+        taken = claimed | {
+            d["article_id"]
+            for d in collection.find(
+                {"article_id": {"$in": [a for a, _ in ids.values()]}}, {"_id": 0, "article_id": 1}
+            )
+        }
+        ops: list[UpdateOne | DeleteOne] = []
+        for doc in docs:
+            match = ids.get(doc.get("arxiv_id"))
+            if match is None:
+                stats.orphans += 1
+                if delete_orphans:
+                    ops.append(DeleteOne({"_id": doc["_id"]}))
+            elif match[0] in taken:
+                stats.duplicates += 1
+                ops.append(DeleteOne({"_id": doc["_id"]}))
+            else:
+                taken.add(match[0])
+                claimed.add(match[0])
+                stats.linked += 1
+                ops.append(
+                    UpdateOne(
+                        {"_id": doc["_id"]},
+                        {"$set": {"article_id": match[0], "author_id": match[1]}},
+                    )
+                )
+        if ops and not dry_run:
+            collection.bulk_write(ops, ordered=False)
+    if not dry_run and stats.scanned:
+        invalidate_all()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Link pre-existing MongoDB articles to their MariaDB ids"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="report without writing")
+    parser.add_argument(
+        "--delete-orphans", action="store_true", help="also delete docs with no MariaDB row"
+    )
+    args = parser.parse_args()
+
+    stats = migrate_article_ids(args.batch_size, args.dry_run, args.delete_orphans)
+    verb = "Would link" if args.dry_run else "Linked"
+    print(
+        f"{verb} {stats.linked} of {stats.scanned} documents without article_id; "
+        f"{stats.duplicates} duplicates {'found' if args.dry_run else 'removed'}, "
+        f"{stats.orphans} orphans."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from models.embedding_codec import decode_embedding
+from usecases.embedding import DEFAULT_DIM
+from usecases.load_csv_to_mariadb import LoadStats, load_chunks
+from usecases.metrics import PipelineMetrics, run_metrics
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+ARTICLE_COLUMNS = ["title", "summary", "file_path", "arxiv_id", "author_full_name", "author_title"]
+_OPTIONAL_COLUMNS = {"file_path", "author_title"}
+_YYMM = re.compile(r"(\d{4})\.\d{4,5}")
+
+
+def _pyarrow() -> Any:
+    """pyarrow is an optional dependency, imported on first Parquet use."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Parquet support needs pyarrow: pip install -e '.[parquet]'") from exc
+    return pyarrow
+
+
+# ---------- ingest ----------
+def iter_parquet_chunks(path: Path, chunk_size: int = 10_000) -> Iterator[list[dict[str, str]]]:
+    """Yield CSV-shaped row dicts, one list per Parquet batch of up to `chunk_size` rows.
+
+    Only the article columns are read; nulls and absent optional columns become "".
+    """
+    pa = _pyarrow()
+    parquet_file = pa.parquet.ParquetFile(path)
+    present = [c for c in ARTICLE_COLUMNS if c in parquet_file.schema_arrow.names]
+    missing = set(ARTICLE_COLUMNS) - set(present) - _OPTIONAL_COLUMNS
+    if missing:
+        raise ValueError(f"{path} lacks required columns: {sorted(missing)}")
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=present):
+        columns = [
+            pa.compute.fill_null(batch.column(name).cast(pa.string()), "").to_pylist()
+            for name in present
+        ]
+        rows = [dict(zip(present, values, strict=True)) for values in zip(*columns, strict=True)]
+        for name in _OPTIONAL_COLUMNS.difference(present):
+            for row in rows:
+                row[name] = ""
+        yield rows
+
+
+def stream_parquet_to_mariadb(
+    path: Path,
+    chunk_size: int = 10_000,
+    commit_every: int = 1,
+    metrics: PipelineMetrics | None = None,
+) -> LoadStats:
+    """Load a Parquet article dump batch by batch through the CSV bulk loader."""
+    started = time.perf_counter()
+    with run_metrics(metrics, "load_parquet") as metrics:
+        chunks = metrics.timed_iter("parquet_read", iter_parquet_chunks(path, chunk_size))
+        result = load_chunks(chunks, commit_every, metrics)
+        metrics.stages["parquet_read"].rows = result.rows
+        metrics.stages["parquet_read"].bytes = path.stat().st_size
+    return result.load_stats(time.perf_counter() - started)
+
+
+# ---------- export ----------
+def export_schema(dim: int = DEFAULT_DIM, with_text: bool = False) -> pa.Schema:
+    pa = _pyarrow()
+    fields = [
+        ("article_id", pa.int64()),
+        ("author_id", pa.int64()),
+        ("arxiv_id", pa.string()),
+        ("title", pa.string()),
+        ("summary", pa.string()),
+        ("file_path", pa.string()),
+        ("author_full_name", pa.string()),
+        ("author_title", pa.string()),
+    ]
+    if with_text:
+        fields.append(("text", pa.string()))
+    fields += [("embedding", pa.list_(pa.float32(), dim)), ("yymm", pa.string())]
+    return pa.schema(fields)
+
+
+def _yymm(arxiv_id: str | None) -> str:
+    match = _YYMM.search(arxiv_id or "")
+    return match.group(1) if match else "unknown"
+
+
+def _record_batch(docs: list[dict[str, Any]], schema: pa.Schema, dim: int) -> pa.RecordBatch:
+    pa = _pyarrow()
+    vectors = np.zeros((len(docs), dim), dtype=np.float32)
+    absent = np.ones(len(docs), dtype=bool)
+    for i, doc in enumerate(docs):
+        embedding = decode_embedding(doc.get("embedding"))
+        if embedding is not None and len(embedding) == dim:
+            vectors[i] = embedding
+            absent[i] = False
+    author = [doc.get("author") or {} for doc in docs]
+    columns: dict[str, Any] = {
+        "article_id": [doc.get("article_id") for doc in docs],
+        "author_id": [doc.get("author_id") for doc in docs],
+        "arxiv_id": [doc.get("arxiv_id") for doc in docs],
+        "title": [doc.get("title") for doc in docs],
+        "summary": [doc.get("summary") for doc in docs],
+        "file_path": [doc.get("file_path") for doc in docs],
+        "author_full_name": [a.get("full_name") for a in author],
+        "author_title": [a.get("title") for a in author],
+        "text": [doc.get("text") for doc in docs],
+        "embedding": pa.FixedSizeListArray.from_arrays(
+            pa.array(vectors.reshape(-1)), dim, mask=pa.array(absent)
+        ),
+        "yymm": [_yymm(doc.get("arxiv_id")) for doc in docs],
+    }
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[f.name], type=f.type) for f in schema], schema=schema
+    )
+
+
+def _mongo_batches(
+    docs: Iterable[dict[str, Any]], schema: pa.Schema, dim: int, batch_size: int
+) -> Iterator[pa.RecordBatch]:
+    batch: list[dict[str, Any]] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield _record_batch(batch, schema, dim)
+            batch = []
+    if batch:
+        yield _record_batch(batch, schema, dim)
+
+
+def export_articles_to_parquet(
+    out_dir: Path,
+    batch_size: int = 10_000,
+    with_text: bool = False,
+    dim: int = DEFAULT_DIM,
+    metrics: PipelineMetrics | None = None,
+) -> int:
+    """Write the MongoDB article corpus to Hive-partitioned Parquet under `out_dir`.
+
+    Every document carries its MariaDB `article_id`/`author_id` and fields, so
+    one cursor covers both stores. Embeddings become a `fixed_size_list<float32>`
+    column (null where missing or of another size); files are partitioned by
+    the arXiv `yymm` taken from `arxiv_id`. The full `text` is only included
+    with `with_text`. Existing files in the written partitions are replaced.
+    Returns the number of rows written.
+    """
+    from models.mongo_models import ScientificArticleDoc
+    from storage.mongodb import init_mongo
+
+    pa = _pyarrow()
+    schema = export_schema(dim, with_text)
+    fields = ["article_id", "author_id", "arxiv_id", "title", "summary", "file_path", "author"]
+    projection = {"_id": 0, "embedding": 1, **{f: 1 for f in fields}}
+    if with_text:
+        projection["text"] = 1
+    init_mongo()
+    cursor = ScientificArticleDoc._get_collection().find({}, projection).batch_size(batch_size)
+
+    with run_metrics(metrics, "export_parquet") as metrics:
+        batches = metrics.timed_iter("mongo_read", _mongo_batches(cursor, schema, dim, batch_size))
+        written = 0
+
+        def counted() -> Iterator[pa.RecordBatch]:
+            nonlocal written
+            for batch in batches:
+                written += batch.num_rows
+                yield batch
+
+        with metrics.stage("parquet_write"):
+            pa.dataset.write_dataset(
+                counted(),
+                out_dir,
+                schema=schema,
+                format="parquet",
+                partitioning=pa.dataset.partitioning(
+                    pa.schema([("yymm", pa.string())]), flavor="hive"
+                ),
+                basename_template="part-{i}.parquet",
+                existing_data_behavior="delete_matching",
+            )
+        metrics.stages["mongo_read"].rows = written
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parquet ingest/export for the article corpus")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    load = sub.add_parser("load", help="bulk-load a Parquet article dump into MariaDB")
+    load.add_argument("path", type=Path)
+    load.add_argument("--chunk-size", type=int, default=10_000)
+    export = sub.add_parser("export", help="dump MongoDB articles to partitioned Parquet")
+    export.add_argument("out_dir", type=Path)
+    export.add_argument("--with-text", action="store_true")
+    export.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    if args.cmd == "load":
+        stats = stream_parquet_to_mariadb(args.path, chunk_size=args.chunk_size)
+        print(
+            f"Articles: {stats.articles_created} inserted, {stats.articles_updated} updated, "
+            f"{stats.articles_skipped} unchanged; {stats.authors_created} new authors "
+            f"({stats.rows_per_sec:,.0f} rows/s)."
+        )
+    else:
+        n = export_articles_to_parquet(
+            args.out_dir, batch_size=args.batch_size, with_text=args.with_text
+        )
+        print(f"Exported {n} articles to {args.out_dir}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import islice
+from types import TracebackType
+from typing import Any
+
+import numpy as np
+
+from models.embedding_codec import encode_embedding
+from models.mongo_models import ScientificPassageDoc
+from storage.mongo_writer import BulkMongoWriter
+from storage.mongodb import dispose_mongo, init_mongo
+from usecases.embedding import embed_batch
+
+PASSAGE_CHARS = 1000
+_WORD_RE = re.compile(r"\S+")
+
+_worker_pid: int | None = None  # process whose Mongo client unpickled writers use
+
+
+def iter_passages(
+    parts: Iterable[str], size: int = PASSAGE_CHARS, overlap: int = 0
+) -> Iterator[str]:
+    """Split the text made of `parts` (e.g. pages) into passages of about `size` characters.
+
+    Passages break on word boundaries and words never span two parts. Parts
+    are consumed lazily, so only the current part and the passage being built
+    are held. Each passage after the first repeats up to `overlap` characters
+    of trailing words from the one before, fewer if the next word would not
+    fit otherwise. A single word longer than `size` becomes a passage of its
+    own.
+    """
+    if overlap >= size:
+        raise ValueError("overlap must be smaller than size")
+    words: list[str] = []
+    length = 0  # characters in " ".join(words)
+    for word in (m.group() for part in parts for m in _WORD_RE.finditer(part)):
+        if words and length + 1 + len(word) > size:
+            yield " ".join(words)
+            kept: list[str] = []
+            kept_len = -1
+            for w in reversed(words):
+                if kept_len + 1 + len(w) > overlap:
+                    break
+                kept.append(w)
+                kept_len += 1 + len(w)
+            while kept and kept_len + 1 + len(word) > size:  # the next word must still fit
+                kept_len -= 1 + len(kept.pop())
+            words, length = kept[::-1], max(kept_len, 0)
+        length += len(word) + bool(words)
+        words.append(word)
+    if words:
+        yield " ".join(words)
+
+
+class PassageWriter:
+    """Split each article's text into passages, embed them and upsert them to MongoDB.
+
+    Passages go to `scientific_passages`, keyed on "<article_id>:<seq>" and
+    carrying `article_id`, `arxiv_id` and `title` back to the article. They
+    are embedded `embed_batch_size` at a time and written through a
+    `BulkMongoWriter`, so an article of any length never has more than one
+    embedding batch and one write batch of passages in memory. Articles keep
+    only the first `head_chars` characters of their text (see
+    `pdf_extraction.extract_markdown_parallel`), which keeps large papers
+    under the 16 MB document limit and out of the article `$text` index.
+    Passages left over from a longer earlier version of an article are
+    deleted. A writer sent to a worker process arrives as a fresh writer with
+    the same settings on that process's own connection.
+    """
+
+    def __init__(
+        self,
+        size: int = PASSAGE_CHARS,
+        overlap: int = 100,
+        head_chars: int | None = 4 * PASSAGE_CHARS,
+        batch_size: int = 500,
+        embed_batch_size: int = 64,
+    ) -> None:
+        self.size = size
+        self.overlap = overlap
+        self.head_chars = head_chars
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+        self.passages = 0
+        self._writer: BulkMongoWriter | None = None
+
+    def __reduce__(self) -> tuple[object, tuple[int, int, int | None, int, int]]:
+        return _writer_in_worker, (
+            self.size,
+            self.overlap,
+            self.head_chars,
+            self.batch_size,
+            self.embed_batch_size,
+        )
+
+    def __enter__(self) -> PassageWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.flush()
+
+    @property
+    def writer(self) -> BulkMongoWriter:
+        """Opened on first use, so creating (or unpickling) a writer needs no server."""
+        if self._writer is None:
+            init_mongo()
+            self._writer = BulkMongoWriter(
+                ScientificPassageDoc, batch_size=self.batch_size, key="passage_id"
+            )
+        return self._writer
+
+    @property
+    def written(self) -> int:
+        return self.writer.written
+
+    @property
+    def cache_tag(self) -> str:
+        """Suffix for extraction cache keys; entries hold the head, which depends on these."""
+        return f"passages-{self.size}-{self.overlap}-{self.head_chars}"
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def has(self, article_id: int) -> bool:
+        """Whether any passage of `article_id` is stored."""
+        found = self.writer.collection.find_one({"article_id": article_id}, {"_id": 1})
+        return found is not None
+
+    def add_pages(self, article: Mapping[str, Any], pages: Iterable[str]) -> int:
+        """Write the passages of the text made of `pages`; returns how many.
+
+        `article` supplies `article_id` (required), `arxiv_id` and `title`.
+        Pages are pulled only as passages fill up, so a lazy page iterator is
+        never held whole. The caller adds the count to `passages`.
+        """
+        article_id = article["article_id"]
+        passages = iter_passages(pages, self.size, self.overlap)
+        seq = 0
+        while batch := list(islice(passages, self.embed_batch_size)):
+            vectors = embed_batch(batch, dtype=np.float64).tolist()
+            for text, vector in zip(batch, vectors, strict=True):
+                self.writer.add_raw(
+                    {
+                        "passage_id": f"{article_id}:{seq}",
+                        "article_id": article_id,
+                        "seq": seq,
+                        "arxiv_id": article.get("arxiv_id"),
+                        "title": article.get("title"),
+                        "text": text,
+                        "embedding": encode_embedding(vector),
+                    }
+                )
+                seq += 1
+        self.writer.collection.delete_many({"article_id": article_id, "seq": {"$gte": seq}})
+        return seq
+
+
+def _writer_in_worker(
+    size: int, overlap: int, head_chars: int | None, batch_size: int, embed_batch_size: int
+) -> PassageWriter:
+    # Pool workers are forked from a connected parent, so the first writer in
+    # each process drops the inherited client first (see `dispose_mongo`).
+    global _worker_pid
+    if _worker_pid != os.getpid():
+        dispose_mongo()
+        _worker_pid = os.getpid()
+    return PassageWriter(size, overlap, head_chars, batch_size, embed_batch_size)
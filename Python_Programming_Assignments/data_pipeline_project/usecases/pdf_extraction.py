@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+import contextlib
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import count, islice
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+from usecases.embedding import StreamingEmbedding
+
+if TYPE_CHECKING:
+    from storage.extraction_cache import ExtractionCache
+    from usecases.passages import PassageWriter
+
+K = TypeVar("K")
+
+# Bump whenever extraction output changes so cached Markdown is not reused.
+EXTRACTOR_VERSION = "pypdf-md-1"
+
+UNAVAILABLE_BODY = "(Extracted text unavailable in this environment)"
+TIMEOUT_BODY = "(Text extraction timed out)"
+NO_TEXT_BODY = "(No extractable text)"
+
+_HEADING = "# Extracted Content\n\n"
+_STARVED_POLL = 0.05  # seconds to wait on the pool before re-polling a live source
+
+_idle_pools: dict[int, list[_Pool]] = {}
+_pools_lock = threading.Lock()
+_task_ids = count()
+_started: multiprocessing.SimpleQueue[tuple[int, int, float]] | None = None  # in workers
+
+
+class ExtractionError(Exception):
+    """Reading a PDF failed; the article gets a placeholder instead of its text."""
+
+
+class Extracted(NamedTuple):
+    """What an article document keeps from its PDF.
+
+    Without passages, `markdown` is the whole text and `embedding` is None.
+    With passages, `markdown` is the head, `embedding` is that of the whole
+    text, and `passages` counts the passages written.
+    """
+
+    markdown: str
+    embedding: list[float] | None = None
+    passages: int = 0
+
+
+def extractor_version(max_pages: int | None = None) -> str:
+    """Cache version for extractions capped at `max_pages` pages (None: every page)."""
+    return f"{EXTRACTOR_VERSION}-p{max_pages}" if max_pages else EXTRACTOR_VERSION
+
+
+def max_pages_from_env() -> int | None:
+    """`PDF_MAX_PAGES` (unset or 0: no cap)."""
+    return int(os.getenv("PDF_MAX_PAGES", "0")) or None
+
+
+def iter_page_texts(pdf_path: Path, max_pages: int | None = None) -> Iterator[str]:
+    """Stripped text of each non-empty page, parsed one page at a time.
+
+    pypdf loads page objects on first access, so pages past `max_pages` are
+    never parsed and only one page's text is alive at a time.
+    """
+    from pypdf import PdfReader  # type: ignore
+
+    for page in islice(PdfReader(str(pdf_path)).pages, max_pages):
+        if text := (page.extract_text() or "").strip():
+            yield text
+
+
+def _iter_body(pdf_path: Path, max_pages: int | None) -> Iterator[str]:
+    """Page texts; a failure to read the file is raised as `ExtractionError`.
+
+    Only pypdf's own errors are wrapped, so an error in whatever consumes the
+    pages (e.g. a passage write) reaches the caller unchanged.
+    """
+    empty = True
+    pages = iter_page_texts(pdf_path, max_pages)
+    while True:
+        try:
+            text = next(pages)
+        except StopIteration:
+            break
+        except TimeoutError:
+            raise
+        except Exception as exc:
+            raise ExtractionError(f"cannot extract {pdf_path}") from exc
+        empty = False
+        yield text
+    if empty:
+        yield NO_TEXT_BODY
+
+
+def _as_markdown(body: str) -> str:
+    return f"{_HEADING}{body}\n"
+
+
+def _stream_passages(
+    pdf_path: Path, max_pages: int | None, passages: PassageWriter, article: Mapping[str, Any]
+) -> Extracted:
+    """Feed the pages straight into `passages`, keeping only the head and token counts.
+
+    The head is the start of the Markdown `pdf_to_markdown` would return and
+    the embedding equals `compute_embedding` of all of it, but neither the
+    Markdown nor the page list is ever built.
+    """
+    limit = passages.head_chars
+    embedding = StreamingEmbedding()
+    embedding.update(_HEADING)
+    head = _HEADING
+
+    def pages() -> Iterator[str]:
+        nonlocal head
+        for i, text in enumerate(_iter_body(pdf_path, max_pages)):
+            embedding.update(text)
+            if limit is None or len(head) < limit:
+                head = (head + ("\n\n" if i else "") + text)[:limit]
+            yield text
+
+    count = passages.add_pages(article, pages())
+    return Extracted((head + "\n")[:limit], embedding.embedding(), count)
+
+
+def _extract(
+    pdf_path: Path,
+    max_pages: int | None,
+    passages: PassageWriter | None,
+    article: Mapping[str, Any] | None,
+) -> Extracted:
+    if passages is None:
+        return Extracted(_as_markdown("\n\n".join(_iter_body(pdf_path, max_pages))))
+    assert article is not None
+    return _stream_passages(pdf_path, max_pages, passages, article)
+
+
+def pdf_to_markdown(pdf_path: Path, max_pages: int | None = None) -> str:
+    """Extract text from PDF (pypdf if available, first `max_pages` pages) and wrap as Markdown."""
+    return extract_with_timeout(pdf_path, None, max_pages).markdown
+
+
+def _raise_timeout(signum: int, frame: FrameType | None) -> None:
+    raise TimeoutError
+
+
+def _can_use_alarm() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def extract_with_timeout(
+    pdf_path: Path,
+    timeout: float | None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+    article: Mapping[str, Any] | None = None,
+) -> Extracted:
+    """Extract one PDF, bounded by `timeout` seconds (SIGALRM on POSIX main threads).
+
+    With `passages`, the passages of `article` are written as the pages are
+    read (see `Extracted`). A file that cannot be read or times out yields a
+    placeholder Markdown; passages it had already written stay until the
+    article is extracted successfully. Errors storing the passages propagate.
+    """
+    if not timeout or not _can_use_alarm():
+        try:
+            return _extract(pdf_path, max_pages, passages, article)
+        except ExtractionError:
+            return Extracted(_as_markdown(UNAVAILABLE_BODY))
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _extract(pdf_path, max_pages, passages, article)
+    except TimeoutError:
+        return Extracted(_as_markdown(TIMEOUT_BODY))
+    except ExtractionError:
+        return Extracted(_as_markdown(UNAVAILABLE_BODY))
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def pdf_to_markdown_with_timeout(
+    pdf_path: Path, timeout: float | None, max_pages: int | None = None
+) -> str:
+    """`pdf_to_markdown` bounded by `timeout` seconds (SIGALRM on POSIX main threads)."""
+    return extract_with_timeout(pdf_path, timeout, max_pages).markdown
+
+
+def _init_worker(started: multiprocessing.SimpleQueue[tuple[int, int, float]]) -> None:
+    global _started
+    _started = started
+
+
+def _extract_in_worker(
+    task: int,
+    pdf_path: str,
+    timeout: float | None,
+    max_pages: int | None,
+    passages: PassageWriter | None,
+    article: Mapping[str, Any] | None,
+) -> Extracted:
+    assert _started is not None
+    _started.put((task, os.getpid(), time.time()))
+    result = extract_with_timeout(Path(pdf_path), timeout, max_pages, passages, article)
+    if passages is not None:
+        passages.flush()  # this process's own writer: nothing may be left behind
+    return result
+
+
+class _Pool:
+    """A process pool whose workers report each task as they start it.
+
+    Tasks waiting in the executor's call queue already count as running
+    there, so the parent times a task only from its `(task, pid, start)`
+    report, and knows which worker to kill if it gets stuck.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._started: multiprocessing.SimpleQueue[tuple[int, int, float]] = (
+            multiprocessing.SimpleQueue()
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self._started,)
+        )
+
+    def submit(self, task: int, *args: Any) -> Future[Extracted]:
+        return self._executor.submit(_extract_in_worker, task, *args)
+
+    def started(self) -> Iterator[tuple[int, int, float]]:
+        """`(task, pid, start time)` reported since the last call."""
+        while not self._started.empty():
+            yield self._started.get()
+
+    def kill(self, pids: Iterable[int] = ()) -> None:
+        """Kill the workers `pids` and shut the pool down.
+
+        A worker stuck in native code ignores its alarm and would otherwise
+        keep running, and the interpreter would wait for it at exit. Losing a
+        worker breaks the executor, which then stops the others itself.
+        """
+        for pid in pids:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _acquire_pool(workers: int) -> _Pool:
+    """An idle pool with `workers` workers, or a new one; the caller owns it until released.
+
+    Concurrent calls never share a pool, so killing one cannot break another
+    call's files.
+    """
+    with _pools_lock:
+        idle = _idle_pools.get(workers)
+        if idle:
+            return idle.pop()
+    return _Pool(workers)
+
+
+def _release_pool(pool: _Pool) -> None:
+    """Keep `pool` for the next call (e.g. the next sync batch) instead of new processes."""
+    with _pools_lock:
+        _idle_pools.setdefault(pool.workers, []).append(pool)
+
+
+def _cache_key(
+    cache: ExtractionCache | None, path: Path, passages: PassageWriter | None
+) -> str | None:
+    key = cache.key_for(path) if cache else None
+    # With passages an entry holds only the head, so it must not meet full texts.
+    return f"{key}:{passages.cache_tag}" if key and passages is not None else key
+
+
+def _cached(
+    cache: ExtractionCache | None,
+    ckey: str | None,
+    passages: PassageWriter | None,
+    article: Mapping[str, Any] | None,
+) -> Extracted | None:
+    if cache is None or ckey is None:
+        return None
+    md = cache.get_markdown(ckey)
+    if md is None or passages is None:
+        return None if md is None else Extracted(md)
+    # A hit skips the passages too, so they must already be stored.
+    assert article is not None
+    embedding = cache.get_embedding(ckey)
+    if embedding is None or not passages.has(article["article_id"]):
+        return None
+    return Extracted(md, embedding)
+
+
+def _store(cache: ExtractionCache | None, ckey: str | None, result: Extracted) -> None:
+    if cache is None or ckey is None:
+        return
+    if result.markdown in (_as_markdown(TIMEOUT_BODY), _as_markdown(UNAVAILABLE_BODY)):
+        return
+    cache.put_markdown(ckey, result.markdown)
+    if result.embedding is not None:
+        cache.put_embedding(ckey, result.embedding)
+
+
+def extract_markdown_parallel(
+    items: Iterable[tuple[K, Path] | None],
+    workers: int | None = None,
+    timeout: float | None = 60.0,
+    max_pending: int | None = None,
+    cache: ExtractionCache | None = None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+    article_of: Callable[[K], Mapping[str, Any]] | None = None,
+) -> Iterator[tuple[K, Extracted]]:
+    """Convert PDFs to Markdown on a process pool, yielding `(key, Extracted)` as they complete.
+
+    `items` is consumed lazily: at most `max_pending` files (default 2x workers)
+    are in flight, so a database cursor feeding it is read no faster than the
+    pool drains. Each file is bounded by `timeout` inside the worker; as a
+    fallback the parent abandons a file still running twice that long after
+    its worker started it, killing the pool and resubmitting the other files
+    in flight. Each call owns its pool, so this never disturbs a concurrent
+    call; finished calls hand their pool to the next one with the same
+    `workers`, so repeated calls (e.g. one per sync batch) do not start new
+    processes. A file whose worker dies is yielded as unavailable; errors
+    storing passages in a worker are raised here.
+    With `workers=1` extraction runs in-process. Files found in `cache` are
+    yielded straight away and never reach the pool. `max_pages` caps how many
+    pages of each file are parsed; a `cache` used with a cap must be opened
+    with `extractor_version(max_pages)` so capped and full texts do not mix.
+
+    With `passages`, each file's pages go straight into passages for the
+    article `article_of(key)`, written by the process that reads them (a
+    worker flushes them before returning). Only the head and the embedding
+    come back, and only they are cached. A cached file is skipped only if the
+    article already has passages.
+
+    A live source (e.g. a queue fed by another stage) may yield `None` to say
+    nothing is ready yet; finished files are then handed out before it is
+    polled again, instead of waiting for the next input.
+    """
+    if passages is not None and article_of is None:
+        raise ValueError("article_of is required with passages")
+
+    def article(key: K) -> Mapping[str, Any] | None:
+        return article_of(key) if article_of is not None else None
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for item in items:
+            if item is None:
+                continue
+            key, path = item
+            ckey = _cache_key(cache, path, passages)
+            result = _cached(cache, ckey, passages, article(key))
+            if result is None:
+                result = extract_with_timeout(path, timeout, max_pages, passages, article(key))
+                _store(cache, ckey, result)
+            yield key, result
+        return
+
+    max_pending = max_pending or workers * 2
+    source = iter(items)
+    pending: dict[Future[Extracted], tuple[int, K, str | None, Path]] = {}
+    started: dict[int, tuple[int, float]] = {}  # task -> (worker pid, start time)
+    pool = _acquire_pool(workers)
+
+    def submit(key: K, ckey: str | None, path: Path) -> None:
+        nonlocal pool
+        task = next(_task_ids)
+        args = (str(path), timeout, max_pages, passages, article(key))
+        try:
+            fut = pool.submit(task, *args)
+        except BrokenProcessPool:  # a worker died (e.g. segfaulted) in an earlier call
+            pool.kill()
+            pool = _Pool(workers)
+            fut = pool.submit(task, *args)
+        pending[fut] = (task, key, ckey, path)
+
+    try:
+        exhausted = False
+        while True:
+            starved = False
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if item is None:
+                    starved = True
+                    break
+                key, path = item
+                ckey = _cache_key(cache, path, passages)
+                cached = _cached(cache, ckey, passages, article(key))
+                if cached is not None:
+                    yield key, cached
+                    continue
+                submit(key, ckey, path)
+            if not pending:
+                if exhausted:
+                    return
+                continue
+
+            # A starved source is re-polled soon so new input is not held back.
+            wait_for = _STARVED_POLL if starved else timeout
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for fut in done:
+                task, key, ckey, _ = pending.pop(fut)
+                started.pop(task, None)
+                try:
+                    result = fut.result()
+                except BrokenProcessPool:
+                    result = Extracted(_as_markdown(UNAVAILABLE_BODY))
+                _store(cache, ckey, result)
+                yield key, result
+
+            # Drained every round: a full report pipe would block the workers.
+            in_flight = {task for task, *_ in pending.values()}
+            for task, pid, since in pool.started():
+                if task in in_flight:
+                    started[task] = (pid, since)
+            if timeout:
+                now = time.time()
+                stuck = [
+                    fut
+                    for fut, (task, *_) in pending.items()
+                    if task in started and now - started[task][1] > 2 * timeout
+                ]
+                if stuck:
+                    # The stuck worker can only be stopped by killing the pool; the
+                    # other files in flight are started again on a fresh one.
+                    timed_out = [pending.pop(fut)[1] for fut in stuck]
+                    requeued = list(pending.values())
+                    pending.clear()
+                    pool.kill(pid for pid, _ in started.values())
+                    started.clear()
+                    pool = _Pool(workers)
+                    for _, key, ckey, path in requeued:
+                        submit(key, ckey, path)
+                    for key in timed_out:
+                        yield key, Extracted(_as_markdown(TIMEOUT_BODY))
+    finally:
+        for fut in pending:
+            fut.cancel()
+        _release_pool(pool)
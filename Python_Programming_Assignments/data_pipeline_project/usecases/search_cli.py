@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Callable, Iterable
+from typing import Any, TextIO
+
+from storage.vector_index import VectorIndex
+from usecases.search_mongodb import hybrid_search, search_passages, search_text
+from usecases.vector_search import open_index, search_similar
+
+# Only the search path is imported here: no MariaDB, mongoengine, document
+# models or PDF code. pymongo itself is imported by the first Mongo query
+# (`storage.mongodb.mongo_collection`). `benchmarks/bench_import_time.py`
+# keeps it that way.
+MODES = ("text", "hybrid", "similar", "passages")
+
+Searcher = Callable[[str], list[dict[str, Any]]]
+
+
+def make_searcher(mode: str, limit: int = 5, index: VectorIndex | None = None) -> Searcher:
+    """A function from query to [{"title", "score", ...}] for one search mode.
+
+    `hybrid` and `similar` use the local vector index (opened once here, or
+    the given `index`); `passages` also returns each passage's `seq` and `text`.
+    """
+    if mode == "text":
+        return lambda q: [{"title": t, "score": s} for t, s in search_text(q, limit=limit)]
+    if mode == "passages":
+        return lambda q: [
+            {"title": t, "seq": seq, "text": text, "score": s}
+            for t, seq, text, s in search_passages(q, limit=limit)
+        ]
+    index = index or open_index()
+    if mode == "hybrid":
+        return lambda q: [
+            {"title": t, "score": s} for t, s in hybrid_search(q, limit=limit, index=index)
+        ]
+    if mode == "similar":
+        return lambda q: [
+            {"title": t, "score": s} for t, s in search_similar(q, k=limit, index=index)
+        ]
+    raise ValueError(f"unknown mode {mode!r}; expected one of {MODES}")
+
+
+def serve(search: Searcher, lines: Iterable[str], out: TextIO) -> int:
+    """Answer one query per input line with one JSON line; returns the number answered.
+
+    Blank lines are ignored. A failed query is answered with an `error` field
+    instead of ending the loop. Output is flushed after every answer, so a
+    caller can keep the process open and send queries one at a time.
+    """
+    served = 0
+    for line in lines:
+        query = line.strip()
+        if not query:
+            continue
+        try:
+            reply: dict[str, Any] = {"query": query, "results": search(query)}
+        except Exception as exc:
+            reply = {"query": query, "error": f"{type(exc).__name__}: {exc}"}
+        out.write(json.dumps(reply, ensure_ascii=False) + "\n")
+        out.flush()
+        served += 1
+    return served
+
+
+def main() -> None:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--mode", choices=MODES, default="hybrid")
+    common.add_argument("-k", "--limit", type=int, default=5)
+    parser = argparse.ArgumentParser(description="Search MongoDB without loading the ingest code")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    one = sub.add_parser("search", parents=[common], help="answer one query and exit")
+    one.add_argument("query", nargs="+")
+    one.add_argument("--json", action="store_true", help="print the JSON line `serve` would")
+    sub.add_parser(
+        "serve", parents=[common], help="read queries from stdin, one per line; answer each as JSON"
+    )
+    args = parser.parse_args()
+
+    search = make_searcher(args.mode, args.limit)
+    if args.cmd == "serve":
+        serve(search, sys.stdin, sys.stdout)
+        return
+    query = " ".join(args.query)
+    if args.json:
+        serve(search, [query], sys.stdout)
+        return
+    for hit in search(query):
+        label = f"{hit['title']} #{hit['seq']}" if "seq" in hit else hit["title"]
+        print(f"- {label} (score={hit['score']:.4f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,185 @@
 from __future__ import annotations
 
-import importlib
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Literal
+
+import numpy as np
+
+from models.embedding_codec import decode_embedding
+from storage.mongodb import ARTICLES_COLLECTION, PASSAGES_COLLECTION, mongo_collection
+from storage.query_cache import QueryCache, current_generation
+from usecases.embedding import embed_batch
+
+if TYPE_CHECKING:
+    from pymongo.collection import Collection
+
+    from storage.vector_index import VectorIndex
+
+# Shared by search_text and hybrid_search; cleared by every BulkMongoWriter flush.
+SEARCH_CACHE = QueryCache.from_env()
+
+
+def _text_hits(
+    collection: Collection[dict[str, Any]], query: str, limit: int, fields: Iterable[str] = ()
+) -> list[dict[str, Any]]:
+    """Top `$text` matches, projecting only `title`, the score and `fields`."""
+    projection: dict[str, Any] = {"title": 1, "score": {"$meta": "textScore"}}
+    projection.update({f: 1 for f in fields})
+    cursor = collection.find({"$text": {"$search": query}}, projection)
+    return list(cursor.sort([("score", {"$meta": "textScore"})]).limit(limit))
 
 
 def search_text(query: str, limit: int = 5) -> list[tuple[str, float]]:
     """Search the MongoDB text index and return [(title, score)]."""
-    mongo_storage = importlib.import_module("storage.mongodb")
-    init_mongo = mongo_storage.init_mongo
-    mongo_models = importlib.import_module("models.mongo_models")
-    ScientificArticleDoc = mongo_models.ScientificArticleDoc
-
-    init_mongo()
-    cursor = ScientificArticleDoc.objects.search_text(query).order_by("$text_score").limit(limit)
-    results: list[tuple[str, float]] = []
-    for doc in cursor:
-        score = float(getattr(doc, "_text_score", 0.0))
-        results.append((doc.title, score))
+    key = ("text", query, limit)
+    cached = SEARCH_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+    generation = current_generation()  # before the query: a write meanwhile skips the put
+    results = [
+        (d["title"], float(d["score"]))
+        for d in _text_hits(mongo_collection(ARTICLES_COLLECTION), query, limit)
+    ]
+    SEARCH_CACHE.put(key, results, generation)
+    return results
+
+
+def _cosine(embedding: Any, query: np.ndarray[Any, Any]) -> float:
+    vec = decode_embedding(embedding)
+    if vec is None or len(vec) != len(query):
+        return 0.0
+    norm = float(np.linalg.norm(vec))
+    return float(vec @ query) / norm if norm else 0.0
+
+
+def _rrf(rankings: Iterable[Sequence[Any]], k: int) -> dict[Any, float]:
+    """Reciprocal-rank fusion: sum of 1 / (k + rank) over every list an id appears in."""
+    fused: dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+def _weighted(
+    text_scores: Mapping[Any, float], cosines: Mapping[Any, float], alpha: float
+) -> dict[Any, float]:
+    """alpha * (text score / best text score) + (1 - alpha) * max(cosine, 0)."""
+    best = max(text_scores.values(), default=0.0) or 1.0
+    return {
+        doc_id: alpha * text_scores.get(doc_id, 0.0) / best
+        + (1 - alpha) * max(cosines.get(doc_id, 0.0), 0.0)
+        for doc_id in {*text_scores, *cosines}
+    }
+
+
+def hybrid_search(
+    query: str,
+    limit: int = 5,
+    fusion: Literal["rrf", "weighted"] = "rrf",
+    alpha: float = 0.5,
+    candidates: int = 50,
+    rrf_k: int = 60,
+    index: VectorIndex | None = None,
+) -> list[tuple[str, float]]:
+    """Fuse `$text` relevance with embedding similarity and return [(title, score)].
+
+    The top `candidates` text matches are fetched with only their title, score,
+    `article_id` and embedding projected (never the full `text`). With a local
+    `index`, its nearest neighbours join the candidate set and only their titles
+    are fetched; without one, the text candidates are re-ranked by cosine.
+    `fusion="rrf"` combines the two rankings by reciprocal rank (`rrf_k`);
+    `"weighted"` blends normalised text score and cosine by `alpha`.
+    Results are cached in `SEARCH_CACHE` until the TTL or the next Mongo write.
+    """
+    if fusion not in ("rrf", "weighted"):
+        raise ValueError(f"unknown fusion {fusion!r}; expected 'rrf' or 'weighted'")
+    key = ("hybrid", query, limit, fusion, alpha, candidates, rrf_k, index.root if index else None)
+    cached = SEARCH_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+    generation = current_generation()
+
+    collection = mongo_collection(ARTICLES_COLLECTION)
+    qvec = embed_batch([query])[0]
+    text_docs = _text_hits(collection, query, candidates, ("article_id", "embedding"))
+    titles = {d["_id"]: d["title"] for d in text_docs}
+    text_scores = {d["_id"]: float(d["score"]) for d in text_docs}
+    cosines = {d["_id"]: _cosine(d.get("embedding"), qvec) for d in text_docs}
+
+    if index is not None and index.count:
+        hits = index.search(qvec, k=candidates)[0]
+        by_article = {
+            d["article_id"]: d["_id"] for d in text_docs if d.get("article_id") is not None
+        }
+        missing = [article_id for article_id, _ in hits if article_id not in by_article]
+        if missing:
+            for d in collection.find(
+                {"article_id": {"$in": missing}}, {"_id": 1, "title": 1, "article_id": 1}
+            ):
+                by_article[d["article_id"]] = d["_id"]
+                titles[d["_id"]] = d["title"]
+        vector_ranking = []
+        for article_id, score in hits:
+            if article_id in by_article:
+                vector_ranking.append(by_article[article_id])
+                cosines[by_article[article_id]] = score
+    else:
+        vector_ranking = sorted(cosines, key=cosines.__getitem__, reverse=True)
+
+    if fusion == "rrf":
+        fused = _rrf([list(text_scores), vector_ranking], rrf_k)
+    else:
+        fused = _weighted(text_scores, {i: cosines[i] for i in vector_ranking}, alpha)
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+    results = [(titles[doc_id], score) for doc_id, score in ranked]
+    SEARCH_CACHE.put(key, results, generation)
+    return results
+
+
+def search_passages(
+    query: str,
+    limit: int = 5,
+    candidates: int = 100,
+    per_article: int | None = 1,
+    rrf_k: int = 60,
+) -> list[tuple[str, int, str, float]]:
+    """Rank passages (see `usecases.passages`) and return [(title, seq, text, score)].
+
+    The top `candidates` `$text` matches in `scientific_passages` are re-ranked
+    by fusing their text rank with the cosine of each passage's own embedding
+    (reciprocal rank, `rrf_k`). At most `per_article` passages are kept per
+    article (None: no limit). Results are cached like `hybrid_search`.
+    """
+    key = ("passages", query, limit, candidates, per_article, rrf_k)
+    cached = SEARCH_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+    generation = current_generation()
+
+    qvec = embed_batch([query])[0]
+    docs = {
+        d["_id"]: d
+        for d in _text_hits(
+            mongo_collection(PASSAGES_COLLECTION),
+            query,
+            candidates,
+            ("article_id", "seq", "text", "embedding"),
+        )
+    }
+    cosines = {doc_id: _cosine(d.get("embedding"), qvec) for doc_id, d in docs.items()}
+    fused = _rrf([list(docs), sorted(cosines, key=cosines.__getitem__, reverse=True)], rrf_k)
+
+    results: list[tuple[str, int, str, float]] = []
+    taken: dict[Any, int] = {}
+    for doc_id, score in sorted(fused.items(), key=lambda item: item[1], reverse=True):
+        d = docs[doc_id]
+        article = d.get("article_id")
+        if per_article is not None and taken.get(article, 0) >= per_article:
+            continue
+        taken[article] = taken.get(article, 0) + 1
+        results.append((d.get("title") or "", int(d["seq"]), d["text"], score))
+        if len(results) == limit:
+            break
+    SEARCH_CACHE.put(key, results, generation)
     return results
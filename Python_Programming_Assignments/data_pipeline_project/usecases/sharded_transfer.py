@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import socket
+import time
+from collections.abc import Callable, Collection
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Literal
+
+from sqlalchemy import ColumnElement, and_, delete, func, or_, select, true, update
+from sqlalchemy.orm import Session
+
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import ScientificArticle, TransferShard
+from storage.extraction_cache import ExtractionCache
+from storage.mariadb import get_session, init_db
+from storage.mongo_writer import BulkMongoWriter
+from storage.mongodb import dispose_mongo, init_mongo
+from usecases.metrics import PipelineMetrics, run_metrics
+from usecases.passages import PassageWriter
+from usecases.pdf_extraction import max_pages_from_env
+from usecases.transfer_mariadb_to_mongodb import article_rows, article_source, write_articles
+
+ShardMode = Literal["range", "hash"]
+
+
+class ShardLost(RuntimeError):
+    """The shard was re-claimed by another worker after this worker's claim went stale."""
+
+
+class ShardError(RuntimeError):
+    """A batch of the shard could not be written to MongoDB; its checkpoint was not advanced."""
+
+
+@dataclass
+class ShardResult:
+    shard: int
+    status: str
+    transferred: int
+
+
+def _predicate(shard: TransferShard) -> ColumnElement[bool]:
+    if shard.mode == "hash":
+        return ScientificArticle.id % shard.shard_count == shard.shard
+    bounds = []
+    if shard.lo is not None:
+        bounds.append(ScientificArticle.id >= shard.lo)
+    if shard.hi is not None:
+        bounds.append(ScientificArticle.id < shard.hi)
+    return and_(true(), *bounds)
+
+
+def _range_bounds(session: Session, shards: int) -> list[int | None]:
+    """Split points at id quantiles, so range shards hold about the same number of rows.
+
+    The first shard starts and the last one ends unbounded, so rows inserted
+    after planning still belong to a shard.
+    """
+    total = session.scalar(select(func.count()).select_from(ScientificArticle)) or 0
+    max_id = session.scalar(select(func.max(ScientificArticle.id))) or 0
+    bounds: list[int | None] = [None]
+    for k in range(1, shards):
+        split = session.scalar(
+            select(ScientificArticle.id)
+            .order_by(ScientificArticle.id)
+            .offset(total * k // shards)
+            .limit(1)
+        )
+        bounds.append(max_id + 1 if split is None else split)
+    return bounds + [None]
+
+
+def plan_shards(
+    run: str, shards: int, mode: ShardMode = "range", reset: bool = False
+) -> list[TransferShard]:
+    """Create the shard rows of `run` in the `transfer_shards` control table.
+
+    `mode="range"` gives each shard a contiguous `id` range cut at quantiles;
+    `"hash"` assigns `id % shards`, which also spreads rows inserted later.
+    Planning an existing run returns its shards unchanged unless `reset`
+    drops them (and their checkpoints) first.
+    """
+    if mode not in ("range", "hash"):
+        raise ValueError(f"unknown shard mode {mode!r}; expected 'range' or 'hash'")
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    init_db()
+    with get_session() as session:
+        if reset:
+            session.execute(delete(TransferShard).where(TransferShard.run == run))
+        existing = list(
+            session.scalars(
+                select(TransferShard).where(TransferShard.run == run).order_by(TransferShard.shard)
+            )
+        )
+        if existing:
+            return existing
+        bounds = _range_bounds(session, shards) if mode == "range" else [None] * (shards + 1)
+        planned = [
+            TransferShard(
+                run=run, shard=k, shard_count=shards, mode=mode, lo=bounds[k], hi=bounds[k + 1]
+            )
+            for k in range(shards)
+        ]
+        session.add_all(planned)
+        session.commit()
+        for shard in planned:
+            session.refresh(shard)
+        session.expunge_all()
+        return planned
+
+
+def claim_shard(
+    session: Session,
+    run: str,
+    worker: str,
+    stale_after: float = 600.0,
+    exclude: Collection[int] = (),
+) -> TransferShard | None:
+    """Claim the lowest pending, failed or stale shard of `run` for `worker`.
+
+    A running shard is stale once its heartbeat (the last checkpoint, by the
+    database clock) is older than `stale_after` seconds; its worker is assumed
+    dead. The claim is a compare-and-set on the shard's `claim` counter, so
+    two workers racing for the same shard cannot both win.
+    """
+    now = session.scalar(select(func.now())) or datetime.now()
+    stmt = (
+        select(TransferShard.shard, TransferShard.claim)
+        .where(
+            TransferShard.run == run,
+            or_(
+                TransferShard.status.in_(("pending", "failed")),
+                and_(
+                    TransferShard.status == "running",
+                    TransferShard.heartbeat_at < now - timedelta(seconds=stale_after),
+                ),
+            ),
+        )
+        .order_by(TransferShard.shard)
+    )
+    for number, claim in session.execute(stmt).all():
+        if number in exclude:
+            continue
+        res = session.execute(
+            update(TransferShard)
+            .where(
+                TransferShard.run == run,
+                TransferShard.shard == number,
+                TransferShard.claim == claim,
+            )
+            .values(
+                status="running",
+                claim=claim + 1,
+                worker=worker,
+                heartbeat_at=func.now(),
+                error=None,
+            )
+        )
+        session.commit()
+        if res.rowcount == 1:  # type: ignore[attr-defined]
+            return session.get(TransferShard, (run, number))
+    return None
+
+
+def _checkpoint(session: Session, shard: TransferShard, claim: int, **values: Any) -> None:
+    """Update the shard if `claim` is still current, else raise `ShardLost`."""
+    res = session.execute(
+        update(TransferShard)
+        .where(
+            TransferShard.run == shard.run,
+            TransferShard.shard == shard.shard,
+            TransferShard.claim == claim,
+        )
+        .values(heartbeat_at=func.now(), **values)
+    )
+    session.commit()
+    if res.rowcount != 1:  # type: ignore[attr-defined]
+        raise ShardLost(f"shard {shard.shard} of {shard.run!r} was claimed by another worker")
+
+
+def _heartbeat(
+    session: Session, shard: TransferShard, claim: int, every: float
+) -> Callable[[], None]:
+    """Callback that refreshes the shard's heartbeat at most once every `every` seconds.
+
+    It runs between articles, so a batch that takes longer than `stale_after`
+    does not make a healthy worker look abandoned. A lost claim raises
+    `ShardLost` there, before the rest of the batch is extracted.
+    """
+    last = time.monotonic()
+
+    def beat() -> None:
+        nonlocal last
+        if time.monotonic() - last >= every:
+            _checkpoint(session, shard, claim)
+            last = time.monotonic()
+
+    return beat
+
+
+def transfer_shard(
+    session: Session,
+    shard: TransferShard,
+    papers_root: Path,
+    batch_size: int = 500,
+    workers: int | None = 1,
+    timeout: float | None = 60.0,
+    cache: ExtractionCache | None = None,
+    metrics: PipelineMetrics | None = None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+    heartbeat_every: float = 60.0,
+) -> int:
+    """Transfer one claimed shard, resuming after its `last_id` checkpoint.
+
+    Rows are read in `id` order, `batch_size` at a time, and written through
+    `write_articles` (upserts on `article_id`, so a batch replayed after a
+    crash does not duplicate documents). The checkpoint moves only after
+    MongoDB acknowledges a batch; the heartbeat also moves between articles,
+    at most every `heartbeat_every` seconds. The shard is marked `done` when
+    its range is exhausted. Returns the number of documents written.
+    """
+    metrics = metrics or PipelineMetrics("transfer_shard")
+    claim, last_id = shard.claim, shard.last_id
+    predicate = _predicate(shard)
+    beat = _heartbeat(session, shard, claim, heartbeat_every)
+    written = 0
+    while True:
+        stmt = article_rows().where(predicate, ScientificArticle.id > last_id)
+        with metrics.stage("mariadb_read") as stage:
+            rows = session.execute(stmt.order_by(ScientificArticle.id).limit(batch_size)).all()
+            stage.rows += len(rows)
+        if not rows:
+            break
+        writer = BulkMongoWriter(ScientificArticleDoc, batch_size=len(rows), key="article_id")
+        with writer:
+            write_articles(
+                (article_source(r, papers_root) for r in rows),
+                writer,
+                workers=workers,
+                timeout=timeout,
+                cache=cache,
+                metrics=metrics,
+                max_pages=max_pages,
+                passages=passages,
+                on_article=beat,
+            )
+        if passages is not None:
+            with metrics.stage("passages"):
+                passages.flush()
+        errors = [e for r in writer.results for e in r.errors]
+        if errors:
+            raise ShardError(f"{len(errors)} documents failed in batch: {errors[:3]}")
+        last_id = rows[-1].id
+        written += writer.written
+        with metrics.stage("commit"):
+            _checkpoint(
+                session,
+                shard,
+                claim,
+                last_id=last_id,
+                transferred=TransferShard.transferred + writer.written,
+            )
+    _checkpoint(session, shard, claim, status="done")
+    return written
+
+
+def run_shard_worker(
+    run: str,
+    papers_root: Path,
+    worker: str | None = None,
+    batch_size: int = 500,
+    stale_after: float = 600.0,
+    workers: int | None = 1,
+    timeout: float | None = 60.0,
+    cache: ExtractionCache | None = None,
+    metrics: PipelineMetrics | None = None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+) -> list[ShardResult]:
+    """Claim and transfer shards of `run` until none is left to claim.
+
+    Start any number of these, in one process each, on any machine that
+    reaches both databases. A shard that fails is marked `failed` with the
+    error and is left for another worker (or a later run) to resume from its
+    checkpoint; this worker does not claim it again. `workers` is the PDF
+    extraction pool size per shard worker (1: extract in-process). The
+    heartbeat is refreshed every `stale_after / 10` seconds while a shard runs.
+    """
+    init_db()
+    init_mongo()
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    results: list[ShardResult] = []
+    failed: set[int] = set()
+    with run_metrics(metrics, "sharded_transfer") as metrics, get_session() as session:
+        while (shard := claim_shard(session, run, worker, stale_after, failed)) is not None:
+            claim = shard.claim
+            try:
+                n = transfer_shard(
+                    session,
+                    shard,
+                    papers_root,
+                    batch_size=batch_size,
+                    workers=workers,
+                    timeout=timeout,
+                    cache=cache,
+                    metrics=metrics,
+                    max_pages=max_pages,
+                    passages=passages,
+                    heartbeat_every=stale_after / 10,
+                )
+            except ShardLost:
+                results.append(ShardResult(shard.shard, "lost", 0))
+                continue
+            except Exception as exc:
+                session.rollback()
+                failed.add(shard.shard)
+                with contextlib.suppress(ShardLost):
+                    _checkpoint(session, shard, claim, status="failed", error=repr(exc)[:512])
+                results.append(ShardResult(shard.shard, "failed", 0))
+                continue
+            results.append(ShardResult(shard.shard, "done", n))
+    return results
+
+
+def shard_status(run: str) -> list[TransferShard]:
+    init_db()
+    with get_session() as session:
+        shards = list(
+            session.scalars(
+                select(TransferShard).where(TransferShard.run == run).order_by(TransferShard.shard)
+            )
+        )
+        session.expunge_all()
+        return shards
+
+
+def _work(run: str, papers_root: Path, options: dict[str, Any]) -> None:
+    dispose_mongo()  # a forked child must not share the parent's client
+    passages = PassageWriter() if options.pop("passages") else None
+    results = run_shard_worker(run, papers_root, passages=passages, **options)
+    for r in results:
+        print(f"[{os.getpid()}] shard {r.shard}: {r.status}, {r.transferred} docs")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sharded MariaDB -> MongoDB backfill")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    plan = sub.add_parser("plan", help="split scientific_articles into shards")
+    plan.add_argument("--run", default="backfill", help="name of the sharded run")
+    plan.add_argument("--shards", type=int, required=True)
+    plan.add_argument("--mode", choices=("range", "hash"), default="range")
+    plan.add_argument("--reset", action="store_true", help="drop the run's shards and checkpoints")
+    work = sub.add_parser("work", help="claim and transfer shards until none are left")
+    work.add_argument("--run", default="backfill", help="name of the sharded run")
+    work.add_argument("--papers", type=Path, default=Path(__file__).parents[1] / "papers")
+    work.add_argument("--procs", type=int, default=1, help="shard worker processes to start")
+    work.add_argument("--pdf-workers", type=int, default=1, help="extraction processes per worker")
+    work.add_argument("--batch-size", type=int, default=500)
+    work.add_argument(
+        "--stale-after", type=float, default=600.0, help="seconds without a heartbeat"
+    )
+    work.add_argument("--max-pages", type=int, default=max_pages_from_env())
+    work.add_argument("--passages", action="store_true")
+    status = sub.add_parser("status", help="show the shards of a run")
+    status.add_argument("--run", default="backfill", help="name of the sharded run")
+    args = parser.parse_args()
+
+    if args.cmd == "plan":
+        shards = plan_shards(args.run, args.shards, args.mode, reset=args.reset)
+        print(f"Run {args.run!r}: {len(shards)} {shards[0].mode} shards.")
+    elif args.cmd == "work":
+        options = {
+            "batch_size": args.batch_size,
+            "stale_after": args.stale_after,
+            "workers": args.pdf_workers,
+            "max_pages": args.max_pages,
+            "passages": args.passages,
+        }
+        if args.procs == 1:
+            _work(args.run, args.papers, options)
+            return
+        procs = [
+            multiprocessing.Process(target=_work, args=(args.run, args.papers, dict(options)))
+            for _ in range(args.procs)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        if any(p.exitcode for p in procs):
+            raise SystemExit(1)
+    else:
+        for s in shard_status(args.run):
+            bounds = f"[{s.lo}, {s.hi})" if s.mode == "range" else f"id % {s.shard_count}"
+            print(
+                f"shard {s.shard:3d} {bounds:>20s} {s.status:8s} last_id={s.last_id} "
+                f"docs={s.transferred} worker={s.worker or '-'}"
+                + (f" error={s.error}" if s.error else "")
+            )
+
+
+if __name__ == "__main__":
+    main()
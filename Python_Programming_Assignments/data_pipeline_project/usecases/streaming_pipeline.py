@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import csv
+import queue
+import statistics
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import Author, ScientificArticle
+from storage.extraction_cache import ExtractionCache
+from storage.mariadb import get_session, init_db
+from storage.mongo_writer import BulkMongoWriter
+from storage.mongodb import init_mongo
+from storage.vector_index import VectorIndex
+from usecases.embedding import embed_batch
+from usecases.load_csv_to_mariadb import iter_chunks, load_chunk, record_content_hashes
+from usecases.metrics import PipelineMetrics, run_metrics
+from usecases.passages import PassageWriter
+from usecases.pdf_extraction import extract_markdown_parallel
+from usecases.transfer_mariadb_to_mongodb import article_rows, article_source
+
+_DONE = object()  # end-of-stream marker passed down every queue
+_POLL = 0.1  # seconds a blocked stage waits before re-checking for failures
+
+
+class _Stopped(Exception):
+    """Raised in a stage blocked on a queue once another stage has failed."""
+
+
+class _Pipe:
+    """Bounded queue between two stages; blocking calls give up once the run stops."""
+
+    def __init__(self, maxsize: int, stop: threading.Event) -> None:
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize)
+        self._stop = stop
+
+    def put(self, item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL)
+                return
+            except queue.Full:
+                pass
+        raise _Stopped
+
+    def get(self, timeout: float | None = None) -> Any:
+        """Next item (or `_DONE`); raises `queue.Empty` after `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set():
+            wait = _POLL if deadline is None else min(_POLL, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return self._queue.get(timeout=wait)
+            except queue.Empty:
+                pass
+        raise _Stopped
+
+    def get_nowait(self) -> Any:
+        return self._queue.get_nowait()
+
+    def __iter__(self) -> Iterator[Any]:
+        while (item := self.get()) is not _DONE:
+            yield item
+
+    def poll(self) -> Iterator[Any]:
+        """Like iteration, but yields None whenever nothing arrived for `_POLL` seconds."""
+        while True:
+            try:
+                item = self.get(timeout=_POLL)
+            except queue.Empty:
+                yield None
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+
+@dataclass
+class StreamingResult:
+    articles_loaded: int = 0  # inserted or updated, and passed on to MongoDB
+    articles_skipped: int = 0  # unchanged since the last load
+    authors_created: int = 0
+    documents_written: int = 0
+    seconds: float = 0.0
+    # Seconds from reading a CSV chunk to its documents being acknowledged by MongoDB.
+    latencies: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def latency_p50(self) -> float:
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+    @property
+    def latency_max(self) -> float:
+        return max(self.latencies, default=0.0)
+
+
+def _read_csv(csv_path: Path, chunk_size: int, out: _Pipe, metrics: PipelineMetrics) -> None:
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        chunks = iter_chunks(csv.DictReader(f), chunk_size)
+        for chunk in metrics.timed_iter("csv_parse", chunks):
+            out.put((time.monotonic(), chunk))
+    metrics.stages["csv_parse"].bytes = csv_path.stat().st_size
+
+
+def _load(
+    inp: _Pipe,
+    out: _Pipe,
+    papers_root: Path,
+    unsent: dict[int, str],
+    result: StreamingResult,
+    metrics: PipelineMetrics,
+) -> None:
+    """Upsert each chunk, commit it, and pass its new or changed rows on for extraction.
+
+    Their content hashes go to `unsent` instead of MariaDB; `_write` records them once
+    MongoDB has acknowledged the documents.
+    """
+    with get_session() as session:
+        assert isinstance(session, Session)
+        for read_at, chunk in inp:
+            loaded = load_chunk(
+                session,
+                Author,
+                ScientificArticle,
+                chunk,
+                metrics,
+                returning=True,
+                record_hashes=False,
+            )
+            unsent.update(zip(loaded.article_ids, loaded.content_hashes, strict=True))
+            with metrics.stage("commit"):
+                session.commit()
+            result.authors_created += loaded.authors_created
+            result.articles_loaded += len(loaded.article_ids)
+            result.articles_skipped += loaded.skipped
+            ids = loaded.article_ids
+            if not ids:
+                continue
+            with metrics.stage("mariadb_read") as stage:
+                stmt = article_rows().where(ScientificArticle.id.in_(ids))
+                rows = session.execute(stmt.order_by(ScientificArticle.id)).all()
+                stage.rows += len(rows)
+            for row in rows:
+                fields, pdf_path = article_source(row, papers_root)
+                out.put(((fields, read_at), pdf_path))
+
+
+def _extract(
+    inp: _Pipe,
+    out: _Pipe,
+    workers: int | None,
+    timeout: float | None,
+    cache: ExtractionCache | None,
+    max_pages: int | None,
+    passages: PassageWriter | None,
+    metrics: PipelineMetrics,
+) -> None:
+    extracted = extract_markdown_parallel(
+        inp.poll(),
+        workers=workers,
+        timeout=timeout,
+        cache=cache,
+        max_pages=max_pages,
+        passages=passages,
+        article_of=lambda key: key[0],
+    )
+    for key, result in metrics.timed_iter("pdf_extraction", extracted):
+        metrics.stages["pdf_extraction"].bytes += len(result.markdown)
+        if passages is not None:
+            passages.passages += result.passages
+            with metrics.stage("passages") as stage:
+                stage.rows += result.passages
+        out.put((key, result))
+
+
+def _embed(
+    inp: _Pipe, out: _Pipe, batch_size: int, cache: ExtractionCache | None, metrics: PipelineMetrics
+) -> None:
+    """Embed whatever has queued up (up to `batch_size`) in one vectorized call."""
+    while (item := inp.get()) is not _DONE:
+        batch = [item]
+        done = False
+        while len(batch) < batch_size:
+            try:
+                nxt = inp.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is _DONE:
+                done = True
+                break
+            batch.append(nxt)
+        with metrics.stage("embedding") as stage:
+            embeddings: list[list[float] | None] = []
+            keys = []
+            for (fields, _), result in batch:
+                if result.embedding is not None:  # streamed into passages
+                    keys.append(None)
+                    embeddings.append(result.embedding)
+                    continue
+                key = cache.key_for(Path(fields["file_path"])) if cache else None
+                keys.append(key)
+                embeddings.append(cache.get_embedding(key) if cache and key else None)
+            missing = [i for i, e in enumerate(embeddings) if e is None]
+            if missing:
+                vectors = embed_batch([batch[i][1].markdown for i in missing], dtype=np.float64)
+                for i, vector in zip(missing, vectors.tolist(), strict=True):
+                    embeddings[i] = vector
+                    key = keys[i]
+                    if cache and key:
+                        cache.put_embedding(key, vector)
+            stage.rows += len(batch)
+        for ((fields, read_at), result), embedding in zip(batch, embeddings, strict=True):
+            fields["text"] = result.markdown
+            fields["embedding"] = ScientificArticleDoc.encode_embedding(embedding)
+            out.put((fields, read_at))
+        if done:
+            return
+
+
+def _write(
+    inp: _Pipe,
+    batch_size: int,
+    flush_interval: float,
+    vector_index: VectorIndex | None,
+    passages: PassageWriter | None,
+    unsent: dict[int, str],
+    result: StreamingResult,
+    metrics: PipelineMetrics,
+) -> None:
+    """Upsert documents, flushing every `batch_size` docs or `flush_interval` seconds.
+
+    Passages added in-process by the extract stage are flushed along with them.
+    Acknowledged documents get their content hash recorded in MariaDB, so a run
+    that stops in between sends them again next time.
+    """
+    read_at: dict[int, float] = {}
+
+    def acknowledged(docs: list[dict[str, Any]]) -> None:
+        if vector_index is not None:
+            vector_index.add_documents(docs)
+        now = time.monotonic()
+        sent: dict[int, str] = {}
+        for doc in docs:
+            started = read_at.pop(doc["article_id"], None)
+            if started is not None:
+                result.latencies.append(now - started)
+            if (content_hash := unsent.pop(doc["article_id"], None)) is not None:
+                sent[doc["article_id"]] = content_hash
+        with metrics.stage("hash_record") as stage, get_session() as session:
+            record_content_hashes(session, ScientificArticle, sent)
+            session.commit()
+            stage.rows += len(sent)
+
+    writer = BulkMongoWriter(
+        ScientificArticleDoc,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        key="article_id",
+        on_flush=acknowledged,
+    )
+    while True:
+        try:
+            item = inp.get(timeout=flush_interval)
+        except queue.Empty:
+            # Nothing new: push out a partial batch so it becomes searchable.
+            with metrics.stage("mongo_write"):
+                writer.flush_if_due()
+                if passages is not None:
+                    passages.flush()
+            continue
+        if item is _DONE:
+            break
+        fields, started = item
+        read_at[fields["article_id"]] = started
+        with metrics.stage("mongo_write") as stage:
+            writer.add_raw(fields)
+            stage.rows += 1
+    with metrics.stage("mongo_write"):
+        writer.flush()
+        if passages is not None:
+            passages.flush()
+    result.documents_written = writer.written
+
+
+def run_streaming_pipeline(
+    csv_path: Path,
+    papers_root: Path,
+    chunk_size: int = 100,
+    queue_chunks: int = 4,
+    workers: int | None = None,
+    timeout: float | None = 60.0,
+    cache: ExtractionCache | None = None,
+    batch_size: int = 100,
+    flush_interval: float = 1.0,
+    vector_index: VectorIndex | None = None,
+    metrics: PipelineMetrics | None = None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+) -> StreamingResult:
+    """Load the CSV and publish it to MongoDB as one pipelined run.
+
+    CSV reading, the MariaDB insert, PDF extraction (a process pool of
+    `workers`), embedding and the Mongo upsert run as concurrent stages joined
+    by bounded queues, so a slow stage holds back the ones feeding it instead
+    of buffering the whole file. Each chunk of `chunk_size` rows is committed
+    to MariaDB and handed on immediately. Rows whose content hash is unchanged
+    are skipped, so they are never re-extracted. The hash is recorded only once
+    MongoDB has acknowledged the row's document, so rows a failed run loaded
+    but never sent are picked up again by the next one. Documents are upserted on
+    `article_id` at least every `flush_interval` seconds, which bounds how long
+    a new article takes to become searchable. `max_pages` caps the pages read
+    per PDF, and `passages` also writes passage documents (see
+    `write_articles`). The first stage failure stops every stage and is
+    re-raised here.
+    """
+    init_db()
+    init_mongo()
+    result = StreamingResult()
+    stop = threading.Event()
+    items = chunk_size * queue_chunks
+    rows, articles, extracted, embedded = (
+        _Pipe(queue_chunks, stop),
+        _Pipe(items, stop),
+        _Pipe(items, stop),
+        _Pipe(items, stop),
+    )
+    errors: list[BaseException] = []
+    unsent: dict[int, str] = {}  # article id -> content hash, from _load until acknowledged
+
+    def stage(fn: Callable[..., None], out: _Pipe | None, *args: Any) -> threading.Thread:
+        def run() -> None:
+            try:
+                fn(*args)
+                if out is not None:
+                    out.put(_DONE)
+            except _Stopped:
+                pass
+            except BaseException as exc:
+                errors.append(exc)
+                stop.set()
+
+        return threading.Thread(target=run, name=f"pipeline-{fn.__name__.strip('_')}")
+
+    started = time.perf_counter()
+    with run_metrics(metrics, "streaming") as metrics:
+        threads = [
+            stage(_read_csv, rows, csv_path, chunk_size, rows, metrics),
+            stage(_load, articles, rows, articles, papers_root, unsent, result, metrics),
+            stage(
+                _extract,
+                extracted,
+                articles,
+                extracted,
+                workers,
+                timeout,
+                cache,
+                max_pages,
+                passages,
+                metrics,
+            ),
+            stage(_embed, embedded, extracted, embedded, batch_size, cache, metrics),
+            stage(
+                _write,
+                None,
+                embedded,
+                batch_size,
+                flush_interval,
+                vector_index,
+                passages,
+                unsent,
+                result,
+                metrics,
+            ),
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                t.join()
+        except BaseException:  # e.g. Ctrl-C: unblock every stage before leaving
+            stop.set()
+            raise
+    result.seconds = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return result
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import ScientificArticle, SyncState
+from storage.extraction_cache import ExtractionCache, cache_path_from_env
+from storage.mariadb import get_session, init_db
+from storage.mongo_writer import BulkMongoWriter
+from storage.mongodb import init_mongo
+from storage.vector_index import VectorIndex
+from usecases.metrics import PipelineMetrics, run_metrics
+from usecases.passages import PassageWriter
+from usecases.pdf_extraction import extractor_version, max_pages_from_env
+from usecases.transfer_mariadb_to_mongodb import article_rows, article_source, write_articles
+from usecases.vector_search import open_index
+
+
+class SyncError(RuntimeError):
+    """A batch could not be written to MongoDB; the high-water mark was not advanced."""
+
+
+@dataclass
+class SyncResult:
+    transferred: int
+    batches: int
+    last_updated_at: datetime | None
+    last_id: int
+
+
+def _load_state(session: Session, name: str) -> SyncState:
+    state = session.get(SyncState, name)
+    if state is None:
+        state = SyncState(name=name, last_updated_at=None, last_id=0)
+        session.add(state)
+        session.commit()
+    return state
+
+
+def sync_mariadb_to_mongodb(
+    papers_root: Path,
+    name: str = "mongodb",
+    batch_size: int = 500,
+    lag_seconds: float = 2.0,
+    overlap_seconds: float = 300.0,
+    workers: int | None = None,
+    timeout: float | None = 60.0,
+    cache: ExtractionCache | None = None,
+    vector_index: VectorIndex | None = None,
+    metrics: PipelineMetrics | None = None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+) -> SyncResult:
+    """Transfer only articles added or changed since the last sync.
+
+    Rows are read in keyset order of (updated_at, id) and upserted on
+    `article_id`, so re-running is idempotent. The mark is committed only
+    after each batch is acknowledged by MongoDB; a crash mid-batch resumes
+    from the previous batch. Rows touched within the last `lag_seconds` (by
+    the database clock) wait for the next run.
+
+    `updated_at` is set when a loader writes the row, but the row only becomes
+    visible when its transaction commits, which can be after the mark has
+    moved past that timestamp. Each run therefore starts `overlap_seconds`
+    before the persisted mark and re-sends that window (the upsert makes this
+    harmless). Rows are missed only if a loader transaction stays open longer
+    than `overlap_seconds`, so keep it above the longest load transaction
+    (`commit_every` chunks for `stream_csv_to_mariadb`).
+
+    Synced documents are also added to `vector_index`, if given. `max_pages`
+    and `passages` work as in `write_articles`; passages are flushed with
+    each batch, before the mark moves.
+    """
+    init_db()
+    init_mongo()
+    transferred = 0
+    batches = 0
+    with run_metrics(metrics, "sync") as metrics, get_session() as session:
+        assert isinstance(session, Session)
+        state = _load_state(session, name)
+        now = session.scalar(select(func.now()))
+        cutoff = (now or datetime.now()) - timedelta(seconds=lag_seconds)
+        # Keyset position of this run: the overlap window's start, then each batch's last row.
+        after: tuple[datetime, int] | None = None
+        since = (
+            state.last_updated_at - timedelta(seconds=overlap_seconds)
+            if state.last_updated_at is not None
+            else None
+        )
+
+        while True:
+            stmt = article_rows().where(ScientificArticle.updated_at < cutoff)
+            if after is not None:
+                stmt = stmt.where(
+                    or_(
+                        ScientificArticle.updated_at > after[0],
+                        and_(
+                            ScientificArticle.updated_at == after[0],
+                            ScientificArticle.id > after[1],
+                        ),
+                    )
+                )
+            elif since is not None:
+                stmt = stmt.where(ScientificArticle.updated_at >= since)
+            stmt = stmt.order_by(ScientificArticle.updated_at, ScientificArticle.id)
+            with metrics.stage("mariadb_read") as stage:
+                rows = session.execute(stmt.limit(batch_size)).all()
+                stage.rows += len(rows)
+            if not rows:
+                break
+
+            writer = BulkMongoWriter(
+                ScientificArticleDoc,
+                batch_size=len(rows),
+                key="article_id",
+                on_flush=vector_index.add_documents if vector_index else None,
+            )
+            with writer:
+                write_articles(
+                    (article_source(r, papers_root) for r in rows),
+                    writer,
+                    workers=workers,
+                    timeout=timeout,
+                    cache=cache,
+                    metrics=metrics,
+                    max_pages=max_pages,
+                    passages=passages,
+                )
+            if passages is not None:
+                with metrics.stage("passages"):
+                    passages.flush()
+            errors = [e for r in writer.results for e in r.errors]
+            if errors:
+                raise SyncError(f"{len(errors)} documents failed in batch: {errors[:3]}")
+
+            after = (rows[-1].updated_at, rows[-1].id)
+            if state.last_updated_at is None or after > (state.last_updated_at, state.last_id):
+                state.last_updated_at, state.last_id = after  # never moved back by the overlap
+            with metrics.stage("commit"):
+                session.commit()
+            transferred += writer.written
+            batches += 1
+        return SyncResult(transferred, batches, state.last_updated_at, state.last_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incremental MariaDB -> MongoDB sync")
+    parser.add_argument("--papers", type=Path, default=Path(__file__).parents[1] / "papers")
+    parser.add_argument("--name", default="mongodb", help="sync state name")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--overlap-seconds",
+        type=float,
+        default=300.0,
+        help="window before the high-water mark re-sent each run (> longest load transaction)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=cache_path_from_env(Path(__file__).parents[1] / ".cache" / "extraction.sqlite"),
+        help="PDF extraction cache (default: EXTRACTION_CACHE_PATH or .cache/extraction.sqlite)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="extract every PDF again")
+    parser.add_argument(
+        "--vector-index", action="store_true", help="also add synced docs to the local vector index"
+    )
+    parser.add_argument(
+        "--max-pages", type=int, default=max_pages_from_env(), help="pages read per PDF"
+    )
+    parser.add_argument(
+        "--passages", action="store_true", help="also write passage documents with embeddings"
+    )
+    args = parser.parse_args()
+    with contextlib.ExitStack() as stack:
+        cache = (
+            None
+            if args.no_cache
+            else stack.enter_context(ExtractionCache(args.cache, extractor_version(args.max_pages)))
+        )
+        result = sync_mariadb_to_mongodb(
+            args.papers,
+            name=args.name,
+            batch_size=args.batch_size,
+            overlap_seconds=args.overlap_seconds,
+            workers=args.workers,
+            cache=cache,
+            vector_index=open_index() if args.vector_index else None,
+            max_pages=args.max_pages,
+            passages=PassageWriter() if args.passages else None,
+        )
+    print(
+        f"Synced {result.transferred} docs in {result.batches} batches "
+        f"(high-water: {result.last_updated_at}, id {result.last_id})."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,180 @@
 from __future__ import annotations
 
-import hashlib
-import math
-import re
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Row, Select, select
 from sqlalchemy.orm import Session
 
-from models.mongo_models import AuthorEmbedded, ScientificArticleDoc
-from models.sql_models import ScientificArticle
+from models.mongo_models import ScientificArticleDoc
+from models.sql_models import Author, ScientificArticle
+from storage.extraction_cache import ExtractionCache
 from storage.mariadb import get_session
+from storage.mongo_writer import BulkMongoWriter
 from storage.mongodb import init_mongo
+from storage.vector_index import VectorIndex
+from usecases.embedding import compute_embedding
+from usecases.metrics import PipelineMetrics, run_metrics
+from usecases.passages import PassageWriter
+from usecases.pdf_extraction import extract_markdown_parallel, pdf_to_markdown
 
+__all__ = ["pdf_to_markdown", "transfer_mariadb_to_mongodb", "write_articles"]
 
-def pdf_to_markdown(pdf_path: Path) -> str:
-    """Extract text from PDF (pypdf if available) and wrap as Markdown."""
-    try:
-        from pypdf import PdfReader  # type: ignore
-        body = "\n\n".join(
-            (t.strip() for p in PdfReader(str(pdf_path)).pages
-             if (t := (p.extract_text() or "")))
-        ) or "(No extractable text)"
-    except Exception:
-        body = "(Extracted text unavailable in this environment)"
-    return f"# Extracted Content\n\n{body}\n"
 
+def article_rows() -> Select[Any]:
+    """Plain column tuples for the transfer, with the author joined in.
 
-def _tokenize(text: str) -> list[str]:
-    return [t for t in re.split(r"\W+", text.lower()) if t]
+    Selecting columns instead of ORM entities avoids a lazy author SELECT per
+    article and keeps nothing in the session's identity map.
+    """
+    return select(
+        ScientificArticle.id,
+        ScientificArticle.title,
+        ScientificArticle.summary,
+        ScientificArticle.file_path,
+        ScientificArticle.arxiv_id,
+        ScientificArticle.author_id,
+        ScientificArticle.updated_at,
+        Author.full_name.label("author_full_name"),
+        Author.title.label("author_title"),
+    ).join(Author, ScientificArticle.author_id == Author.id)
 
 
-def compute_embedding(text: str, dim: int = 128) -> list[float]:
-    """Deterministic hash-based bag-of-words embedding, L2-normalized."""
-    vec = [0.0] * dim
-    for tok in _tokenize(text):
-        h = hashlib.sha256(tok.encode("utf-8")).digest()
-        vec[int.from_bytes(h[:4], "big") % dim] += 1.0
-    norm = math.sqrt(sum(v * v for v in vec))
-    return [v / norm for v in vec] if norm else vec
+def article_source(row: Row[Any], papers_root: Path) -> tuple[dict[str, Any], Path]:
+    """Mongo fields for one `article_rows()` row (minus text/embedding) and its PDF path."""
+    pdf_path = (papers_root / Path(row.file_path).name).resolve()
+    fields = {
+        "title": row.title,
+        "summary": row.summary,
+        "file_path": str(pdf_path),
+        "arxiv_id": row.arxiv_id,
+        "author": {"full_name": row.author_full_name, "title": row.author_title or ""},
+        "author_id": row.author_id,
+        "article_id": row.id,
+    }
+    return fields, pdf_path
 
 
-def transfer_mariadb_to_mongodb(papers_root: Path) -> int:
-    """Load articles from MariaDB into MongoDB with PDF→Markdown + embedding."""
+def _article_sources(
+    session: Session, papers_root: Path, yield_per: int
+) -> Iterator[tuple[dict[str, Any], Path]]:
+    # yield_per streams through a server-side cursor, one fetch per batch.
+    stmt = article_rows().execution_options(yield_per=yield_per)
+    for row in session.execute(stmt):
+        yield article_source(row, papers_root)
+
+
+def _embedding_for(md: str, pdf_path: Path, cache: ExtractionCache | None) -> list[float]:
+    key = cache.key_for(pdf_path) if cache else None
+    if cache and key:
+        cached = cache.get_embedding(key)
+        if cached is not None:
+            return cached
+    embedding = compute_embedding(md)
+    if cache and key:
+        cache.put_embedding(key, embedding)
+    return embedding
+
+
+def write_articles(
+    sources: Iterable[tuple[dict[str, Any], Path]],
+    writer: BulkMongoWriter,
+    workers: int | None = None,
+    timeout: float | None = 60.0,
+    cache: ExtractionCache | None = None,
+    metrics: PipelineMetrics | None = None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+    on_article: Callable[[], None] | None = None,
+) -> None:
+    """Extract, embed and hand each article to `writer` as its PDF completes.
+
+    `pdf_extraction` is the time spent waiting on the worker pool (which also
+    pulls `sources`), `embedding` includes cache lookups, and `mongo_write`
+    covers buffering plus every bulk flush. Only the first `max_pages` pages
+    of each PDF are read. With `passages`, each PDF's pages are split into
+    passage documents while they are read (inside `pdf_extraction`; the
+    `passages` stage only counts them) and the article keeps only its head.
+    `on_article` is called after each article is handed to `writer`.
+    """
+    metrics = metrics or PipelineMetrics("write_articles")
+    extracted = extract_markdown_parallel(
+        sources,
+        workers=workers,
+        timeout=timeout,
+        cache=cache,
+        max_pages=max_pages,
+        passages=passages,
+        article_of=lambda fields: fields,
+    )
+    for fields, (md, embedding, passage_count) in metrics.timed_iter("pdf_extraction", extracted):
+        metrics.stages["pdf_extraction"].bytes += len(md)
+        with metrics.stage("embedding") as stage:
+            fields["text"] = md
+            if embedding is None:
+                embedding = _embedding_for(md, Path(fields["file_path"]), cache)
+            fields["embedding"] = ScientificArticleDoc.encode_embedding(embedding)
+            stage.rows += 1
+        if passages is not None:
+            passages.passages += passage_count
+            with metrics.stage("passages") as stage:
+                stage.rows += passage_count
+        with metrics.stage("mongo_write") as stage:
+            writer.add_raw(fields)
+            stage.rows += 1
+        if on_article is not None:
+            on_article()
+
+
+def transfer_mariadb_to_mongodb(
+    papers_root: Path,
+    workers: int | None = None,
+    timeout: float | None = 60.0,
+    cache: ExtractionCache | None = None,
+    batch_size: int = 500,
+    vector_index: VectorIndex | None = None,
+    metrics: PipelineMetrics | None = None,
+    max_pages: int | None = None,
+    passages: PassageWriter | None = None,
+) -> int:
+    """Load articles from MariaDB into MongoDB with PDF→Markdown + embedding.
+
+    PDFs are parsed on a pool of `workers` processes (default: one per core),
+    each file bounded by `timeout` seconds; documents are written as their
+    extraction completes. With a `cache`, unchanged PDFs skip extraction and
+    embedding entirely. Documents are upserted on `article_id` in unordered
+    batches of `batch_size`, so re-running the transfer does not duplicate them.
+    Each acknowledged batch is also added to `vector_index`, if given. Per-stage
+    timings go to `metrics` (default: configured from the environment).
+    `max_pages` and `passages` are passed on to `write_articles`; the passage
+    writer is flushed before returning.
+    """
     init_mongo()
-    inserted = 0
-    with get_session() as session:
+    writer = BulkMongoWriter(
+        ScientificArticleDoc,
+        batch_size=batch_size,
+        key="article_id",
+        on_flush=vector_index.add_documents if vector_index else None,
+    )
+    with run_metrics(metrics, "transfer") as metrics, get_session() as session, writer:
         assert isinstance(session, Session)
-        for art in session.scalars(select(ScientificArticle)):
-            pdf_path = (papers_root / Path(art.file_path).name).resolve()
-            doc = ScientificArticleDoc(
-                title=art.title,
-                summary=art.summary,
-                file_path=str(pdf_path),
-                arxiv_id=art.arxiv_id,
-                author=AuthorEmbedded(
-                    full_name=art.author.full_name, title=art.author.title or ""
-                ),
-                text=(md := pdf_to_markdown(pdf_path)),
-                embedding=compute_embedding(md),
-            )
-            doc.save()
-            inserted += 1
-    return inserted
+        write_articles(
+            metrics.timed_iter(
+                "mariadb_read", _article_sources(session, papers_root, yield_per=batch_size)
+            ),
+            writer,
+            workers=workers,
+            timeout=timeout,
+            cache=cache,
+            metrics=metrics,
+            max_pages=max_pages,
+            passages=passages,
+        )
+        # Flush the last partial batch here so it is charged to mongo_write.
+        with metrics.stage("mongo_write"):
+            writer.flush()
+        if passages is not None:
+            with metrics.stage("passages"):
+                passages.flush()
+    return writer.written